@@ -2,15 +2,29 @@ from flask import Flask
 from routes.document_route import document_bp
 from routes.search_route import search_bp
 from routes.save_document import save_bp
-from config import PORT
+from routes.job_route import job_bp
+from routes.metrics_route import metrics_bp
+from routes.health_route import health_bp
+from services import qdrant_service, job_service
+from utils import metrics, rate_limiter, resilience
+from config import PORT, METRICS_ENABLED, FLASK_DEBUG
 
 def create_app():
     app = Flask(__name__)
     app.register_blueprint(document_bp, url_prefix="/api")
     app.register_blueprint(search_bp, url_prefix="/api")
     app.register_blueprint(save_bp, url_prefix="/api")
+    app.register_blueprint(job_bp, url_prefix="/api")
+    app.register_blueprint(health_bp)
+    if METRICS_ENABLED:
+        app.register_blueprint(metrics_bp)
+        metrics.init_app(app)
+    resilience.init_app(app)
+    rate_limiter.init_app(app)
+    qdrant_service.init_app(app)
+    job_service.init_app(app)
     return app
 
 if __name__ == "__main__":
     app = create_app()
-    app.run(host="0.0.0.0", port=PORT, debug=True)
+    app.run(host="0.0.0.0", port=PORT, debug=FLASK_DEBUG, threaded=True)
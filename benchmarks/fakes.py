@@ -0,0 +1,197 @@
+"""
+벤치마크용 OpenAI chat/embedding 대체 구현과 단계별 시간 기록기.
+네트워크 호출 없이 지정한 지연 분포만큼 대기한 뒤 파싱 가능한 고정 형식의 응답을 반환
+"""
+import asyncio
+import hashlib
+import json
+import random
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Callable, Dict, List
+import numpy as np
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+
+class LatencyModel:
+    """
+    지연 분포. spec 형식:
+    fixed:<ms> | uniform:<min_ms>:<max_ms> | lognormal:<median_ms>:<sigma> | none
+    """
+
+    def __init__(self, spec: str, seed: int = 0):
+        self.spec = spec
+        kind, *params = spec.split(":")
+        self.kind = kind
+        self.params = [float(param) for param in params]
+        if kind not in ("none", "fixed", "uniform", "lognormal"):
+            raise ValueError(f"Unknown latency distribution: {spec}")
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self) -> float:
+        """지연 시간(초)"""
+        with self._lock:
+            if self.kind == "fixed":
+                ms = self.params[0]
+            elif self.kind == "uniform":
+                ms = self._random.uniform(self.params[0], self.params[1])
+            elif self.kind == "lognormal":
+                ms = self._random.lognormvariate(np.log(self.params[0]), self.params[1])
+            else:
+                ms = 0.0
+        return ms / 1000.0
+
+    def wait(self) -> None:
+        time.sleep(self.sample())
+
+    async def await_(self) -> None:
+        await asyncio.sleep(self.sample())
+
+
+class StageRecorder:
+    """단계 이름별 소요 시간(초) 기록"""
+
+    def __init__(self):
+        self._durations: Dict[str, List[float]] = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            self._durations[stage].append(seconds)
+
+    @contextmanager
+    def timed(self, stage: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - started)
+
+    def reset(self) -> Dict[str, List[float]]:
+        """지금까지의 기록을 반환하고 비움"""
+        with self._lock:
+            durations, self._durations = dict(self._durations), defaultdict(list)
+        return durations
+
+
+class FakeChatModel:
+    """ChatOpenAI 대체. invoke는 AIMessage, stream은 AIMessageChunk를 반환"""
+
+    def __init__(self, stage: str, respond: Callable[[str], str], latency: LatencyModel, recorder: StageRecorder):
+        self.stage = stage
+        self.respond = respond
+        self.latency = latency
+        self.recorder = recorder
+        self.model_name = "fake-chat"
+        self.temperature = 0
+
+    def invoke(self, prompt, *args, **kwargs) -> AIMessage:
+        with self.recorder.timed(self.stage):
+            self.latency.wait()
+            return AIMessage(content=self.respond(str(prompt)))
+
+    async def ainvoke(self, prompt, *args, **kwargs) -> AIMessage:
+        with self.recorder.timed(self.stage):
+            await self.latency.await_()
+            return AIMessage(content=self.respond(str(prompt)))
+
+    def stream(self, prompt, *args, **kwargs):
+        with self.recorder.timed(self.stage):
+            self.latency.wait()
+            for token in self.respond(str(prompt)).split(" "):
+                yield AIMessageChunk(content=token + " ")
+
+
+class FakeStructuredModel(FakeChatModel):
+    """with_structured_output 결과 대체. invoke가 dict를 반환"""
+
+    def invoke(self, prompt, *args, **kwargs) -> Dict:
+        with self.recorder.timed(self.stage):
+            self.latency.wait()
+            return json.loads(self.respond(str(prompt)))
+
+    async def ainvoke(self, prompt, *args, **kwargs) -> Dict:
+        with self.recorder.timed(self.stage):
+            await self.latency.await_()
+            return json.loads(self.respond(str(prompt)))
+
+
+class FakeEmbeddings:
+    """
+    OpenAIEmbeddings 대체. 텍스트 해시로 시드를 정한 정규화 벡터를 반환하므로
+    같은 텍스트는 같은 벡터, 다른 텍스트는 거의 직교하는 벡터가 됨
+    """
+
+    def __init__(self, dimensions: int, latency: LatencyModel, recorder: StageRecorder):
+        self.dimensions = dimensions
+        self.latency = latency
+        self.recorder = recorder
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        with self.recorder.timed("embedding.request"):
+            self.latency.wait()
+            return [self._vector(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        with self.recorder.timed("embedding.request"):
+            await self.latency.await_()
+            return [self._vector(text) for text in texts]
+
+    def _vector(self, text: str) -> List[float]:
+        seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+        vector = np.random.default_rng(seed).standard_normal(self.dimensions).astype(np.float32)
+        return (vector / np.linalg.norm(vector)).tolist()
+
+
+class TimedClient:
+    """벡터 저장소 클라이언트의 메서드 호출 시간을 vector.<method> 단계로 기록하는 proxy"""
+
+    _TIMED = {"search", "upsert", "delete", "count", "retrieve", "set_payload"}
+
+    def __init__(self, client, recorder: StageRecorder):
+        self._client = client
+        self._recorder = recorder
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if name not in self._TIMED:
+            return attr
+
+        def timed(*args, **kwargs):
+            with self._recorder.timed(f"vector.{name}"):
+                return attr(*args, **kwargs)
+        return timed
+
+
+def fake_keywords(prompt: str) -> str:
+    category = "MEETING_DOC" if "회의" in prompt else "DEV_DOC"
+    return json.dumps({"keywords": ["벤치마크", "성능", "API"], "category": category}, ensure_ascii=False)
+
+def fake_metadata(prompt: str) -> str:
+    return json.dumps({
+        **json.loads(fake_keywords(prompt)),
+        "title": "벤치마크 문서",
+        "summary": "벤치마크용으로 생성된 문서 요약입니다.",
+    }, ensure_ascii=False)
+
+def fake_summary(prompt: str) -> str:
+    return json.dumps({
+        "title": "벤치마크 문서",
+        "summary": "벤치마크용으로 생성된 문서 요약입니다.",
+        "document": "벤치마크 문서 원문",
+    }, ensure_ascii=False)
+
+def fake_document(prompt: str) -> str:
+    return "## 개요\n벤치마크용으로 생성된 문서입니다. " * 20
+
+def fake_answer(prompt: str) -> str:
+    return "현재 주어진 정보로는 벤치마크 응답을 반환합니다."
+
+def fake_reference_summary(prompt: str) -> str:
+    return "벤치마크용 reference 요약입니다. 핵심 논의를 세 문장으로 정리했습니다."
@@ -0,0 +1,287 @@
+"""
+/api/process-document, /api/save-document, /api/search-document 오프라인 벤치마크.
+OpenAI chat/embedding은 지연 분포를 가진 대체 구현으로, 벡터 저장소는 프로세스 내 메모리 저장소로 바꿔서
+create_app()의 엔드포인트를 동시에 호출하고 엔드포인트/단계별 처리량과 p50/p95/p99를 측정
+
+    python -m benchmarks.run --requests 50 --concurrency 8 --output results.json
+    python -m benchmarks.run --baseline benchmarks/baseline.json            # 기준 대비 회귀 시 exit code 1
+    python -m benchmarks.run --save-baseline benchmarks/baseline.json       # 기준 갱신
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+ENDPOINTS = ("process-document", "save-document", "search-document")
+LATENCY_METRICS = ("p50", "p95", "p99")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="docflow-ai offline benchmark")
+    parser.add_argument("--endpoints", default=",".join(ENDPOINTS), help="쉼표로 구분한 엔드포인트 목록")
+    parser.add_argument("--requests", type=int, default=40, help="엔드포인트별 요청 수")
+    parser.add_argument("--concurrency", type=int, default=8, help="동시 요청 수")
+    parser.add_argument("--warmup", type=int, default=2, help="측정 전 엔드포인트별 워밍업 요청 수")
+    parser.add_argument("--llm-latency", default="lognormal:120:0.35", help="LLM 호출 지연 분포 (fixed:<ms> | uniform:<min>:<max> | lognormal:<median>:<sigma> | none)")
+    parser.add_argument("--embedding-latency", default="lognormal:25:0.3", help="임베딩 호출 지연 분포")
+    parser.add_argument("--vector-store", choices=("local", "qdrant-memory"), default="local", help="local: NumPy 저장소, qdrant-memory: qdrant_client 로컬 모드")
+    parser.add_argument("--serving-mode", choices=("sync", "async"), default=None, help="SERVING_MODE")
+    parser.add_argument("--metadata-mode", choices=("split", "combined"), default=None, help="METADATA_EXTRACTION_MODE")
+    parser.add_argument("--doc-chars", type=int, default=3000, help="생성 요청 chat/content 길이(문자)")
+    parser.add_argument("--references", type=int, default=3, help="검색 요청당 reference 수")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    parser.add_argument("--baseline", help="비교할 기준 결과 JSON")
+    parser.add_argument("--save-baseline", help="이번 결과를 기준 JSON으로 저장")
+    parser.add_argument("--threshold", type=float, default=0.2, help="회귀로 판단하는 기준 대비 변화율")
+    return parser.parse_args(argv)
+
+def configure_environment(args: argparse.Namespace) -> List[str]:
+    """config import 전에 벤치마크용 환경 변수 설정. 적용한 조정 사항을 반환"""
+    notes = []
+    os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+    os.environ["JOB_STORE"] = "memory"
+    os.environ["SUMMARY_CACHE_DB_PATH"] = ""
+    if args.vector_store == "local":
+        os.environ["VECTOR_STORE"] = "local"
+        os.environ["VECTOR_STORE_PATH"] = ":memory:"
+    if args.metadata_mode:
+        os.environ["METADATA_EXTRACTION_MODE"] = args.metadata_mode
+    if args.serving_mode:
+        os.environ["SERVING_MODE"] = args.serving_mode
+
+    # chunk 분할은 tiktoken 인코딩 파일이 필요하므로, 받을 수 없는 환경에서는 chunk 인덱싱을 끄고 기록
+    if "CHUNK_INDEXING_ENABLED" not in os.environ:
+        try:
+            import tiktoken
+            tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            os.environ["CHUNK_INDEXING_ENABLED"] = "false"
+            notes.append("tiktoken encoding unavailable: CHUNK_INDEXING_ENABLED=false")
+    return notes
+
+def install_fakes(args: argparse.Namespace, recorder) -> None:
+    """서비스 모듈의 LLM/임베딩/벡터 저장소 클라이언트를 벤치마크용 구현으로 교체"""
+    from benchmarks import fakes
+    from config import QDRANT_URL, EMBEDDING_DIMENSIONS
+    from services import (
+        document_service,
+        embedding_service,
+        extract_keyword,
+        generate_document,
+        generate_summary,
+        qdrant_service,
+        summary_service,
+    )
+    from services.vector_store import AsyncLocalVectorStore
+
+    def latency(spec: str, offset: int) -> "fakes.LatencyModel":
+        return fakes.LatencyModel(spec, seed=args.seed + offset)
+
+    llm = args.llm_latency
+    extract_keyword.structured_llm = fakes.FakeStructuredModel("llm.extract_keywords", fakes.fake_keywords, latency(llm, 1), recorder)
+    extract_keyword.structured_metadata_llm = fakes.FakeStructuredModel("llm.extract_metadata", fakes.fake_metadata, latency(llm, 2), recorder)
+    generate_summary.llm = fakes.FakeChatModel("llm.document_summary", fakes.fake_summary, latency(llm, 3), recorder)
+    generate_document.llm = fakes.FakeChatModel("llm.generate_document", fakes.fake_document, latency(llm, 4), recorder)
+    document_service.llm_with_docs = fakes.FakeChatModel("llm.answer", fakes.fake_answer, latency(llm, 5), recorder)
+    document_service.llm_without_docs = fakes.FakeChatModel("llm.answer", fakes.fake_answer, latency(llm, 6), recorder)
+    summary_service.llm = fakes.FakeChatModel("llm.reference_summary", fakes.fake_reference_summary, latency(llm, 7), recorder)
+    embedding_service._instance = embedding_service.EmbeddingService(
+        encoder=fakes.FakeEmbeddings(EMBEDDING_DIMENSIONS, latency(args.embedding_latency, 8), recorder)
+    )
+
+    if args.vector_store == "local":
+        client = qdrant_service.get_client()
+    else:
+        from qdrant_client import QdrantClient
+        warnings.filterwarnings("ignore", message="Payload indexes have no effect")
+        client = QdrantClient(":memory:")
+    timed = fakes.TimedClient(client, recorder)
+    qdrant_service._clients[(QDRANT_URL, True)] = timed
+    # SERVING_MODE=async에서도 같은 저장소를 사용 (qdrant-memory 모드의 AsyncQdrantClient(":memory:")는 저장소가 분리됨)
+    qdrant_service._async_clients[(QDRANT_URL, True)] = AsyncLocalVectorStore(timed)
+
+def _text(rng: random.Random, chars: int, topic: str) -> str:
+    words = ["API", "설계", "인증", "JWT", "배포", "일정", "회의", "결정", "성능", "캐시", "Qdrant", "임베딩", "리뷰", "테스트"]
+    parts = [topic]
+    while sum(len(part) + 1 for part in parts) < chars:
+        parts.append(rng.choice(words))
+    return " ".join(parts)
+
+def build_payload(endpoint: str, index: int, args: argparse.Namespace, rng: random.Random) -> Dict:
+    """요청마다 내용이 다른 payload (캐시 hit로 측정이 왜곡되지 않도록)"""
+    organization_id = index % 4 + 1
+    if endpoint == "process-document":
+        return {
+            "documentId": 100000 + index,
+            "organizationId": organization_id,
+            "userId": index % 50 + 1,
+            "chatContext": _text(rng, args.doc_chars, f"회의 채팅 {index}"),
+            "createdBy": "benchmark",
+            "createdAt": "2025-06-01T12:00:00Z",
+        }
+    if endpoint == "save-document":
+        return {
+            "documentId": 200000 + index,
+            "organizationId": organization_id,
+            "userId": index % 50 + 1,
+            "content": _text(rng, args.doc_chars, f"개발 문서 {index}"),
+            "createdBy": "benchmark",
+            "createdAt": "2025-06-01T12:00:00Z",
+        }
+    return {
+        "references": [
+            {"title": f"문서 {index}-{ref}", "content": _text(rng, rng.choice((200, args.doc_chars)), f"reference {index}-{ref}")}
+            for ref in range(args.references)
+        ],
+        "userQuery": f"질문 {index}: 우리 팀이 합의한 내용은?",
+        "organizationId": organization_id,
+        "userId": index % 50 + 1,
+    }
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    """초 단위 값의 ms 단위 통계"""
+    if not values:
+        return {}
+    ms = np.asarray(values) * 1000.0
+    return {
+        "count": int(len(ms)),
+        "mean": round(float(ms.mean()), 2),
+        "p50": round(float(np.percentile(ms, 50)), 2),
+        "p95": round(float(np.percentile(ms, 95)), 2),
+        "p99": round(float(np.percentile(ms, 99)), 2),
+        "max": round(float(ms.max()), 2),
+    }
+
+def run_endpoint(app, endpoint: str, args: argparse.Namespace, recorder) -> Dict:
+    rng = random.Random(f"{args.seed}-{endpoint}")
+    payloads = [build_payload(endpoint, index, args, rng) for index in range(args.warmup + args.requests)]
+
+    def call(payload: Dict):
+        client = app.test_client()
+        started = time.perf_counter()
+        response = client.post(f"/api/{endpoint}", json=payload)
+        elapsed = time.perf_counter() - started
+        body = response.get_json(silent=True) or {}
+        return elapsed, response.status_code < 400 and "error" not in body
+
+    for payload in payloads[:args.warmup]:
+        call(payload)
+    recorder.reset()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, args.concurrency)) as executor:
+        results = list(executor.map(call, payloads[args.warmup:]))
+    wall = time.perf_counter() - started
+    # write-behind로 미뤄진 상호작용 저장도 이 엔드포인트의 단계 기록에 포함
+    _drain_memory_writes(close=False)
+
+    latencies = [elapsed for elapsed, ok in results if ok]
+    return {
+        "requests": len(results),
+        "errors": sum(not ok for _, ok in results),
+        "throughput_rps": round(len(latencies) / wall, 2) if wall else 0.0,
+        "latency_ms": percentiles(latencies),
+        "stages": {stage: percentiles(values) for stage, values in sorted(recorder.reset().items())},
+    }
+
+def _drain_memory_writes(close: bool) -> None:
+    from routes import search_route
+    buffer = getattr(search_route.memory_service_instance, "write_buffer", None)
+    if buffer is not None:
+        buffer.close() if close else buffer.join()
+
+def compare(results: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """기준 대비 회귀 목록. 지연은 증가, 처리량은 감소가 threshold를 넘으면 회귀"""
+    if results["config"] != baseline.get("config"):
+        print("warning: benchmark config differs from baseline, comparison may not be meaningful")
+
+    regressions = []
+    print(f"\n{'endpoint':<18} {'metric':<16} {'baseline':>10} {'current':>10} {'change':>8}")
+    for endpoint, current in results["endpoints"].items():
+        base = baseline.get("endpoints", {}).get(endpoint)
+        if not base:
+            continue
+        rows = [(f"latency {metric}", base["latency_ms"].get(metric), current["latency_ms"].get(metric), 1)
+                for metric in LATENCY_METRICS]
+        rows.append(("throughput_rps", base["throughput_rps"], current["throughput_rps"], -1))
+        for name, before, after, direction in rows:
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            flag = ""
+            if change * direction > threshold:
+                flag = "  REGRESSION"
+                regressions.append(f"{endpoint} {name}: {before} -> {after} ({change:+.1%})")
+            print(f"{endpoint:<18} {name:<16} {before:>10} {after:>10} {change:>+8.1%}{flag}")
+        if current["errors"] > base.get("errors", 0):
+            regressions.append(f"{endpoint} errors: {base.get('errors', 0)} -> {current['errors']}")
+    return regressions
+
+def print_report(results: Dict) -> None:
+    for endpoint, result in results["endpoints"].items():
+        latency = result["latency_ms"]
+        print(f"\n[{endpoint}] {result['requests']} requests, {result['errors']} errors, {result['throughput_rps']} req/s")
+        print(f"  latency ms  p50={latency.get('p50')} p95={latency.get('p95')} p99={latency.get('p99')} max={latency.get('max')}")
+        for stage, stats in result["stages"].items():
+            print(f"  {stage:<26} n={stats['count']:<5} p50={stats['p50']:<9} p95={stats['p95']:<9} p99={stats['p99']}")
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    notes = configure_environment(args)
+
+    from benchmarks.fakes import StageRecorder
+    recorder = StageRecorder()
+    install_fakes(args, recorder)
+
+    from app import create_app
+    app = create_app()
+
+    endpoints = [endpoint.strip() for endpoint in args.endpoints.split(",") if endpoint.strip()]
+    results = {
+        "config": {
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "llm_latency": args.llm_latency,
+            "embedding_latency": args.embedding_latency,
+            "vector_store": args.vector_store,
+            "metadata_mode": os.environ.get("METADATA_EXTRACTION_MODE", "split"),
+            "serving_mode": os.environ.get("SERVING_MODE", "sync"),
+            "doc_chars": args.doc_chars,
+            "references": args.references,
+            "chunk_indexing": os.environ.get("CHUNK_INDEXING_ENABLED", "true"),
+        },
+        "environment": {"python": platform.python_version(), "machine": platform.machine(), "notes": notes},
+        "endpoints": {endpoint: run_endpoint(app, endpoint, args, recorder) for endpoint in endpoints},
+    }
+    _drain_memory_writes(close=True)
+    print_report(results)
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(results, f, ensure_ascii=False, indent=2)
+                f.write("\n")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            print("\nRegressions:\n  " + "\n  ".join(regressions))
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,14 +5,157 @@ load_dotenv()
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 LANGCHAIN_MODEL = os.getenv("LANGCHAIN_MODEL", "gpt-3.5-turbo")
+# 역할(generation, extraction, summarization, answering, open_answering)별 모델/temperature. "role=value,..." 형식
+LLM_ROLE_MODELS = os.getenv("LLM_ROLE_MODELS", "")
+LLM_ROLE_TEMPERATURES = os.getenv("LLM_ROLE_TEMPERATURES", "")
+# 모든 LLM/임베딩 요청이 공유하는 HTTP 연결 풀과 timeout
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", 60))
+LLM_CONNECT_TIMEOUT_SECONDS = float(os.getenv("LLM_CONNECT_TIMEOUT_SECONDS", 5))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", 100))
+LLM_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", 20))
+LLM_KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("LLM_KEEPALIVE_EXPIRY_SECONDS", 30))
+# OpenAI SDK 자체 재시도 횟수. 재시도는 utils.resilience에서 요청 예산 안에서 처리하므로 기본값 0
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", 0))
 
 PORT = int(os.getenv("PORT", 8081))
+FLASK_DEBUG = os.getenv("FLASK_DEBUG", "false").lower() in ("1", "true")
+# 요청 처리 방식. sync(기본값): view 스레드에서 LLM/Qdrant 호출 | async: 공유 이벤트 루프에서 ainvoke/async 임베딩/AsyncQdrantClient로 처리
+SERVING_MODE = os.getenv("SERVING_MODE", "sync").lower()
 
 QDRANT_HOST = os.getenv("QDRANT_HOST", "localhost")
 QDRANT_PORT = int(os.getenv("QDRANT_PORT", 6333))
 QDRANT_COLLECTION_NAME = os.getenv("QDRANT_COLLECTION_NAME", "documents")
 QDRANT_API_KEY = os.getenv("QDRANT_API_KEY", "your-qdrant-api-key")
 QDRANT_URL = f"http://{QDRANT_HOST}:{QDRANT_PORT}"
+# 긴 문서를 토큰 단위 chunk로 나눠서 별도 컬렉션에 multi-vector로 저장
+CHUNK_INDEXING_ENABLED = os.getenv("CHUNK_INDEXING_ENABLED", "true").lower() == "true"
+QDRANT_CHUNK_COLLECTION_NAME = os.getenv("QDRANT_CHUNK_COLLECTION_NAME", f"{QDRANT_COLLECTION_NAME}_chunks")
+CHUNK_SIZE_TOKENS = int(os.getenv("CHUNK_SIZE_TOKENS", 400))
+CHUNK_OVERLAP_TOKENS = int(os.getenv("CHUNK_OVERLAP_TOKENS", 50))
+# batch upsert 시 한 번에 보내는 point 수
+QDRANT_UPSERT_BATCH_SIZE = int(os.getenv("QDRANT_UPSERT_BATCH_SIZE", 256))
+# /save-document(s)에서 저장된 문서와 내용 hash, 모델, INGEST_VERSION이 같으면 분석/임베딩을 생략 (메타데이터만 바뀌면 payload만 갱신)
+INGEST_SKIP_UNCHANGED = os.getenv("INGEST_SKIP_UNCHANGED", "true").lower() == "true"
+# 키워드/요약 프롬프트나 chunk 설정 변경 시 값을 올려서 저장된 문서를 다시 분석/임베딩
+INGEST_VERSION = os.getenv("INGEST_VERSION", "1")
+# 벡터 저장소: qdrant(기본값) | local (Qdrant 서버 없이 NumPy memmap 파일에 저장, 소규모 단일 조직 배포/테스트용)
+VECTOR_STORE = os.getenv("VECTOR_STORE", "qdrant").lower()
+# VECTOR_STORE=local 일 때 저장 디렉터리. ":memory:" 이면 파일 없이 메모리에만 저장
+VECTOR_STORE_PATH = os.getenv("VECTOR_STORE_PATH", "vector_store")
+# 검색봇 상호작용 기록 컬렉션
+MEMORY_COLLECTION_NAME = os.getenv("MEMORY_COLLECTION_NAME", "interaction_memory")
+# 메모리 검색 결과 수와 최소 cosine 유사도. 유사도가 낮은 기억은 프롬프트에 넣지 않음
+MEMORY_TOP_K = int(os.getenv("MEMORY_TOP_K", 3))
+MEMORY_SCORE_THRESHOLD = float(os.getenv("MEMORY_SCORE_THRESHOLD", 0.5))
+# 메모리 컬렉션 HNSW 설정. MEMORY_HNSW_PAYLOAD_M > 0 이면 조직/사용자별 그래프도 구성
+MEMORY_HNSW_M = int(os.getenv("MEMORY_HNSW_M", 16))
+MEMORY_HNSW_EF_CONSTRUCT = int(os.getenv("MEMORY_HNSW_EF_CONSTRUCT", 100))
+MEMORY_HNSW_PAYLOAD_M = int(os.getenv("MEMORY_HNSW_PAYLOAD_M", 0))
+# 메모리 검색 시 HNSW ef (클수록 정확하지만 느림)
+MEMORY_SEARCH_HNSW_EF = int(os.getenv("MEMORY_SEARCH_HNSW_EF", 128))
+# 상호작용 저장 write-behind 버퍼. 큐가 가득 차면 새 상호작용은 저장하지 않고 버림
+MEMORY_WRITE_BEHIND_ENABLED = os.getenv("MEMORY_WRITE_BEHIND_ENABLED", "true").lower() == "true"
+MEMORY_WRITE_QUEUE_SIZE = int(os.getenv("MEMORY_WRITE_QUEUE_SIZE", 1000))
+MEMORY_WRITE_BATCH_SIZE = int(os.getenv("MEMORY_WRITE_BATCH_SIZE", 32))
+MEMORY_WRITE_FLUSH_SECONDS = float(os.getenv("MEMORY_WRITE_FLUSH_SECONDS", 1.0))
+# /search-document 의미 기반 응답 캐시. 같은 조직/같은 reference 집합에서 질문 유사도가 threshold 이상이면 응답 재사용
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "true").lower() == "true"
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", 0.95))
+SEMANTIC_CACHE_TTL_SECONDS = int(os.getenv("SEMANTIC_CACHE_TTL_SECONDS", 24 * 3600))
+
+# 임베딩 모델 및 캐시 설정
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-3-large")
+EMBEDDING_DIMENSIONS = int(os.getenv("EMBEDDING_DIMENSIONS", 1024))
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", 64))
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", 10000))
+EMBEDDING_CACHE_MAX_BYTES = int(os.getenv("EMBEDDING_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+
+# 요청 내 LLM 단계 동시 실행 수
+PIPELINE_MAX_WORKERS = int(os.getenv("PIPELINE_MAX_WORKERS", 4))
+# /save-documents 일괄 저장 시 LLM 단계 동시 실행 수와 한 번에 처리하는 문서 수
+INGEST_MAX_WORKERS = int(os.getenv("INGEST_MAX_WORKERS", 8))
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", 64))
+# /process-document 비동기 작업 모드. JOB_STORE: memory(기본값) | sqlite
+JOB_STORE = os.getenv("JOB_STORE", "memory").lower()
+JOB_STORE_PATH = os.getenv("JOB_STORE_PATH", "jobs.db")
+JOB_MAX_WORKERS = int(os.getenv("JOB_MAX_WORKERS", 4))
+JOB_MAX_RETAINED = int(os.getenv("JOB_MAX_RETAINED", 1000))
+# 이 시간(초) 이상 갱신되지 않은 미완료 작업은 재시작한 워커가 다시 실행
+JOB_RESUME_AFTER_SECONDS = int(os.getenv("JOB_RESUME_AFTER_SECONDS", 300))
+# 실행을 맡은 미완료 작업의 updatedAt을 갱신하는 주기(초). JOB_RESUME_AFTER_SECONDS보다 충분히 짧아야 함 (0이면 갱신하지 않음)
+JOB_HEARTBEAT_SECONDS = float(os.getenv("JOB_HEARTBEAT_SECONDS", 30))
+JOB_CALLBACK_TIMEOUT_SECONDS = float(os.getenv("JOB_CALLBACK_TIMEOUT_SECONDS", 10))
+# callbackUrl로 허용할 호스트 목록 (쉼표 구분, ".example.com"은 하위 도메인 포함). 비어 있으면 http/https만 검사
+JOB_CALLBACK_ALLOWED_HOSTS = os.getenv("JOB_CALLBACK_ALLOWED_HOSTS", "")
+# /search-document 서버 검색 모드에서 가져오는 문서 수
+RETRIEVAL_TOP_K = int(os.getenv("RETRIEVAL_TOP_K", 5))
+# /search-document의 reference 요약 및 메모리 검색 동시 실행 수
+SEARCH_MAX_WORKERS = int(os.getenv("SEARCH_MAX_WORKERS", 8))
+
+# /search-document 프롬프트 토큰 예산. CONTEXT_TOKEN_BUDGETS="gpt-4o-mini=12000,gpt-3.5-turbo=3000" 형식으로 모델별 지정
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", 3000))
+CONTEXT_TOKEN_BUDGETS = os.getenv("CONTEXT_TOKEN_BUDGETS", "")
+# 이 토큰 수 이하의 reference는 요약하지 않고 원문을 그대로 사용
+REFERENCE_VERBATIM_MAX_TOKENS = int(os.getenv("REFERENCE_VERBATIM_MAX_TOKENS", 300))
+# 프롬프트에 포함하는 이전 상호작용(메모리) 최대 토큰 수
+MEMORY_CONTEXT_MAX_TOKENS = int(os.getenv("MEMORY_CONTEXT_MAX_TOKENS", 600))
+
+# 문서 메타데이터 추출 방식. split(기본값): 키워드/카테고리와 제목/요약을 각각 호출 | combined: 한 번의 구조화 출력 호출
+METADATA_EXTRACTION_MODE = os.getenv("METADATA_EXTRACTION_MODE", "split").lower()
+
+# reference 요약 캐시. SUMMARY_CACHE_DB_PATH를 지정하면 SQLite 영구 캐시를 함께 사용
+SUMMARY_CACHE_MAX_ENTRIES = int(os.getenv("SUMMARY_CACHE_MAX_ENTRIES", 2048))
+SUMMARY_CACHE_MAX_BYTES = int(os.getenv("SUMMARY_CACHE_MAX_BYTES", 32 * 1024 * 1024))
+SUMMARY_CACHE_TTL_SECONDS = int(os.getenv("SUMMARY_CACHE_TTL_SECONDS", 7 * 24 * 3600))
+SUMMARY_CACHE_DB_PATH = os.getenv("SUMMARY_CACHE_DB_PATH", "")
+# 요약 프롬프트/후처리 변경 시 올려서 기존 캐시를 무효화
+SUMMARY_CACHE_VERSION = os.getenv("SUMMARY_CACHE_VERSION", "1")
+
+# /metrics (Prometheus) 엔드포인트와 요청별 처리 시간 기록 사용 여부
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+
+# 요청별 지연 예산(초). REQUEST_DEADLINES="/api/search-document=20,/api/save-documents=300" 형식으로 경로별 지정 (0이면 예산 없음)
+# 일괄 저장과 스트리밍 응답은 문서 수/응답 길이에 비례해 오래 걸리므로 기본적으로 예산을 두지 않음 (개별 호출 timeout은 적용)
+REQUEST_DEADLINE_SECONDS = float(os.getenv("REQUEST_DEADLINE_SECONDS", 60))
+REQUEST_DEADLINES = os.getenv(
+    "REQUEST_DEADLINES",
+    "/api/save-documents=0,/api/process-document/stream=0,/api/search-document/stream=0",
+)
+# LLM/임베딩/Qdrant 호출의 일시적 오류 재시도: 최대 시도 횟수, full jitter backoff 기준/최대 시간(초)
+RETRY_MAX_ATTEMPTS = int(os.getenv("RETRY_MAX_ATTEMPTS", 3))
+RETRY_BASE_DELAY_SECONDS = float(os.getenv("RETRY_BASE_DELAY_SECONDS", 0.2))
+RETRY_MAX_DELAY_SECONDS = float(os.getenv("RETRY_MAX_DELAY_SECONDS", 2))
+# 응답이 최근 HEDGE_PERCENTILE 지연을 넘긴 호출에 같은 요청을 한 번 더 전송 (비용이 늘어나므로 기본값 false)
+HEDGE_ENABLED = os.getenv("HEDGE_ENABLED", "false").lower() == "true"
+HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", 0.95))
+HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", 20))
+# 의존성(openai, qdrant)별 연속 실패가 이 횟수 이상이면 CIRCUIT_RESET_SECONDS 동안 호출하지 않고 바로 실패
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", 5))
+CIRCUIT_RESET_SECONDS = float(os.getenv("CIRCUIT_RESET_SECONDS", 30))
+# Qdrant 호출 1회 최대 시간(초)과, 남은 예산이 이보다 짧은 호출/hedge 요청을 실행하는 의존성별(OpenAI, Qdrant 각각) 스레드 수
+VECTOR_TIMEOUT_SECONDS = float(os.getenv("VECTOR_TIMEOUT_SECONDS", 10))
+RESILIENCE_MAX_WORKERS = int(os.getenv("RESILIENCE_MAX_WORKERS", 64))
+
+# OpenAI 모델별 호출 한도. RATE_LIMITS="gpt-4o-mini=500:200000,text-embedding-3-large=3000:1000000" (model=RPM:TPM, 비어 있으면 제한 없음)
+RATE_LIMITS = os.getenv("RATE_LIMITS", "")
+# TPM 계산에 사용하는 응답 토큰 추정치
+RATE_LIMIT_COMPLETION_TOKENS = int(os.getenv("RATE_LIMIT_COMPLETION_TOKENS", 500))
+# batch 호출(일괄 저장, 비동기 작업, write-behind)이 interactive 요청용으로 남겨두는 한도 비율
+RATE_LIMIT_INTERACTIVE_RESERVE = float(os.getenv("RATE_LIMIT_INTERACTIVE_RESERVE", 0.2))
+RATE_LIMIT_INTERACTIVE_PATHS = os.getenv(
+    "RATE_LIMIT_INTERACTIVE_PATHS", "/api/search-document,/api/search-document/stream,/api/process-document")
+# 한도 상태 저장소. memory(기본값): 프로세스별 | sqlite: RATE_LIMIT_STORE_PATH 파일을 워커 프로세스들이 공유
+RATE_LIMIT_STORE = os.getenv("RATE_LIMIT_STORE", "memory").lower()
+RATE_LIMIT_STORE_PATH = os.getenv("RATE_LIMIT_STORE_PATH", "rate_limits.db")
+
+# 같은 문서(documentId + 내용)의 /process-document, /save-document와 같은 /search-document 요청이 동시에 들어오면 한 번만 실행하고 결과를 공유
+SINGLE_FLIGHT_ENABLED = os.getenv("SINGLE_FLIGHT_ENABLED", "true").lower() == "true"
+
+# 앱 시작 시 Qdrant 컬렉션 준비 방식. background(기본값): 별도 스레드 | sync: 준비가 끝난 뒤 시작 | off: 처음 사용할 때 준비
+QDRANT_BOOTSTRAP = os.getenv("QDRANT_BOOTSTRAP", "background").lower()
+# /readyz 의존성 확인 제한 시간(초)과 결과 재사용 시간(초)
+READINESS_TIMEOUT_SECONDS = float(os.getenv("READINESS_TIMEOUT_SECONDS", 2))
+READINESS_CACHE_SECONDS = float(os.getenv("READINESS_CACHE_SECONDS", 5))
 
 
 class CATEGORY:
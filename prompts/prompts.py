@@ -1,4 +1,4 @@
-from langchain.prompts import PromptTemplate
+from langchain_core.prompts import PromptTemplate
 
 dev_doc_prompt = PromptTemplate.from_template("""
 [페르소나]
@@ -1,7 +1,12 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, url_for
 import logging
-from services import generate_document, generate_summary, extract_keyword, qdrant_service
+from concurrent.futures import ThreadPoolExecutor
+from services import generate_document, generate_summary, extract_keyword, metadata_service, qdrant_service, document_pipeline, job_service
+from services.pipeline import is_error_result
+from config import SERVING_MODE
+from utils import async_runner, resilience
 from utils.error_handler import handle_error
+from utils.sse import format_sse, sse_response
 from prompts.prompts import dev_doc_prompt, meeting_doc_prompt
 
 document_bp = Blueprint("document", __name__)
@@ -37,83 +42,135 @@ def process_document():
             "createdAt": "2023-10-01T12:00:00Z"
         }
     }
+
+    비동기 모드: payload에 "async": true (또는 ?async=true)를 지정하면 즉시 202와 jobId를 반환.
+    결과는 GET /api/jobs/<jobId>로 조회하며, "callbackUrl"을 지정하면 완료 시 결과를 POST로 전송
+    (callbackUrl은 http/https만 허용하며, JOB_CALLBACK_ALLOWED_HOSTS를 설정하면 해당 호스트만 허용)
+    {
+        "statusCode": 202,
+        "message": "요청이 접수되었습니다",
+        "data": {"jobId": "uuid", "status": "queued", "statusUrl": "/api/jobs/uuid"}
+    }
+
+    "metadataMode": "split" | "combined" 로 메타데이터 추출 방식을 요청별로 지정 (기본값: METADATA_EXTRACTION_MODE)
     """
     try:
         # Extract and validate JSON input
         data = request.get_json(force=True)
-        document_id = data.get("documentId")
-        organization_id = data.get("organizationId")
-        user_id = data.get("userId")
-        chat_context = data.get("chatContext")
-        created_by = data.get("createdBy")
-        created_at = data.get("createdAt", None)
-        
-        if not all([document_id, chat_context, user_id, created_by, created_at]):
-            return handle_error("Missing Fields","생성봇 필수 필드가 누락되었습니다.", 400)
-        
-        # LLM Call 1: Keyword extraction and category classification
-        keywords_category = extract_keyword.extract_keywords_and_category(chat_context)
-        if "error" in keywords_category:
-            return jsonify(keywords_category), keywords_category.get("status_code", 500)
-            
-        keywords = keywords_category.get("keywords")
-        category = keywords_category.get("category")
-
-        print(f"Extracted keywords: {keywords}, Category: {category}")
-        
-
-        # LLM Call 2: Generate Document
-        full_document = generate_document.generate_document(
-            chat_context,
-            category,
-            created_at,
-            created_by,
-            organization_id
-        )
-        if isinstance(full_document, dict) and "error" in full_document:
-            return jsonify(full_document), full_document.get("status_code", 500)
-
-        # LLM Call 3: Generate summary and document content based on category
-        summary_doc = generate_summary.generate_document_summary(chat_context, category)
-        if isinstance(summary_doc, dict) and "error" in summary_doc:
-            return jsonify(summary_doc), summary_doc.get("status_code", 500)
-            
-        title = summary_doc.get("title")
-        summary = summary_doc.get("summary")
-        
-        # Qdrant vector store: Chunk the input, generate embeddings, and store the document
-        qdrant_service.store_document_embedding(
-            document_id,
-            {
-                "title": title,
-                "summary": summary,
-                "document": full_document,
-                "userId": user_id,
-                "createdBy": created_by,
-                "keywords": keywords,
-                "category": category,
-                "organizationId": organization_id,
-                "createdAt": created_at
-            }
-        )
-        
-        # Return response to NestJS Server
-        return jsonify({
-            "statusCode": 200,
-            "message": "성공했습니다",
-            "data": {
-                "documentId": document_id,
-                "organizationId": organization_id,
-                "title": title,
-                "document": full_document,
-                "summary": summary,
-                "userId": user_id,
-                "createdBy": created_by,
-                "category": category,
-                "createdAt": created_at
-            }
-        })
+        fields = document_pipeline.parse_request(data)
+        if fields is None:
+            return jsonify(handle_error("Missing Fields","생성봇 필수 필드가 누락되었습니다.", 400)), 400
+
+        # Async mode: queue the pipeline as a background job and return 202 immediately
+        if data.get("async") or request.args.get("async", "").lower() == "true":
+            if data.get("callbackUrl") is not None:
+                error = job_service.validate_callback_url(data.get("callbackUrl"))
+                if error:
+                    return jsonify(handle_error("Invalid Field", error, 400)), 400
+            job = job_service.get_job_runner().submit("process-document", fields, data.get("callbackUrl"))
+            return jsonify({
+                "statusCode": 202,
+                "message": "요청이 접수되었습니다",
+                "data": {
+                    "jobId": job["jobId"],
+                    "status": job["status"],
+                    "statusUrl": url_for("job.get_job", job_id=job["jobId"])
+                }
+            }), 202
+
+        # Run the LLM stages and store the document, then return response to NestJS Server
+        if SERVING_MODE == "async":
+            body, status_code = async_runner.run(document_pipeline.aprocess_document(fields))
+        else:
+            body, status_code = document_pipeline.process_document(fields)
+        return jsonify(body), status_code
     except Exception as e:
         logging.exception("Error processing document")
-        error_response = handle_error("/process-document failed", "LLM 응답 생성에 실패했습니다.", 500)
-        return jsonify(error_response), 500
+        status_code = resilience.error_status(e)
+        error_response = handle_error("/process-document failed", "LLM 응답 생성에 실패했습니다.", status_code)
+        return jsonify(error_response), status_code
+
+@document_bp.route("/process-document/stream", methods=["POST"])
+def process_document_stream():
+    """
+    @생성봇 스트리밍 : /process-document와 같은 입력을 받아 생성되는 문서 토큰을 SSE(text/event-stream)로 전송.
+    문서 생성 중에 요약은 동시에 생성되며, 스트림이 끝나면 Qdrant 저장 후 최종 결과를 전송
+
+    이벤트 예시:
+    event: metadata
+    data: {"keywords": ["JWT"], "category": "DEV_DOC"}
+
+    event: token
+    data: {"token": "## API 설계"}
+
+    event: done
+    data: {"statusCode": 200, "message": "성공했습니다", "data": {...process-document와 같은 data...}}
+
+    실패 시 error 이벤트로 handle_error 형식의 메시지를 전송
+    """
+    try:
+        fields = document_pipeline.parse_request(request.get_json(force=True))
+        if fields is None:
+            return jsonify(handle_error("Missing Fields","생성봇 필수 필드가 누락되었습니다.", 400)), 400
+    except Exception as e:
+        logging.exception("Error processing document")
+        return jsonify(handle_error("/process-document failed", "LLM 응답 생성에 실패했습니다.", 500)), 500
+
+    def generate():
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="summary")
+        try:
+            chat_context = fields["chat_context"]
+
+            # LLM Call 1: Keyword extraction and category classification
+            extracted = metadata_service.extract_metadata(chat_context, fields.get("metadata_mode"))
+            if is_error_result(extracted):
+                yield format_sse(extracted, event="error")
+                return
+            category = extracted.get("category")
+            yield format_sse({"keywords": extracted.get("keywords"), "category": category}, event="metadata")
+
+            formatted_prompt = generate_document.format_document_prompt(
+                chat_context,
+                category,
+                fields["created_at"],
+                fields["created_by"],
+                fields["organization_id"]
+            )
+            if isinstance(formatted_prompt, dict):
+                yield format_sse(formatted_prompt, event="error")
+                return
+
+            # LLM Call 3 runs while LLM Call 2 streams
+            summary_future = executor.submit(metadata_service.summarize, chat_context, extracted)
+
+            parts = []
+            for token in generate_document.stream_document(formatted_prompt):
+                parts.append(token)
+                yield format_sse({"token": token}, event="token")
+            full_document = "".join(parts)
+
+            summary_doc = summary_future.result()
+            if is_error_result(summary_doc):
+                yield format_sse(summary_doc, event="error")
+                return
+
+            stored = qdrant_service.store_document_embedding(
+                fields["document_id"],
+                document_pipeline.build_store_payload(fields, extracted, full_document, summary_doc)
+            )
+            if is_error_result(stored):
+                yield format_sse(stored, event="error")
+                return
+
+            yield format_sse({
+                "statusCode": 200,
+                "message": "성공했습니다",
+                "data": document_pipeline.build_response_data(fields, extracted, full_document, summary_doc)
+            }, event="done")
+        except Exception:
+            logging.exception("Error streaming document")
+            yield format_sse(handle_error("/process-document failed", "LLM 응답 생성에 실패했습니다.", 500), event="error")
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    return sse_response(generate())
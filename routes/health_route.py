@@ -0,0 +1,38 @@
+from flask import Blueprint, jsonify
+from services import health_service
+from utils.error_handler import handle_error
+
+health_bp = Blueprint("health", __name__)
+
+@health_bp.route("/healthz", methods=["GET"])
+def healthz():
+    """
+    liveness 엔드포인트. 프로세스가 요청을 처리할 수 있으면 의존성 상태와 관계없이 200
+    """
+    return jsonify({"statusCode": 200, "message": "성공했습니다"}), 200
+
+@health_bp.route("/readyz", methods=["GET"])
+def readyz():
+    """
+    readiness 엔드포인트. 벡터 저장소, LLM 설정, 작업 저장소를 확인하여 모두 정상이면 200, 아니면 503
+
+    응답 예시:
+    {
+        "error": "Not Ready",
+        "message": "의존성 확인에 실패했습니다.",
+        "status_code": 503,
+        "data": {
+            "ready": false,
+            "checks": {
+                "vectorStore": {"status": "timeout"},
+                "llm": {"status": "ok"},
+                "jobs": {"status": "ok"}
+            }
+        }
+    }
+    """
+    result = health_service.get_readiness_probe().check()
+    if result["ready"]:
+        return jsonify({"statusCode": 200, "message": "성공했습니다", "data": result}), 200
+
+    return jsonify({**handle_error("Not Ready", "의존성 확인에 실패했습니다.", 503), "data": result}), 503
@@ -0,0 +1,50 @@
+from flask import Blueprint, jsonify
+import logging
+from services import job_service
+from utils.error_handler import handle_error
+
+job_bp = Blueprint("job", __name__)
+logger = logging.getLogger(__name__)
+
+@job_bp.route("/jobs/<job_id>", methods=["GET"])
+def get_job(job_id):
+    """
+    비동기 작업 상태 및 결과 조회 엔드포인트
+
+    응답 예시:
+    {
+        "statusCode": 200,
+        "message": "성공했습니다",
+        "data": {
+            "jobId": "uuid",
+            "kind": "process-document",
+            "status": "succeeded",
+            "result": {...동기 요청과 같은 응답 body...},
+            "resultStatusCode": 200,
+            "createdAt": "2025-06-01T00:00:00+00:00",
+            "updatedAt": "2025-06-01T00:00:20+00:00"
+        }
+    }
+    status: queued | running | succeeded | failed
+    """
+    try:
+        job = job_service.get_job_runner().get(job_id)
+        if job is None:
+            return jsonify(handle_error("Job Not Found", "해당 작업을 찾을 수 없습니다.", 404)), 404
+
+        return jsonify({
+            "statusCode": 200,
+            "message": "성공했습니다",
+            "data": {
+                "jobId": job["jobId"],
+                "kind": job["kind"],
+                "status": job["status"],
+                "result": job["result"],
+                "resultStatusCode": job["statusCode"],
+                "createdAt": job["createdAt"],
+                "updatedAt": job["updatedAt"]
+            }
+        }), 200
+    except Exception as e:
+        logger.exception("Error in /jobs")
+        return jsonify(handle_error("/jobs failed", "작업 조회에 실패했습니다.", 500)), 500
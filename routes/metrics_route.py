@@ -0,0 +1,18 @@
+from flask import Blueprint, Response
+from utils import metrics
+
+metrics_bp = Blueprint("metrics", __name__)
+
+@metrics_bp.route("/metrics", methods=["GET"])
+def get_metrics():
+    """
+    Prometheus scrape 엔드포인트 (text exposition format 0.0.4)
+
+    주요 메트릭:
+    - docflow_http_request_seconds{endpoint,method,status}
+    - docflow_stage_seconds{pipeline,stage,status} : /process-document 단계(extract, document, summary, store)별 시간
+    - docflow_llm_request_seconds{prompt,model,status}, docflow_llm_tokens_total{prompt,model,type}
+    - docflow_embedding_request_seconds{model,status}, docflow_vector_operation_seconds{operation,status}
+    - docflow_cache_requests_total{cache,result}, docflow_fallbacks_total{stage,reason}
+    """
+    return Response(metrics.REGISTRY.render(), mimetype="text/plain; version=0.0.4; charset=utf-8")
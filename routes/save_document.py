@@ -1,16 +1,17 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+import json
 import logging
 from datetime import datetime
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain.chains.summarize import load_summarize_chain
-from langchain_openai import OpenAI
 from services import qdrant_service  # your custom service layer
-from services import extract_keyword, generate_summary
+from services import extract_keyword, generate_summary, metadata_service, ingest_service
+from services.pipeline import is_error_result
 from utils.error_handler import handle_error
+from utils.single_flight import SingleFlight, content_hash
 
 
 save_bp = Blueprint("save", __name__)
 logger = logging.getLogger(__name__)
+save_flights = SingleFlight("save-document")
 
 @save_bp.route("/save-document", methods=["POST"])
 def save_document():
@@ -30,59 +31,156 @@ def save_document():
     응답 예시:
     {
         "statusCode": 200,
-        "message": "성공했습니다"
+        "message": "성공했습니다",
+        "data": {"documentId": 123, "status": "stored"}
     }
+
+    status: stored(분석 후 저장) | updated(내용이 같아 메타데이터만 갱신) | unchanged(저장된 문서와 같아 생략)
     """
     try:
         # 1. reqeust 데이터 파싱
         data = request.get_json(force=True)
         logger.info(f"Received request data: {data}")
 
+        # 재시도로 같은 문서가 동시에 들어오면 한 번만 분석/저장하고 결과를 공유
         document_id = int(data.get("documentId"))
-        organization_id = data.get("organizationId")
-        chat_context = data.get("content")
-        user_id = data.get("userId")
-        created_by = data.get("createdBy")
-        created_at = data.get("createdAt")
-
-        logger.info(f"Parsed data: document_id={document_id}, organization_id={organization_id}, user_id={user_id}")
-
-        # 2. 키워드 및 카테고리 추출
-        keywords_category = extract_keyword.extract_keywords_and_category(chat_context)
-        keywords = keywords_category.get("keywords")
-        category = keywords_category.get("category")
-        logger.info(f"Extracted keywords: {keywords}, category: {category}")
-
-        # 3. summary 생성
-        summary_doc = generate_summary.generate_document_summary(chat_context, category)
-        title = summary_doc.get("title")
-        summary = summary_doc.get("summary")
-        logger.info(f"Generated summary: title={title}")
-
-        # 4. qdrant에 문서 임베딩 저장
-        qdrant_service.store_document_embedding(
-            document_id,
-            {
-                "title": title,
-                "summary": summary,
-                "document": chat_context,
-                "userId": user_id,
-                "createdBy": created_by,
-                "keywords": keywords,
-                "category": category,
-                "organizationId": organization_id,
-                "createdAt": created_at
-            }
-        )
-        logger.info("Successfully stored document in Qdrant")
+        status = save_flights.do(f"{document_id}:{content_hash(data)}", lambda: _save_document(data))
+        if is_error_result(status):
+            return jsonify(status), status["status_code"]
 
         # 5. 성공했을 경우 응답
         return jsonify({
             "statusCode": 200,
             "message": "성공했습니다",
+            "data": {"documentId": document_id, "status": status}
         })
 
     except Exception as e:
         logger.exception("Failed to save document")
         return handle_error("/process-document failed", "LLM 응답 생성에 실패했습니다.", 500)
-    
\ No newline at end of file
+
+
+def _save_document(data: dict):
+    """
+    키워드/카테고리 추출, 요약 생성 후 Qdrant에 저장. 저장된 문서와 내용이 같으면 생략하고 결과 status를 반환.
+    분석이나 저장에 실패하면 저장하지 않고 handle_error 형식의 dict를 반환
+    """
+    document_id = int(data.get("documentId"))
+    organization_id = data.get("organizationId")
+    chat_context = data.get("content")
+    user_id = data.get("userId")
+    created_by = data.get("createdBy")
+    created_at = data.get("createdAt")
+
+    logger.info(f"Parsed data: document_id={document_id}, organization_id={organization_id}, user_id={user_id}")
+
+    # 자동 저장 등으로 내용이 같은 문서가 다시 들어오면 LLM 분석과 임베딩을 생략 (메타데이터만 바뀌면 payload만 갱신)
+    skipped = ingest_service.skip_unchanged([{**data, "documentId": document_id}])
+    if skipped:
+        logger.info(f"Document {document_id} is {skipped[0]}, skipping analysis and embedding")
+        return skipped[0]
+
+    # 2. 키워드 및 카테고리 추출 (combined 모드에서는 제목/요약까지 한 번에 추출)
+    keywords_category = metadata_service.extract_metadata(chat_context, data.get("metadataMode"))
+    # 분석에 실패한 문서를 저장하면 contentHash가 같아 재시도가 unchanged로 생략되므로 저장하지 않음
+    if is_error_result(keywords_category):
+        logger.error(f"Failed to extract metadata of document {document_id}: {keywords_category.get('message')}")
+        return keywords_category
+    keywords = keywords_category.get("keywords")
+    category = keywords_category.get("category")
+    logger.info(f"Extracted keywords: {keywords}, category: {category}")
+
+    # 3. summary 생성
+    summary_doc = metadata_service.summarize(chat_context, keywords_category)
+    if is_error_result(summary_doc):
+        logger.error(f"Failed to summarize document {document_id}: {summary_doc.get('message')}")
+        return summary_doc
+    title = summary_doc.get("title")
+    summary = summary_doc.get("summary")
+    logger.info(f"Generated summary: title={title}")
+
+    # 4. qdrant에 문서 임베딩 저장
+    stored = qdrant_service.store_document_embedding(
+        document_id,
+        {
+            "title": title,
+            "summary": summary,
+            "document": chat_context,
+            "userId": user_id,
+            "createdBy": created_by,
+            "keywords": keywords,
+            "category": category,
+            "organizationId": organization_id,
+            "createdAt": created_at
+        }
+    )
+    if is_error_result(stored):
+        logger.error(f"Failed to store document {document_id}: {stored.get('message')}")
+        return stored
+    logger.info("Successfully stored document in Qdrant")
+    return "stored"
+
+
+@save_bp.route("/save-documents", methods=["POST"])
+def save_documents():
+    """
+    @문서 일괄 저장 엔드포인트 : 여러 문서를 한 번에 받아 키워드 추출, 요약, 임베딩 및 Qdrant 저장을 batch로 수행
+
+    JSON Payload 예시:
+    {
+        "documents": [
+            {
+                "documentId": 123,
+                "organizationId": 456,
+                "content": "문서 내용",
+                "userId": 789,
+                "createdBy": "사용자 이름",
+                "createdAt": "2023-10-01T12:00:00Z"
+            }
+        ],
+        "stream": false,
+        "metadataMode": "split"
+    }
+
+    응답 예시:
+    {
+        "statusCode": 200,
+        "message": "성공했습니다",
+        "data": {
+            "total": 1,
+            "stored": 1,
+            "failed": 0,
+            "results": [{"documentId": 123, "status": "stored"}]
+        }
+    }
+
+    "stream": true 인 경우 문서별 결과를 NDJSON(application/x-ndjson)으로 순차 전송하고,
+    마지막 줄에 {"type": "summary", ...} 집계를 전송
+    """
+    try:
+        data = request.get_json(force=True)
+        documents = data.get("documents")
+        if not isinstance(documents, list) or not documents:
+            return jsonify(handle_error("Missing Fields", "documents 목록이 누락되었습니다.", 400)), 400
+
+        logger.info(f"Received bulk save request: {len(documents)} documents")
+        metadata_mode = data.get("metadataMode")
+
+        if data.get("stream"):
+            def generate():
+                for event in ingest_service.iter_ingest_documents(documents, metadata_mode=metadata_mode):
+                    yield json.dumps(event, ensure_ascii=False) + "\n"
+
+            return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+        result = ingest_service.ingest_documents(documents, metadata_mode=metadata_mode)
+        logger.info(f"Bulk save finished: stored={result['stored']}, failed={result['failed']}")
+        return jsonify({
+            "statusCode": 200,
+            "message": "성공했습니다",
+            "data": result
+        })
+
+    except Exception as e:
+        logger.exception("Failed to save documents")
+        return jsonify(handle_error("/save-documents failed", "문서 일괄 저장에 실패했습니다.", 500)), 500
@@ -1,14 +1,33 @@
 from flask import Blueprint, request, jsonify
+import asyncio
 import logging
-from services import document_service, summary_service, qdrant_service, memory_service
+import threading
+from datetime import datetime
+from services import document_service, summary_service, qdrant_service, memory_service, retrieval_service, context_packer, answer_cache, llm_registry
+from services.pipeline import arun_concurrently, is_error_result, run_concurrently
+from config import SEARCH_MAX_WORKERS, RETRIEVAL_TOP_K, MEMORY_CONTEXT_MAX_TOKENS, SERVING_MODE
+from utils import async_runner, resilience
 from utils.error_handler import handle_error
+from utils.sse import format_sse, sse_response
+from utils.single_flight import SingleFlight, content_hash
 from prompts.prompts import summary_prompt, answer_prompt, without_docs_answer_prompt
 
 search_bp = Blueprint("search", __name__)
 logger = logging.getLogger(__name__)
 
-# Initialize memory service
-memory_service_instance = memory_service.MemoryService(qdrant_service.get_client())
+# memory service는 첫 검색 요청에서 생성 (Qdrant가 내려가 있어도 앱은 뜨고, 복구 후 첫 요청에서 다시 시도)
+memory_service_instance = None
+_memory_lock = threading.Lock()
+answer_cache_instance = answer_cache.SemanticAnswerCache()
+search_flights = SingleFlight("search-document")
+
+def get_memory_service() -> memory_service.MemoryService:
+    global memory_service_instance
+    if memory_service_instance is None:
+        with _memory_lock:
+            if memory_service_instance is None:
+                memory_service_instance = memory_service.MemoryService(qdrant_service.get_client())
+    return memory_service_instance
 
 @search_bp.route("/search-document", methods=["POST"])
 def search_document():
@@ -22,6 +41,22 @@ def search_document():
             {"title": "문서 제목 2", "content": "문서 내용 2"},
             {"title": "문서 제목 3", "content": "문서 내용 3"}
         ],
+        "userQuery": "사용자 질문",
+        "organizationId": 456,
+        "userId": 789
+    }
+
+    organizationId/userId를 지정하면 해당 범위의 이전 상호작용만 참고하고, 상호작용도 해당 범위로 저장.
+    organizationId가 있으면 같은 조직에서 같은 reference 집합으로 한 유사한 질문의 응답을 재사용
+
+    서버 검색 모드 Payload 예시 (references 대신 documents 컬렉션에서 직접 검색):
+    {
+        "retrieval": "server",
+        "organizationId": 456,
+        "category": "DEV_DOC",
+        "createdFrom": "2025-01-01T00:00:00Z",
+        "createdTo": "2025-12-31T23:59:59Z",
+        "topK": 5,
         "userQuery": "사용자 질문"
     }
     
@@ -33,80 +68,409 @@ def search_document():
             "ragResponse": "RAG 응답 내용"
         }
     }
+
+    서버 검색 모드에서는 data.references에 검색된 문서 목록({"documentId", "title", "score"})을 함께 반환
     """
     try:
-        # 1) JSON 추출 및 필수 필드 검증
         data = request.get_json(force=True)
-        references = data.get("references")
-        user_query = data.get("userQuery")
+        # 같은 요청이 동시에 들어오면 한 번만 처리하고 결과를 공유 (상호작용도 한 번만 저장)
+        key = content_hash(data)
+        if SERVING_MODE == "async":
+            body, status_code = async_runner.run(search_flights.ado(key, lambda: _asearch_document(data)))
+        else:
+            body, status_code = search_flights.do(key, lambda: _search_document(data))
+        return jsonify(body), status_code
 
-        if not user_query:
-            return handle_error(
-                "Missing Field",
-                "userQuery가 누락되었습니다.",
-                400
-            )
-
-        # 2) 관련 메모리 검색
-        relevant_memories = memory_service_instance.retrieve_relevant_memories(user_query)
-        memory_context = memory_service_instance.format_memories_for_prompt(relevant_memories)
-
-        # 3) 문서별 요약 생성
-        if references:
-            summarized_docs = []
-            for ref in references:
-                title = ref.get("title")
-                content = ref.get("content")
-
-                if not title or not content:
-                    return handle_error(
-                        "Invalid Reference Item",
-                        "reference에는 title과 content가 모두 포함되어야 합니다.",
-                        400
-                    )
-
-                summary = summary_service.summarize_content(
-                    content.strip(),
-                    summary_prompt
-                )
-                summarized_docs.append(f"# {title}\n{summary}")
+    except Exception as e:
+        logger.exception("Error in /search-document")
+        status_code = resilience.error_status(e)
+        return jsonify(handle_error(
+            "/search-document failed",
+            "RAG 응답 생성에 실패했습니다.",
+            status_code
+        )), status_code
 
-            # 4) 요약된 문서 합치고 RAG 응답 생성
-            combined_summary = "\n\n".join(summarized_docs)
-            rag_response = document_service.answer_question_with_summary(
-                combined_summary,
-                user_query.strip(),
-                answer_prompt,
-                memory_context=memory_context
-            )
+@search_bp.route("/search-document/stream", methods=["POST"])
+def search_document_stream():
+    """
+    @검색봇 스트리밍 : /search-document와 같은 입력을 받아 RAG 응답 토큰을 SSE(text/event-stream)로 전송
 
-        else:
-            rag_response = document_service.answer_question_without_docs(
-                user_query.strip(),
-                without_docs_answer_prompt
-            )
-
-        # 5) 상호작용 저장
-        memory_service_instance.store_interaction(
-            query=user_query,
-            response=rag_response,
-            metadata={"has_references": bool(references)}
-        )
-       
-        # 6) 결과 반환
-        return jsonify({
-            "statusCode": 200,
-            "message": "성공했습니다",
-            "data": {
-                "ragResponse": rag_response
-            }
-        }), 200
+    이벤트 예시:
+    event: token
+    data: {"token": "JWT"}
+
+    event: done
+    data: {"statusCode": 200, "message": "성공했습니다", "data": {"ragResponse": "전체 응답"}}
 
+    실패 시 error 이벤트로 handle_error 형식의 메시지를 전송
+    """
+    try:
+        data = request.get_json(force=True)
+        context, error = _prepare_search(data)
+        if error:
+            return jsonify(error[0]), error[1]
     except Exception as e:
-        logger.exception("Error in /search-document")
-        return handle_error(
+        logger.exception("Error in /search-document/stream")
+        return jsonify(handle_error(
             "/search-document failed",
             "RAG 응답 생성에 실패했습니다.",
             500
+        )), 500
+
+    def generate():
+        try:
+            if context["cached_response"] is not None:
+                tokens = iter([context["cached_response"]])
+            elif context["combined_summary"]:
+                tokens = document_service.stream_answer_with_summary(
+                    context["combined_summary"],
+                    context["user_query"],
+                    answer_prompt,
+                    memory_context=context["memory_context"]
+                )
+            else:
+                tokens = document_service.stream_answer_without_docs(
+                    context["user_query"],
+                    without_docs_answer_prompt
+                )
+
+            parts = []
+            for token in tokens:
+                parts.append(token)
+                yield format_sse({"token": token}, event="token")
+            rag_response = "".join(parts)
+        except Exception:
+            logger.exception("Error streaming /search-document")
+            yield format_sse(handle_error(
+                "/search-document failed",
+                "RAG 응답 생성에 실패했습니다.",
+                500
+            ), event="error")
+            return
+
+        # 스트림이 끝난 뒤 상호작용 저장
+        if context["cached_response"] is None:
+            try:
+                _store_interaction(context, rag_response)
+            except Exception:
+                logger.exception("Failed to store interaction after streaming")
+
+        yield format_sse({
+            "statusCode": 200,
+            "message": "성공했습니다",
+            "data": _response_data(context, rag_response)
+        }, event="done")
+
+    return sse_response(generate())
+
+def _prepare_search(data: dict):
+    """
+    검색 요청 검증, reference 검색/요약 및 메모리 검색까지 수행.
+    응답 캐시에 hit하면 요약과 메모리 검색은 생략하고 context["cached_response"]에 응답을 담음.
+    (context, None) 또는 (None, (에러 body, status code))를 반환
+    """
+    # 1) 필수 필드 검증
+    fields, error = _search_fields(data)
+    if error:
+        return None, error
+
+    # 2) 서버 검색 모드: documents 컬렉션에서 직접 reference 검색
+    references = data.get("references")
+    if fields["server_retrieval"]:
+        references = _retrieve_references(fields, data)
+
+    context, error = _new_context(fields, references)
+    if error:
+        return None, error
+
+    # 같은 조직에서 같은 reference 집합으로 거의 같은 질문을 한 적이 있으면 그 응답을 재사용
+    memory = get_memory_service()
+    context["cached_response"] = answer_cache_instance.lookup(
+        memory,
+        context["user_query"],
+        context["organization_id"],
+        context["refs_hash"]
+    )
+    if context["cached_response"] is not None:
+        return context, None
+
+    # 3) 관련 메모리 검색과 reference 컨텍스트 구성을 동시에 실행.
+    # reference는 토큰 예산 안에서 질문과 관련도가 높은 순으로 선택하고, 긴 문서만 요약
+    user_query = fields["raw_query"]
+    model = llm_registry.role_model("answering")
+    budget = context_packer.reference_budget(answer_prompt, user_query, MEMORY_CONTEXT_MAX_TOKENS, model)
+    memories_result, packed = run_concurrently([
+        lambda: memory.retrieve_relevant_memories(
+            user_query,
+            organization_id=context["organization_id"],
+            user_id=context["user_id"]
+        ),
+        lambda: context_packer.pack_references(
+            user_query,
+            context["references"],
+            lambda content: summary_service.summarize_content(content, summary_prompt),
+            budget,
+            model=model,
+            max_workers=SEARCH_MAX_WORKERS
+        ),
+    ], max_workers=2)
+    return _complete_context(context, memories_result, packed)
+
+async def _aprepare_search(data: dict):
+    """_prepare_search의 비동기 버전 (SERVING_MODE=async)"""
+    fields, error = _search_fields(data)
+    if error:
+        return None, error
+
+    references = data.get("references")
+    if fields["server_retrieval"]:
+        references = await asyncio.to_thread(_retrieve_references, fields, data)
+
+    context, error = _new_context(fields, references)
+    if error:
+        return None, error
+
+    memory = await asyncio.to_thread(get_memory_service)
+    context["cached_response"] = await answer_cache_instance.alookup(
+        memory,
+        context["user_query"],
+        context["organization_id"],
+        context["refs_hash"]
+    )
+    if context["cached_response"] is not None:
+        return context, None
+
+    user_query = fields["raw_query"]
+    model = llm_registry.role_model("answering")
+    budget = context_packer.reference_budget(answer_prompt, user_query, MEMORY_CONTEXT_MAX_TOKENS, model)
+    memories_result, packed = await arun_concurrently([
+        lambda: memory.aretrieve_relevant_memories(
+            user_query,
+            organization_id=context["organization_id"],
+            user_id=context["user_id"]
+        ),
+        lambda: context_packer.apack_references(
+            user_query,
+            context["references"],
+            lambda content: summary_service.asummarize_content(content, summary_prompt),
+            budget,
+            model=model,
+            max_workers=SEARCH_MAX_WORKERS
+        ),
+    ], max_workers=2)
+    return _complete_context(context, memories_result, packed)
+
+def _search_document(data: dict):
+    """/search-document 처리 전체. (응답 body, status code)를 반환"""
+    context, error = _prepare_search(data)
+    if error:
+        return error
+
+    # 4) 요약된 문서 합치고 RAG 응답 생성 (캐시된 응답이 있으면 재사용)
+    if context["cached_response"] is not None:
+        rag_response = context["cached_response"]
+
+    elif context["combined_summary"]:
+        rag_response = document_service.answer_question_with_summary(
+            context["combined_summary"],
+            context["user_query"],
+            answer_prompt,
+            memory_context=context["memory_context"]
         )
 
+    else:
+        rag_response = document_service.answer_question_without_docs(
+            context["user_query"],
+            without_docs_answer_prompt
+        )
+
+    # 지연 예산 초과(504)나 circuit open(503)으로 응답을 만들지 못하면 그대로 반환하고 상호작용은 저장하지 않음
+    if _unavailable(rag_response):
+        return rag_response, rag_response["status_code"]
+
+    # 5) 상호작용 저장
+    if context["cached_response"] is None:
+        _store_interaction(context, rag_response)
+
+    # 6) 결과 반환
+    return {
+        "statusCode": 200,
+        "message": "성공했습니다",
+        "data": _response_data(context, rag_response)
+    }, 200
+
+async def _asearch_document(data: dict):
+    """/search-document 처리 전체를 이벤트 루프에서 실행. (응답 body, status code)를 반환"""
+    context, error = await _aprepare_search(data)
+    if error:
+        return error
+
+    if context["cached_response"] is not None:
+        rag_response = context["cached_response"]
+    elif context["combined_summary"]:
+        rag_response = await document_service.aanswer_question_with_summary(
+            context["combined_summary"],
+            context["user_query"],
+            answer_prompt,
+            memory_context=context["memory_context"]
+        )
+    else:
+        rag_response = await document_service.aanswer_question_without_docs(
+            context["user_query"],
+            without_docs_answer_prompt
+        )
+
+    if _unavailable(rag_response):
+        return rag_response, rag_response["status_code"]
+
+    # write-behind를 쓰지 않으면 저장이 동기 임베딩/upsert이므로 worker 스레드에서 실행
+    if context["cached_response"] is None:
+        await asyncio.to_thread(_store_interaction, context, rag_response)
+
+    return {
+        "statusCode": 200,
+        "message": "성공했습니다",
+        "data": _response_data(context, rag_response)
+    }, 200
+
+def _unavailable(rag_response) -> bool:
+    return is_error_result(rag_response) and rag_response.get("status_code") in (503, 504)
+
+def _search_fields(data: dict):
+    """요청 필드 검증. (fields, None) 또는 (None, (에러 body, status code))"""
+    user_query = data.get("userQuery")
+    if not user_query:
+        return None, (handle_error(
+            "Missing Field",
+            "userQuery가 누락되었습니다.",
+            400
+        ), 400)
+
+    # 메모리는 요청한 조직/사용자 범위에서만 검색하고 저장
+    fields = {
+        "raw_query": user_query,
+        "organization_id": data.get("organizationId"),
+        "user_id": data.get("userId"),
+        "server_retrieval": data.get("retrieval") == "server",
+    }
+    if fields["server_retrieval"]:
+        if fields["organization_id"] is None:
+            return None, (handle_error(
+                "Missing Field",
+                "서버 검색 모드에는 organizationId가 필요합니다.",
+                400
+            ), 400)
+
+        try:
+            fields["top_k"] = RETRIEVAL_TOP_K if data.get("topK") is None else int(data.get("topK"))
+        except (TypeError, ValueError):
+            fields["top_k"] = 0
+        if fields["top_k"] < 1:
+            return None, (handle_error(
+                "Invalid Field",
+                "topK는 1 이상의 정수여야 합니다.",
+                400
+            ), 400)
+
+        for name in ("createdFrom", "createdTo"):
+            if data.get(name) is not None and not _is_datetime(data.get(name)):
+                return None, (handle_error(
+                    "Invalid Field",
+                    f"{name}는 ISO 8601 형식의 날짜/시간이어야 합니다.",
+                    400
+                ), 400)
+    return fields, None
+
+def _is_datetime(value) -> bool:
+    """Qdrant DatetimeRange에 넣을 수 있는 ISO 8601 문자열인지 확인"""
+    if not isinstance(value, str):
+        return False
+    try:
+        datetime.fromisoformat(value.strip())
+    except ValueError:
+        return False
+    return True
+
+def _retrieve_references(fields: dict, data: dict):
+    return retrieval_service.retrieve_references(
+        fields["raw_query"].strip(),
+        fields["organization_id"],
+        category=data.get("category"),
+        created_from=data.get("createdFrom"),
+        created_to=data.get("createdTo"),
+        limit=fields["top_k"]
+    )
+
+def _new_context(fields: dict, references):
+    """reference 검증 후 검색 context 생성. (context, None) 또는 (None, (에러 body, status code))"""
+    references = references or []
+    for ref in references:
+        if not ref.get("title") or not ref.get("content"):
+            return None, (handle_error(
+                "Invalid Reference Item",
+                "reference에는 title과 content가 모두 포함되어야 합니다.",
+                400
+            ), 400)
+
+    return {
+        "user_query": fields["raw_query"].strip(),
+        "raw_query": fields["raw_query"],
+        "references": references,
+        "server_retrieval": fields["server_retrieval"],
+        "organization_id": fields["organization_id"],
+        "user_id": fields["user_id"],
+        "refs_hash": answer_cache.references_hash(references),
+        "memory_context": "",
+        "combined_summary": "",
+    }, None
+
+def _complete_context(context: dict, memories_result, packed):
+    """메모리 검색/reference 구성 결과를 context에 반영"""
+    if isinstance(packed, BaseException):
+        raise packed
+
+    if isinstance(memories_result, BaseException):
+        logger.warning(f"Memory retrieval failed, answering without memory context: {memories_result}")
+        memories_result = []
+    memory_context = context_packer.truncate_to_tokens(
+        get_memory_service().format_memories_for_prompt(memories_result),
+        MEMORY_CONTEXT_MAX_TOKENS
+    )
+
+    # 요약에 실패한 reference만 제외되며, 모든 reference가 실패한 경우에만 에러
+    if context["references"] and not packed["included"] and packed["failed"]:
+        return None, (handle_error(
+            "Summarization Failed",
+            "문서 요약 생성에 실패했습니다.",
+            500
+        ), 500)
+    # 질문이 너무 길어 reference를 하나도 넣을 수 없으면 문서 없이 답하지 않고 에러
+    if context["references"] and not packed["included"]:
+        return None, (handle_error(
+            "Context Budget Exceeded",
+            "질문이 너무 길어 참고 문서를 포함할 수 없습니다.",
+            413
+        ), 413)
+
+    context["memory_context"] = memory_context
+    context["combined_summary"] = packed["text"]
+    return context, None
+
+def _store_interaction(context: dict, rag_response) -> None:
+    get_memory_service().store_interaction(
+        query=context["raw_query"],
+        response=rag_response,
+        metadata={"has_references": bool(context["references"])},
+        organization_id=context["organization_id"],
+        user_id=context["user_id"],
+        refs_hash=context["refs_hash"]
+    )
+
+def _response_data(context: dict, rag_response) -> dict:
+    response_data = {"ragResponse": rag_response}
+    if context["server_retrieval"]:
+        response_data["references"] = [
+            {"documentId": ref["documentId"], "title": ref["title"], "score": ref["score"]}
+            for ref in context["references"]
+        ]
+    return response_data
@@ -0,0 +1,102 @@
+import hashlib
+import logging
+import threading
+from typing import Dict, List, Optional
+from config import (
+    SEMANTIC_CACHE_ENABLED,
+    SEMANTIC_CACHE_THRESHOLD,
+    SEMANTIC_CACHE_TTL_SECONDS,
+)
+from utils import metrics
+
+logger = logging.getLogger(__name__)
+
+# stats() 카운터 이름 -> docflow_cache_requests_total의 result 라벨
+_RESULTS = {"hits": "hit", "misses": "miss", "bypassed": "bypassed", "errors": "error"}
+
+
+def references_hash(references: List[Dict]) -> str:
+    """reference 집합의 해시. 순서와 무관하게 같은 title/content 집합이면 같은 값"""
+    digests = sorted(
+        hashlib.sha256(f"{ref.get('title', '')}\n{ref.get('content', '').strip()}".encode("utf-8")).hexdigest()
+        for ref in references
+    )
+    return hashlib.sha256("\n".join(digests).encode("utf-8")).hexdigest()
+
+
+class SemanticAnswerCache:
+    """
+    /search-document 응답 캐시. MemoryService가 저장한 상호작용 벡터에서
+    같은 조직, 같은 reference 집합, TTL 이내이면서 질문 유사도가 threshold 이상인 응답을 재사용
+    """
+
+    def __init__(
+        self,
+        enabled: bool = SEMANTIC_CACHE_ENABLED,
+        threshold: float = SEMANTIC_CACHE_THRESHOLD,
+        ttl_seconds: int = SEMANTIC_CACHE_TTL_SECONDS,
+    ):
+        self.enabled = enabled
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self._counts = {"hits": 0, "misses": 0, "bypassed": 0, "errors": 0}
+        self._lock = threading.Lock()
+
+    def lookup(self, memory, query: str, organization_id: Optional[int], refs_hash: str) -> Optional[str]:
+        """캐시된 ragResponse 반환. 조직이 없는 요청은 테넌트를 구분할 수 없으므로 캐시를 사용하지 않음"""
+        if not self.enabled or organization_id is None:
+            self._incr("bypassed")
+            return None
+        try:
+            hit = memory.find_similar_interaction(
+                query,
+                organization_id,
+                refs_hash,
+                score_threshold=self.threshold,
+                max_age_seconds=self.ttl_seconds
+            )
+        except Exception:
+            logger.exception("Semantic answer cache lookup failed")
+            self._incr("errors")
+            return None
+        return self._response(hit, organization_id)
+
+    async def alookup(self, memory, query: str, organization_id: Optional[int], refs_hash: str) -> Optional[str]:
+        """lookup의 비동기 버전 (memory.afind_similar_interaction 사용)"""
+        if not self.enabled or organization_id is None:
+            self._incr("bypassed")
+            return None
+        try:
+            hit = await memory.afind_similar_interaction(
+                query,
+                organization_id,
+                refs_hash,
+                score_threshold=self.threshold,
+                max_age_seconds=self.ttl_seconds
+            )
+        except Exception:
+            logger.exception("Semantic answer cache lookup failed")
+            self._incr("errors")
+            return None
+        return self._response(hit, organization_id)
+
+    def _response(self, hit, organization_id) -> Optional[str]:
+        response = hit.get("response") if isinstance(hit, dict) else None
+        if not isinstance(response, str) or not response:
+            self._incr("misses")
+            return None
+        logger.info(f"Semantic answer cache hit (score={hit.get('score')}) for organization {organization_id}")
+        self._incr("hits")
+        return response
+
+    def stats(self) -> Dict:
+        with self._lock:
+            counts = dict(self._counts)
+        lookups = counts["hits"] + counts["misses"]
+        counts["hit_rate"] = counts["hits"] / lookups if lookups else 0.0
+        return counts
+
+    def _incr(self, name: str) -> None:
+        with self._lock:
+            self._counts[name] += 1
+        metrics.record_cache("semantic_answer", _RESULTS[name])
@@ -0,0 +1,212 @@
+import logging
+from typing import Awaitable, Callable, Dict, List
+import numpy as np
+from config import (
+    LANGCHAIN_MODEL,
+    CONTEXT_TOKEN_BUDGET,
+    CONTEXT_TOKEN_BUDGETS,
+    REFERENCE_VERBATIM_MAX_TOKENS,
+    PIPELINE_MAX_WORKERS,
+)
+from services.embedding_service import get_embedding_service
+from services.pipeline import arun_concurrently, is_error_result, run_concurrently
+from utils import metrics
+from utils.tokens import count_tokens, truncate_to_tokens
+
+logger = logging.getLogger(__name__)
+
+# 요약 프롬프트는 3~5문장을 요청하므로 요약 전에는 이 값으로 토큰 수를 추정
+SUMMARY_TOKEN_ESTIMATE = 250
+# 유사도 계산용 임베딩에 사용하는 reference 본문 최대 토큰 수
+RANKING_MAX_TOKENS = 1000
+
+
+def get_token_budget(model: str = LANGCHAIN_MODEL) -> int:
+    """
+    모델별 프롬프트 토큰 예산. CONTEXT_TOKEN_BUDGETS("model=tokens,...")에 없으면 CONTEXT_TOKEN_BUDGET
+    """
+    for item in CONTEXT_TOKEN_BUDGETS.split(","):
+        name, _, tokens = item.partition("=")
+        if name.strip() == model and tokens.strip():
+            return int(tokens)
+    return CONTEXT_TOKEN_BUDGET
+
+def format_reference(title: str, text: str) -> str:
+    return f"# {title}\n{text}"
+
+def rank_references(query: str, references: List[Dict], model: str = LANGCHAIN_MODEL) -> List[float]:
+    """
+    reference별 질문 관련도 점수. 서버 검색 결과처럼 score가 있으면 그대로 사용하고,
+    없으면 질문과 reference 임베딩의 cosine 유사도를 계산
+    """
+    if all(ref.get("score") is not None for ref in references):
+        return [float(ref["score"]) for ref in references]
+    return _cosine_scores(get_embedding_service().embed_documents(_ranking_texts(query, references, model)))
+
+async def arank_references(query: str, references: List[Dict], model: str = LANGCHAIN_MODEL) -> List[float]:
+    """rank_references의 비동기 버전"""
+    if all(ref.get("score") is not None for ref in references):
+        return [float(ref["score"]) for ref in references]
+    return _cosine_scores(await get_embedding_service().aembed_documents(_ranking_texts(query, references, model)))
+
+def _ranking_texts(query: str, references: List[Dict], model: str) -> List[str]:
+    return [query] + [
+        truncate_to_tokens(f"{ref['title']}\n{ref['content']}", RANKING_MAX_TOKENS, model)
+        for ref in references
+    ]
+
+def _cosine_scores(embedded: List[List[float]]) -> List[float]:
+    """첫 번째 벡터(질문)와 나머지 벡터의 cosine 유사도"""
+    vectors = np.asarray(embedded, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1)
+    norms[norms == 0] = 1.0
+    vectors /= norms[:, None]
+    return (vectors[1:] @ vectors[0]).tolist()
+
+def pack_references(
+    query: str,
+    references: List[Dict],
+    summarize: Callable[[str], object],
+    budget_tokens: int,
+    model: str = LANGCHAIN_MODEL,
+    max_workers: int = PIPELINE_MAX_WORKERS,
+) -> Dict:
+    """
+    reference들을 budget_tokens 안에 들어가도록 선택하여 하나의 컨텍스트 문자열로 합침.
+    - 짧은 reference(REFERENCE_VERBATIM_MAX_TOKENS 이하)는 요약 없이 원문 그대로 사용
+    - 예산을 넘으면 질문과의 유사도가 높은 reference부터 선택 (모두 들어가면 유사도 계산 생략)
+    - 예산에 들어가는 reference가 하나도 없으면 가장 관련도 높은 reference를 예산에 맞게 잘라서 사용
+    - 결과 문자열은 요청의 reference 순서를 유지
+    반환: {"text", "tokens", "included", "verbatim", "summarized", "truncated", "failed", "dropped"}
+    """
+    entries = _estimate_entries(references, model)
+    order = list(range(len(entries)))
+    if sum(entry["tokens"] for entry in entries) > budget_tokens:
+        try:
+            scores = rank_references(query, references, model)
+            order.sort(key=lambda i: scores[i], reverse=True)
+        except Exception:
+            logger.exception("Reference ranking failed, packing in request order")
+            metrics.record_fallback("rank_references", "error")
+
+    # 1차 선택: 요약 결과 크기는 추정치로 계산
+    selected = _select(entries, order, budget_tokens)
+
+    # 선택된 긴 reference만 동시에 요약
+    to_summarize = [i for i in selected if entries[i]["summarize"]]
+    summaries = run_concurrently(
+        [lambda i=i: summarize(references[i]["content"].strip()) for i in to_summarize],
+        max_workers=max_workers
+    )
+    return _finish(references, entries, selected, to_summarize, summaries, budget_tokens, model)
+
+async def apack_references(
+    query: str,
+    references: List[Dict],
+    summarize: Callable[[str], Awaitable],
+    budget_tokens: int,
+    model: str = LANGCHAIN_MODEL,
+    max_workers: int = PIPELINE_MAX_WORKERS,
+) -> Dict:
+    """pack_references의 비동기 버전. summarize는 async 함수"""
+    entries = _estimate_entries(references, model)
+    order = list(range(len(entries)))
+    if sum(entry["tokens"] for entry in entries) > budget_tokens:
+        try:
+            scores = await arank_references(query, references, model)
+            order.sort(key=lambda i: scores[i], reverse=True)
+        except Exception:
+            logger.exception("Reference ranking failed, packing in request order")
+            metrics.record_fallback("rank_references", "error")
+
+    selected = _select(entries, order, budget_tokens)
+    to_summarize = [i for i in selected if entries[i]["summarize"]]
+    summaries = await arun_concurrently(
+        [lambda i=i: summarize(references[i]["content"].strip()) for i in to_summarize],
+        max_workers=max_workers
+    )
+    return _finish(references, entries, selected, to_summarize, summaries, budget_tokens, model)
+
+def _estimate_entries(references: List[Dict], model: str) -> List[Dict]:
+    """reference별 예상 토큰 수. 짧은 reference는 원문 그대로, 긴 reference는 요약 크기 추정치 사용"""
+    entries = []
+    for ref in references:
+        content = ref["content"].strip()
+        if count_tokens(content, model) <= REFERENCE_VERBATIM_MAX_TOKENS:
+            verbatim = format_reference(ref["title"], content)
+            entries.append({"text": verbatim, "tokens": count_tokens(verbatim, model), "summarize": False})
+        else:
+            estimate = count_tokens(format_reference(ref["title"], ""), model) + SUMMARY_TOKEN_ESTIMATE
+            entries.append({"text": None, "tokens": estimate, "summarize": True})
+    return entries
+
+def _select(entries: List[Dict], order: List[int], budget_tokens: int) -> List[int]:
+    selected, used = [], 0
+    for i in order:
+        if used + entries[i]["tokens"] <= budget_tokens:
+            selected.append(i)
+            used += entries[i]["tokens"]
+    # 모든 reference가 예산보다 크면 가장 관련도 높은 것을 선택 (_finish에서 예산에 맞게 자름)
+    if not selected and order and budget_tokens > 0:
+        selected.append(order[0])
+    return selected
+
+def _finish(
+    references: List[Dict],
+    entries: List[Dict],
+    selected: List[int],
+    to_summarize: List[int],
+    summaries: List,
+    budget_tokens: int,
+    model: str,
+) -> Dict:
+    """요약 결과를 반영하고 실제 길이로 예산을 다시 확인하여 최종 컨텍스트 구성"""
+    failed = 0
+    for i, summary in zip(to_summarize, summaries):
+        if isinstance(summary, BaseException) or is_error_result(summary) or not summary:
+            logger.warning(f"Summarization failed for reference '{references[i]['title']}': {summary}")
+            failed += 1
+            continue
+        entries[i]["text"] = format_reference(references[i]["title"], summary)
+        entries[i]["tokens"] = count_tokens(entries[i]["text"], model)
+
+    # 2차 선택: 실제 요약 길이로 예산을 다시 확인
+    included, used = [], 0
+    for i in selected:
+        entry = entries[i]
+        if entry["text"] is not None and used + entry["tokens"] <= budget_tokens:
+            included.append(i)
+            used += entry["tokens"]
+    truncated = 0
+    if not included and budget_tokens > 0:
+        # reference를 모두 버리고 문서 없이 답하지 않도록, 관련도가 가장 높은 reference를 잘라서라도 포함
+        fallback = next((i for i in selected if entries[i]["text"] is not None), None)
+        if fallback is not None:
+            entries[fallback]["text"] = truncate_to_tokens(entries[fallback]["text"], budget_tokens, model)
+            included.append(fallback)
+            used = count_tokens(entries[fallback]["text"], model)
+            truncated = 1
+    included.sort()
+
+    packed = {
+        "text": "\n\n".join(entries[i]["text"] for i in included),
+        "tokens": used,
+        "included": included,
+        "verbatim": sum(not entries[i]["summarize"] for i in included),
+        "summarized": sum(entries[i]["summarize"] for i in included),
+        "truncated": truncated,
+        "failed": failed,
+        "dropped": len(references) - len(included) - failed,
+    }
+    logger.info(
+        f"Packed {len(included)}/{len(references)} references into {used}/{budget_tokens} tokens "
+        f"(verbatim={packed['verbatim']}, summarized={packed['summarized']}, truncated={truncated}, "
+        f"failed={failed}, dropped={packed['dropped']})"
+    )
+    return packed
+
+def reference_budget(prompt_template, question: str, memory_tokens: int, model: str = LANGCHAIN_MODEL) -> int:
+    """모델 예산에서 프롬프트 본문, 질문, 메모리 컨텍스트 몫을 뺀 reference용 토큰 수"""
+    template = getattr(prompt_template, "template", str(prompt_template))
+    overhead = count_tokens(template, model) + count_tokens(question, model)
+    return max(0, get_token_budget(model) - overhead - memory_tokens)
@@ -0,0 +1,167 @@
+import logging
+from typing import Dict, Optional, Tuple
+from services import generate_document, metadata_service, qdrant_service
+from services.pipeline import Stage, StageFailed, arun_stages, run_stages
+from utils.single_flight import SingleFlight, content_hash
+
+logger = logging.getLogger(__name__)
+
+# 재시도 등으로 같은 문서 요청이 동시에 들어오면 파이프라인을 한 번만 실행하고 결과를 공유
+process_flights = SingleFlight("process-document")
+
+
+def parse_request(data: dict) -> Optional[Dict]:
+    """생성봇 요청 필드 추출. 필수 필드가 누락되면 None"""
+    fields = {
+        "document_id": data.get("documentId"),
+        "organization_id": data.get("organizationId"),
+        "user_id": data.get("userId"),
+        "chat_context": data.get("chatContext"),
+        "created_by": data.get("createdBy"),
+        "created_at": data.get("createdAt", None),
+        "metadata_mode": data.get("metadataMode"),
+    }
+    required = ["document_id", "chat_context", "user_id", "created_by", "created_at"]
+    if not all(fields[name] for name in required):
+        return None
+    return fields
+
+def build_store_payload(fields: dict, extracted: dict, full_document: str, summary_doc: dict) -> dict:
+    """Qdrant에 저장할 문서 payload. contentHash는 생성된 문서가 아니라 입력 채팅(sourceContent)으로 계산"""
+    return {
+        "title": summary_doc.get("title"),
+        "summary": summary_doc.get("summary"),
+        "document": full_document,
+        "sourceContent": fields["chat_context"],
+        "userId": fields["user_id"],
+        "createdBy": fields["created_by"],
+        "keywords": extracted.get("keywords"),
+        "category": extracted.get("category"),
+        "organizationId": fields["organization_id"],
+        "createdAt": fields["created_at"]
+    }
+
+def build_response_data(fields: dict, extracted: dict, full_document: str, summary_doc: dict) -> dict:
+    """NestJS 서버에 반환하는 생성 결과"""
+    return {
+        "documentId": fields["document_id"],
+        "organizationId": fields["organization_id"],
+        "title": summary_doc.get("title"),
+        "document": full_document,
+        "summary": summary_doc.get("summary"),
+        "userId": fields["user_id"],
+        "createdBy": fields["created_by"],
+        "category": extracted.get("category"),
+        "createdAt": fields["created_at"]
+    }
+
+def run_process_document(fields: Dict) -> Tuple[Dict, int]:
+    """
+    @생성봇 파이프라인 실행: 키워드/카테고리 추출, 문서 생성, 요약 생성 후 Qdrant에 저장.
+    (응답 body, status code)를 반환
+    """
+    chat_context = fields["chat_context"]
+
+    # LLM 단계 의존성 그래프: 키워드/카테고리 추출 후 문서 생성과 요약은 동시에 실행
+    # (combined 모드에서는 추출 단계가 제목/요약까지 반환하므로 요약 단계는 LLM을 호출하지 않음)
+    def extract_stage(_):
+        # LLM Call 1: Keyword extraction and category classification
+        return metadata_service.extract_metadata(chat_context, fields.get("metadata_mode"))
+
+    def document_stage(deps):
+        # LLM Call 2: Generate Document
+        return generate_document.generate_document(
+            chat_context,
+            deps["extract"].get("category"),
+            fields["created_at"],
+            fields["created_by"],
+            fields["organization_id"]
+        )
+
+    def summary_stage(deps):
+        # LLM Call 3: Generate summary and title based on category
+        return metadata_service.summarize(chat_context, deps["extract"])
+
+    def store_stage(deps):
+        # Qdrant vector store: generate embeddings and store the document (실패하면 오류 dict가 반환되어 단계 실패로 처리)
+        return qdrant_service.store_document_embedding(
+            fields["document_id"],
+            build_store_payload(fields, deps["extract"], deps["document"], deps["summary"])
+        )
+
+    try:
+        results = run_stages([
+            Stage("extract", extract_stage),
+            Stage("document", document_stage, depends_on=("extract",)),
+            Stage("summary", summary_stage, depends_on=("extract",)),
+            Stage("store", store_stage, depends_on=("extract", "document", "summary")),
+        ], name="process-document")
+    except StageFailed as e:
+        return e.result, e.result.get("status_code", 500)
+
+    keywords = results["extract"].get("keywords")
+    category = results["extract"].get("category")
+
+    logger.info(f"Extracted keywords: {keywords}, Category: {category}")
+
+    return {
+        "statusCode": 200,
+        "message": "성공했습니다",
+        "data": build_response_data(fields, results["extract"], results["document"], results["summary"])
+    }, 200
+
+def request_key(fields: Dict) -> str:
+    """documentId + 요청 내용 hash. 같은 documentId라도 내용이 다르면 별도로 실행"""
+    return f"{fields['document_id']}:{content_hash(fields)}"
+
+def process_document(fields: Dict) -> Tuple[Dict, int]:
+    """run_process_document를 single-flight로 실행"""
+    return process_flights.do(request_key(fields), lambda: run_process_document(fields))
+
+async def aprocess_document(fields: Dict) -> Tuple[Dict, int]:
+    """arun_process_document를 single-flight로 실행 (동기 요청, 비동기 작업과 같은 key를 공유)"""
+    return await process_flights.ado(request_key(fields), lambda: arun_process_document(fields))
+
+async def arun_process_document(fields: Dict) -> Tuple[Dict, int]:
+    """
+    run_process_document의 비동기 버전 (SERVING_MODE=async).
+    같은 단계 그래프를 이벤트 루프에서 실행하므로 LLM 응답을 기다리는 동안 스레드를 점유하지 않음
+    """
+    chat_context = fields["chat_context"]
+
+    async def extract_stage(_):
+        return await metadata_service.aextract_metadata(chat_context, fields.get("metadata_mode"))
+
+    async def document_stage(deps):
+        return await generate_document.agenerate_document(
+            chat_context,
+            deps["extract"].get("category"),
+            fields["created_at"],
+            fields["created_by"],
+            fields["organization_id"]
+        )
+
+    async def summary_stage(deps):
+        return await metadata_service.asummarize(chat_context, deps["extract"])
+
+    async def store_stage(deps):
+        return await qdrant_service.astore_document_embedding(
+            fields["document_id"],
+            build_store_payload(fields, deps["extract"], deps["document"], deps["summary"])
+        )
+
+    try:
+        results = await arun_stages([
+            Stage("extract", extract_stage),
+            Stage("document", document_stage, depends_on=("extract",)),
+            Stage("summary", summary_stage, depends_on=("extract",)),
+            Stage("store", store_stage, depends_on=("extract", "document", "summary")),
+        ], name="process-document")
+    except StageFailed as e:
+        return e.result, e.result.get("status_code", 500)
+
+    return {
+        "statusCode": 200,
+        "message": "성공했습니다",
+        "data": build_response_data(fields, results["extract"], results["document"], results["summary"])
+    }, 200
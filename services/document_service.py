@@ -1,26 +1,24 @@
-from langchain.prompts import PromptTemplate
+from langchain_core.prompts import PromptTemplate
 from utils.error_handler import handle_error
-from langchain_openai import ChatOpenAI
-from config import OPENAI_API_KEY, LANGCHAIN_MODEL
+from utils import metrics, rate_limiter, resilience
+from services import llm_registry
 import logging
+from typing import Iterator
 
 
 logger = logging.getLogger(__name__)
 
 
-# document가 있을 경우 temperature를 낮춰서 답변 생성
-llm_with_docs = ChatOpenAI(
-    api_key=OPENAI_API_KEY,
-    model_name=LANGCHAIN_MODEL,
-    temperature=0.1,
-)
+# 기본은 llm_registry의 answering(document가 있을 때, temperature 0.1) / open_answering(없을 때, 0.5) 역할 모델.
+# 테스트/벤치마크에서 대체할 때만 지정
+llm_with_docs = None
+llm_without_docs = None
 
-# document가 없을 경우 temperature를 높여서 답변 생성
-llm_without_docs = ChatOpenAI(
-    api_key=OPENAI_API_KEY,
-    model_name=LANGCHAIN_MODEL,
-    temperature=0.5,
-)
+def get_llm_with_docs():
+    return llm_with_docs or llm_registry.get_llm("answering")
+
+def get_llm_without_docs():
+    return llm_without_docs or llm_registry.get_llm("open_answering")
 
 def answer_question_with_summary(
     summary: str,
@@ -40,12 +38,15 @@ def answer_question_with_summary(
         )
         
         # Generate response using the LLM with invoke method
-        response = llm_with_docs.invoke(formatted_prompt)
+        model = get_llm_with_docs()
+        with metrics.track_llm("answer_with_docs", model) as call:
+            response = resilience.call("openai", lambda: model.invoke(formatted_prompt, config=call.config), "answer_with_docs", hedge=True,
+                cost=rate_limiter.chat_cost(call.model, formatted_prompt))
         return response.content
         
     except Exception as e:
         logger.exception("Error generating answer with docs")
-        return handle_error("Error generating answer with docs", "문서 기반 답변 생성에 실패했습니다.", 500)
+        return handle_error("Error generating answer with docs", "문서 기반 답변 생성에 실패했습니다.", resilience.error_status(e))
 
 def answer_question_without_docs(user_query: str, prompt_template: str) -> str:
     """
@@ -53,8 +54,85 @@ def answer_question_without_docs(user_query: str, prompt_template: str) -> str:
     """
     try:
         prompt = prompt_template.format(question=user_query)
-        response = llm_without_docs.invoke(prompt)
+        model = get_llm_without_docs()
+        with metrics.track_llm("answer_without_docs", model) as call:
+            response = resilience.call("openai", lambda: model.invoke(prompt, config=call.config), "answer_without_docs", hedge=True,
+                cost=rate_limiter.chat_cost(call.model, prompt))
+        return response.content
+    except Exception as e:
+        logger.exception("Error generating answer without docs")
+        return handle_error("Error generating answer without docs", "일반 답변 생성에 실패했습니다.", resilience.error_status(e))
+
+async def aanswer_question_with_summary(
+    summary: str,
+    question: str,
+    prompt_template: PromptTemplate,
+    memory_context: str = ""
+) -> str:
+    """
+    answer_question_with_summary의 비동기 버전
+    """
+    try:
+        formatted_prompt = prompt_template.format(
+            summary=summary,
+            question=question,
+            memory_context=memory_context
+        )
+        model = get_llm_with_docs()
+        with metrics.track_llm("answer_with_docs", model) as call:
+            response = await resilience.acall("openai", lambda: model.ainvoke(formatted_prompt, config=call.config), "answer_with_docs", hedge=True,
+                cost=rate_limiter.chat_cost(call.model, formatted_prompt))
+        return response.content
+
+    except Exception as e:
+        logger.exception("Error generating answer with docs")
+        return handle_error("Error generating answer with docs", "문서 기반 답변 생성에 실패했습니다.", resilience.error_status(e))
+
+async def aanswer_question_without_docs(user_query: str, prompt_template: str) -> str:
+    """
+    answer_question_without_docs의 비동기 버전
+    """
+    try:
+        prompt = prompt_template.format(question=user_query)
+        model = get_llm_without_docs()
+        with metrics.track_llm("answer_without_docs", model) as call:
+            response = await resilience.acall("openai", lambda: model.ainvoke(prompt, config=call.config), "answer_without_docs", hedge=True,
+                cost=rate_limiter.chat_cost(call.model, prompt))
         return response.content
     except Exception as e:
         logger.exception("Error generating answer without docs")
-        return handle_error("Error generating answer without docs", "일반 답변 생성에 실패했습니다.", 500)
+        return handle_error("Error generating answer without docs", "일반 답변 생성에 실패했습니다.", resilience.error_status(e))
+
+def stream_answer_with_summary(
+    summary: str,
+    question: str,
+    prompt_template: PromptTemplate,
+    memory_context: str = ""
+) -> Iterator[str]:
+    """
+    answer_question_with_summary의 스트리밍 버전. 생성되는 토큰을 순서대로 반환
+    """
+    formatted_prompt = prompt_template.format(
+        summary=summary,
+        question=question,
+        memory_context=memory_context
+    )
+    model = get_llm_with_docs()
+    with metrics.track_llm("answer_with_docs", model) as call:
+        resilience.schedule(rate_limiter.chat_cost(call.model, formatted_prompt))
+        for chunk in model.stream(formatted_prompt, config=call.config):
+            if chunk.content:
+                yield chunk.content
+
+def stream_answer_without_docs(user_query: str, prompt_template: str) -> Iterator[str]:
+    """
+    answer_question_without_docs의 스트리밍 버전. 생성되는 토큰을 순서대로 반환
+    """
+    prompt = prompt_template.format(question=user_query)
+    model = get_llm_without_docs()
+    with metrics.track_llm("answer_without_docs", model) as call:
+        resilience.schedule(rate_limiter.chat_cost(call.model, prompt))
+        for chunk in model.stream(prompt, config=call.config):
+            if chunk.content:
+                yield chunk.content
+
@@ -0,0 +1,138 @@
+import asyncio
+import hashlib
+import logging
+import threading
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from config import (
+    EMBEDDING_MODEL,
+    EMBEDDING_DIMENSIONS,
+    EMBEDDING_BATCH_SIZE,
+    EMBEDDING_CACHE_MAX_ENTRIES,
+    EMBEDDING_CACHE_MAX_BYTES,
+    LLM_MAX_RETRIES,
+)
+from utils.cache import LRUCache, TieredCache
+from utils import metrics, rate_limiter, resilience
+from services import llm_registry
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingService:
+    """
+    프로세스 전역에서 공유하는 임베딩 서비스.
+    텍스트 해시 기준으로 float32 벡터를 캐시하고, 캐시에 없는 텍스트만 batch로 임베딩
+    """
+
+    def __init__(
+        self,
+        model: str = EMBEDDING_MODEL,
+        dimensions: int = EMBEDDING_DIMENSIONS,
+        batch_size: int = EMBEDDING_BATCH_SIZE,
+        encoder=None,
+    ):
+        self.model = model
+        self.dimensions = dimensions
+        self.batch_size = max(1, batch_size)
+        if encoder is None:
+            from langchain_openai import OpenAIEmbeddings
+            registry = llm_registry.get_registry()
+            encoder = OpenAIEmbeddings(
+                model=model,
+                dimensions=dimensions,
+                http_client=registry.http_client(),
+                http_async_client=registry.http_async_client(),
+                max_retries=LLM_MAX_RETRIES,
+            )
+        self.encoder = encoder
+        self.cache = TieredCache(LRUCache(
+            max_entries=EMBEDDING_CACHE_MAX_ENTRIES,
+            max_bytes=EMBEDDING_CACHE_MAX_BYTES,
+            sizeof=lambda vector: vector.nbytes,
+        ))
+        metrics.REGISTRY.register_collector("embedding_cache", metrics.cache_size_collector("embedding", self.stats))
+
+    def cache_key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model}:{self.dimensions}:{text}".encode("utf-8")).hexdigest()
+
+    def embed_query(self, text: str) -> List[float]:
+        """단일 텍스트 임베딩"""
+        return self.embed_documents([text])[0]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        여러 텍스트를 임베딩. 중복 텍스트와 캐시된 텍스트는 다시 요청하지 않으며,
+        나머지는 batch_size 단위로 나눠서 요청
+        """
+        keys, vectors, missing = self._lookup(texts)
+        for batch_keys in self._batches(missing):
+            with metrics.EMBEDDING_REQUEST_SECONDS.time(model=self.model):
+                batch = [missing[key] for key in batch_keys]
+                embedded = resilience.call("openai", lambda: self.encoder.embed_documents(batch), "embedding", hedge=True,
+                                           cost=rate_limiter.embedding_cost(self.model, batch))
+            self._store(batch_keys, embedded, vectors)
+        return [vectors[key].tolist() for key in keys]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        """embed_query의 비동기 버전"""
+        return (await self.aembed_documents([text]))[0]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        """embed_documents의 비동기 버전. batch 요청은 동시에 보냄"""
+        keys, vectors, missing = self._lookup(texts)
+        batches = self._batches(missing)
+
+        async def embed(batch_keys):
+            with metrics.EMBEDDING_REQUEST_SECONDS.time(model=self.model):
+                batch = [missing[key] for key in batch_keys]
+                return await resilience.acall("openai", lambda: self.encoder.aembed_documents(batch), "embedding", hedge=True,
+                                                 cost=rate_limiter.embedding_cost(self.model, batch))
+
+        for batch_keys, embedded in zip(batches, await asyncio.gather(*(embed(batch) for batch in batches))):
+            self._store(batch_keys, embedded, vectors)
+        return [vectors[key].tolist() for key in keys]
+
+    def _lookup(self, texts: List[str]) -> Tuple[List[str], Dict[str, np.ndarray], Dict[str, str]]:
+        """(텍스트별 캐시 키, 캐시된 벡터, 임베딩이 필요한 {키: 텍스트}). 중복 텍스트는 한 번만 포함"""
+        keys = [self.cache_key(text) for text in texts]
+        vectors = {}
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key in vectors or key in missing:
+                continue
+            cached = self.cache.get(key)
+            if cached is not None:
+                vectors[key] = cached
+            else:
+                missing[key] = text
+
+        metrics.record_cache("embedding", "hit", len(vectors))
+        metrics.record_cache("embedding", "miss", len(missing))
+        return keys, vectors, missing
+
+    def _batches(self, missing: Dict[str, str]) -> List[List[str]]:
+        missing_keys = list(missing)
+        return [missing_keys[start:start + self.batch_size] for start in range(0, len(missing_keys), self.batch_size)]
+
+    def _store(self, batch_keys: List[str], embedded: List[List[float]], vectors: Dict[str, np.ndarray]) -> None:
+        for key, vector in zip(batch_keys, embedded):
+            array = np.asarray(vector, dtype=np.float32)
+            self.cache.set(key, array)
+            vectors[key] = array
+
+    def stats(self) -> dict:
+        return self.cache.stats()
+
+
+_instance: Optional[EmbeddingService] = None
+_instance_lock = threading.Lock()
+
+def get_embedding_service() -> EmbeddingService:
+    """프로세스 전역 EmbeddingService 반환 (최초 호출 시 생성)"""
+    global _instance
+    if _instance is None:
+        with _instance_lock:
+            if _instance is None:
+                _instance = EmbeddingService()
+    return _instance
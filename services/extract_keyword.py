@@ -1,15 +1,13 @@
 import logging
-from langchain_openai import ChatOpenAI
-from langchain.prompts import PromptTemplate
-from config import OPENAI_API_KEY, LANGCHAIN_MODEL, CATEGORY
+from langchain_core.prompts import PromptTemplate
+from config import CATEGORY
+from services import llm_registry
 from utils.error_handler import handle_error
+from utils import metrics, rate_limiter, resilience
 
-# 1. LLM 인스턴스 생성. temperature를 낮춰서 답변 생성
-llm = ChatOpenAI(
-    api_key=OPENAI_API_KEY,
-    model_name=LANGCHAIN_MODEL,
-    temperature=0.1,
-)
+# 1. 구조화된 출력 LLM은 llm_registry의 extraction 역할 모델로 최초 호출 시 생성
+structured_llm = None
+structured_metadata_llm = None
 
 # 2. JSON Schema 정의
 json_schema = {
@@ -31,8 +29,12 @@ json_schema = {
     "required": ["keywords", "category"],
 }
 
-# 3. 구조화된 출력 LLM 생성
-structured_llm = llm.with_structured_output(schema=json_schema)
+# 3. 구조화된 출력 LLM
+def get_structured_llm():
+    global structured_llm
+    if structured_llm is None:
+        structured_llm = llm_registry.get_llm("extraction").with_structured_output(schema=json_schema)
+    return structured_llm
 
 # 4. Prompt 정의
 prompt_template = PromptTemplate(
@@ -51,18 +53,131 @@ def extract_keywords_and_category(chat_context: str) -> dict:
     formatted_prompt = prompt_template.format(chat_context=chat_context)
 
     try:
-        result = structured_llm.invoke(formatted_prompt)
+        model = get_structured_llm()
+        with metrics.track_llm("extract_keywords", model) as call:
+            result = resilience.call("openai", lambda: model.invoke(formatted_prompt, config=call.config), "extract_keywords", hedge=True,
+                cost=rate_limiter.chat_cost(call.model, formatted_prompt))
         return result
     except Exception as e:
-        try:
-            fallback_result = {
-                "keywords": [],
-                "category": CATEGORY.DEV_DOC
-            }
-            return fallback_result
-        except Exception:
-            return handle_error(
-            "Error extracting keywords and category",
-            "키워드 및 카테고리 추출에 실패했습니다.",
+        return _keywords_fallback(e)
+
+async def aextract_keywords_and_category(chat_context: str) -> dict:
+    """extract_keywords_and_category의 비동기 버전"""
+    formatted_prompt = prompt_template.format(chat_context=chat_context)
+
+    try:
+        model = get_structured_llm()
+        with metrics.track_llm("extract_keywords", model) as call:
+            return await resilience.acall("openai", lambda: model.ainvoke(formatted_prompt, config=call.config), "extract_keywords", hedge=True,
+                cost=rate_limiter.chat_cost(call.model, formatted_prompt))
+    except Exception as e:
+        return _keywords_fallback(e)
+
+def _keywords_fallback(error: Exception) -> dict:
+    """키워드 추출 실패 시 빈 키워드와 DEV_DOC으로 처리"""
+    logging.warning(f"Keyword extraction failed, falling back to {CATEGORY.DEV_DOC}: {error}")
+    metrics.record_fallback("extract_keywords", "llm_error")
+    return {
+        "keywords": [],
+        "category": CATEGORY.DEV_DOC
+    }
+
+
+# 6. 키워드/카테고리/제목/요약을 한 번에 추출하는 JSON Schema (METADATA_EXTRACTION_MODE=combined)
+metadata_json_schema = {
+    "title": "extract_document_metadata",
+    "description": "Extract keywords, classify the chat and write a title and summary in one pass",
+    "type": "object",
+    "properties": {
+        "keywords": {
+            "type": "array",
+            "items": {"type": "string"},
+            "description": "핵심 키워드 리스트",
+        },
+        "category": {
+            "type": "string",
+            "enum": [CATEGORY.DEV_DOC, CATEGORY.MEETING_DOC],
+            "description": "문서 유형",
+        },
+        "title": {
+            "type": "string",
+            "description": "문서 제목",
+        },
+        "summary": {
+            "type": "string",
+            "description": "최종 합의된 내용을 중심으로 한 문서 요약",
+        },
+    },
+    "required": ["keywords", "category", "title", "summary"],
+}
+
+def get_structured_metadata_llm():
+    global structured_metadata_llm
+    if structured_metadata_llm is None:
+        structured_metadata_llm = llm_registry.get_llm("extraction").with_structured_output(schema=metadata_json_schema)
+    return structured_metadata_llm
+
+metadata_prompt_template = PromptTemplate(
+    input_variables=["chat_context"],
+    template=(
+        "아래 채팅 로그를 분석하여 핵심 키워드를 뽑고,\n"
+        "개발 문서면 DEV_DOC, 회의록이면 MEETING_DOC으로 분류해주세요.\n"
+        "그리고 분류한 유형(DEV_DOC은 기술문서, MEETING_DOC은 회의록)에 맞는 적절한 제목과\n"
+        "최종 합의된 내용을 중심으로 한 문서 요약을 작성해주세요.\n"
+        "JSON 형식으로만 결과를 반환해주세요.\n\n"
+        "채팅 로그:\n{chat_context}"
+    )
+)
+
+def extract_document_metadata(chat_context: str) -> dict:
+    """채팅 로그에서 키워드, 카테고리, 제목, 요약을 한 번의 LLM 호출로 추출"""
+    formatted_prompt = metadata_prompt_template.format(chat_context=chat_context)
+
+    try:
+        model = get_structured_metadata_llm()
+        with metrics.track_llm("extract_metadata", model) as call:
+            result = resilience.call("openai", lambda: model.invoke(formatted_prompt, config=call.config), "extract_metadata", hedge=True,
+                cost=rate_limiter.chat_cost(call.model, formatted_prompt))
+    except Exception as e:
+        logging.exception("Error in extract_document_metadata")
+        return handle_error(
+            "Error extracting document metadata",
+            "문서 메타데이터 추출에 실패했습니다.",
+            resilience.error_status(e)
+        )
+    return _validate_metadata(result)
+
+async def aextract_document_metadata(chat_context: str) -> dict:
+    """extract_document_metadata의 비동기 버전"""
+    formatted_prompt = metadata_prompt_template.format(chat_context=chat_context)
+
+    try:
+        model = get_structured_metadata_llm()
+        with metrics.track_llm("extract_metadata", model) as call:
+            result = await resilience.acall("openai", lambda: model.ainvoke(formatted_prompt, config=call.config), "extract_metadata", hedge=True,
+                cost=rate_limiter.chat_cost(call.model, formatted_prompt))
+    except Exception as e:
+        logging.exception("Error in aextract_document_metadata")
+        return handle_error(
+            "Error extracting document metadata",
+            "문서 메타데이터 추출에 실패했습니다.",
+            resilience.error_status(e)
+        )
+    return _validate_metadata(result)
+
+def _validate_metadata(result) -> dict:
+    # 스키마 필드가 누락되었거나 제목/요약이 비어 있으면 실패로 처리하여 호출 측이 fallback 하도록 함
+    if (
+        not isinstance(result, dict)
+        or any(name not in result for name in metadata_json_schema["required"])
+        or result["category"] not in (CATEGORY.DEV_DOC, CATEGORY.MEETING_DOC)
+        or not str(result["title"]).strip()
+        or not str(result["summary"]).strip()
+    ):
+        logging.error(f"Invalid document metadata: {result}")
+        return handle_error(
+            "Invalid LLM response",
+            "LLM이 올바른 메타데이터를 반환하지 않았습니다.",
             500
         )
+    return result
@@ -1,45 +1,75 @@
 import os
 import logging
-from langchain_openai import ChatOpenAI
-from config import OPENAI_API_KEY, LANGCHAIN_MODEL
+from typing import Iterator
 from prompts.prompts import dev_doc_prompt, meeting_doc_prompt
 from utils.error_handler import handle_error
+from utils import metrics, rate_limiter, resilience
+from services import llm_registry
 
 
-# LLM 인스턴스 생성. temperature를 낮춰서 답변 생성
-llm = ChatOpenAI(
-    api_key=OPENAI_API_KEY,
-    model_name=LANGCHAIN_MODEL,
-    temperature=0.1
-)
+# 기본은 llm_registry의 generation 역할 모델. 테스트/벤치마크에서 대체할 때만 llm을 지정
+llm = None
+
+def get_llm():
+    return llm or llm_registry.get_llm("generation")
+
+def format_document_prompt(chat_context, category, created_at, created_by, organization_id):
+    """category에 맞는 문서 생성 프롬프트를 반환. 알 수 없는 category면 error dict를 반환"""
+    if category == "MEETING_DOC":
+        return meeting_doc_prompt.format(
+            chat_context=chat_context,
+            created_at=created_at,
+            created_by=created_by,
+            organization_id=organization_id,
+            attendees = "Minjun Kim, Jimin Park, Seojun Park" 
+        )
+    elif category == "DEV_DOC":
+        return dev_doc_prompt.format(
+            chat_context=chat_context,
+            created_at=created_at,
+            created_by=created_by,
+            organization_id=organization_id,
+            attendees = "Minjun Kim, Jimin Park, Seojun Park" 
+        )
+    return {
+        "error": "Invalid Category",
+        "message": "카테고리 분류에 실패했습니다.",
+        "status_code": 400
+    }
 
 def generate_document(chat_context, category, created_at, created_by, organization_id):
     """chat context와 category를 기반으로 문서를 생성. meeting_doc 또는 dev_doc의 프롬프트를 구분함"""
     try:
-        if category == "MEETING_DOC":
-            formatted_prompt = meeting_doc_prompt.format(
-                chat_context=chat_context,
-                created_at=created_at,
-                created_by=created_by,
-                organization_id=organization_id,
-                attendees = "Minjun Kim, Jimin Park, Seojun Park" 
-            )
-        elif category == "DEV_DOC":
-            formatted_prompt = dev_doc_prompt.format(
-                chat_context=chat_context,
-                created_at=created_at,
-                created_by=created_by,
-                organization_id=organization_id,
-                attendees = "Minjun Kim, Jimin Park, Seojun Park" 
-            )
-        else:
-            return {
-                "error": "Invalid Category",
-                "message": "카테고리 분류에 실패했습니다.",
-                "status_code": 400
-            }
-
-        response = llm.invoke(formatted_prompt)
+        formatted_prompt = format_document_prompt(chat_context, category, created_at, created_by, organization_id)
+        if isinstance(formatted_prompt, dict):
+            return formatted_prompt
+
+        model = get_llm()
+        with metrics.track_llm("generate_document", model) as call:
+            response = resilience.call("openai", lambda: model.invoke(formatted_prompt, config=call.config), "generate_document", hedge=True,
+                cost=rate_limiter.chat_cost(call.model, formatted_prompt))
+
+        return response.content
+
+    except Exception as e:
+        logging.exception("문서 생성 중 오류 발생")
+        return handle_error(
+            "Error generating document",
+            "문서 생성에 실패했습니다.",
+            resilience.error_status(e)
+        )
+
+async def agenerate_document(chat_context, category, created_at, created_by, organization_id):
+    """generate_document의 비동기 버전"""
+    try:
+        formatted_prompt = format_document_prompt(chat_context, category, created_at, created_by, organization_id)
+        if isinstance(formatted_prompt, dict):
+            return formatted_prompt
+
+        model = get_llm()
+        with metrics.track_llm("generate_document", model) as call:
+            response = await resilience.acall("openai", lambda: model.ainvoke(formatted_prompt, config=call.config), "generate_document", hedge=True,
+                cost=rate_limiter.chat_cost(call.model, formatted_prompt))
 
         return response.content
 
@@ -48,5 +78,14 @@ def generate_document(chat_context, category, created_at, created_by, organizati
         return handle_error(
             "Error generating document",
             "문서 생성에 실패했습니다.",
-            500
+            resilience.error_status(e)
         )
+
+def stream_document(formatted_prompt: str) -> Iterator[str]:
+    """format_document_prompt로 만든 프롬프트로 문서를 생성하면서 토큰을 순서대로 반환"""
+    model = get_llm()
+    with metrics.track_llm("generate_document", model) as call:
+        resilience.schedule(rate_limiter.chat_cost(call.model, formatted_prompt))
+        for chunk in model.stream(formatted_prompt, config=call.config):
+            if chunk.content:
+                yield chunk.content
@@ -1,22 +1,21 @@
 import os
 import logging
-from langchain_openai import ChatOpenAI
-from langchain.prompts import PromptTemplate
-from config import OPENAI_API_KEY, LANGCHAIN_MODEL, CATEGORY
+from langchain_core.prompts import PromptTemplate
+from config import CATEGORY
 import json
 from utils.error_handler import handle_error
+from utils import metrics, rate_limiter, resilience
+from services import llm_registry
 
-# LLM 인스턴스 생성. temperature를 낮춰서 답변 생성
-llm = ChatOpenAI(
-    api_key=OPENAI_API_KEY,
-    model_name=LANGCHAIN_MODEL,
-    temperature=0.1
-)
+# 기본은 llm_registry의 SUMMARY_ROLE 역할 모델. 테스트/벤치마크에서 대체할 때만 llm을 지정
+SUMMARY_ROLE = "extraction"
+llm = None
 
-def generate_document_summary(chat_context: str, category: str) -> dict:
-    """
-    Chat context 를 기반으로 문서 요약을 생성
-    """
+def get_llm():
+    return llm or llm_registry.get_llm(SUMMARY_ROLE)
+
+def summary_prompt(chat_context: str, category: str) -> str:
+    """category에 맞는 문서 요약 프롬프트"""
     # Choose document style based on category
     if category == CATEGORY.DEV_DOC:
         doc_style = "기술문서"
@@ -39,32 +38,62 @@ def generate_document_summary(chat_context: str, category: str) -> dict:
         )
     )
     
-    formatted_prompt = prompt.format(chat_context=chat_context, doc_style=doc_style)
+    return prompt.format(chat_context=chat_context, doc_style=doc_style)
+
+def parse_summary_response(response: str) -> dict:
+    """LLM 응답(JSON 문자열)을 dict로 변환. 비어 있거나 JSON이 아니면 error dict"""
+    if not response or not response.strip():
+        logging.error("LLM returned empty response for summary generation.")
+        return handle_error(
+            "Empty LLM response",
+            "LLM이 응답을 반환하지 않았습니다.",
+            500
+        )
+    try:
+        return json.loads(response)
+    except json.JSONDecodeError:
+        logging.error(f"LLM did not return valid JSON: {response}")
+        return handle_error(
+            "Invalid LLM response",
+            "LLM이 올바른 JSON을 반환하지 않았습니다.",
+            500
+        )
+
+def generate_document_summary(chat_context: str, category: str) -> dict:
+    """
+    Chat context 를 기반으로 문서 요약을 생성
+    """
+    formatted_prompt = summary_prompt(chat_context, category)
     
     try:
         # Call the LLM
-        response = llm.invoke(formatted_prompt).content
-        if not response or not response.strip():
-            logging.error("LLM returned empty response for summary generation.")
-            return handle_error(
-                "Empty LLM response",
-                "LLM이 응답을 반환하지 않았습니다.",
-                500
-            )
-        try:
-            result = json.loads(response)
-        except json.JSONDecodeError:
-            logging.error(f"LLM did not return valid JSON: {response}")
-            return handle_error(
-                "Invalid LLM response",
-                "LLM이 올바른 JSON을 반환하지 않았습니다.",
-                500
-            )
-        return result
+        model = get_llm()
+        with metrics.track_llm("document_summary", model) as call:
+            response = resilience.call("openai", lambda: model.invoke(formatted_prompt, config=call.config), "document_summary", hedge=True,
+                cost=rate_limiter.chat_cost(call.model, formatted_prompt)).content
+        return parse_summary_response(response)
     except Exception as e:
         logging.exception("Error in generate_document_summary")
         return handle_error(
             "Error generating document summary",
             "문서 요약 생성에 실패했습니다.",
-            500
-        )
\ No newline at end of file
+            resilience.error_status(e)
+        )
+
+async def agenerate_document_summary(chat_context: str, category: str) -> dict:
+    """generate_document_summary의 비동기 버전"""
+    formatted_prompt = summary_prompt(chat_context, category)
+
+    try:
+        model = get_llm()
+        with metrics.track_llm("document_summary", model) as call:
+            response = (await resilience.acall("openai", lambda: model.ainvoke(formatted_prompt, config=call.config), "document_summary", hedge=True,
+                cost=rate_limiter.chat_cost(call.model, formatted_prompt))).content
+        return parse_summary_response(response)
+    except Exception as e:
+        logging.exception("Error in agenerate_document_summary")
+        return handle_error(
+            "Error generating document summary",
+            "문서 요약 생성에 실패했습니다.",
+            resilience.error_status(e)
+        )
@@ -0,0 +1,99 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Callable, Dict, Optional
+from config import (
+    OPENAI_API_KEY,
+    QDRANT_COLLECTION_NAME,
+    VECTOR_STORE,
+    READINESS_TIMEOUT_SECONDS,
+    READINESS_CACHE_SECONDS,
+)
+from services import qdrant_service, job_service
+
+logger = logging.getLogger(__name__)
+
+
+def check_vector_store() -> Dict:
+    """벡터 저장소(Qdrant 또는 local) 응답 여부. 컬렉션이 아직 없어도 응답하면 정상"""
+    qdrant_service.get_client().collection_exists(QDRANT_COLLECTION_NAME)
+    return {"backend": VECTOR_STORE}
+
+def check_llm() -> Dict:
+    """OpenAI API 키 설정 여부. 토큰을 쓰지 않도록 실제 호출은 하지 않음"""
+    if not OPENAI_API_KEY:
+        raise RuntimeError("OPENAI_API_KEY is not configured")
+    return {}
+
+def check_jobs() -> Dict:
+    """비동기 작업 저장소 조회 가능 여부"""
+    job_service.get_job_runner().get("readiness-probe")
+    return {}
+
+CHECKS: Dict[str, Callable[[], Dict]] = {
+    "vectorStore": check_vector_store,
+    "llm": check_llm,
+    "jobs": check_jobs,
+}
+
+
+class ReadinessProbe:
+    """
+    의존성 확인을 제한 시간 안에서 동시에 실행하고, 결과를 cache_seconds 동안 재사용.
+    응답하지 않는 의존성이 있어도 /readyz 요청이 timeout 이상 막히지 않음
+    """
+
+    def __init__(
+        self,
+        checks: Dict[str, Callable[[], Dict]] = CHECKS,
+        timeout: float = READINESS_TIMEOUT_SECONDS,
+        cache_seconds: float = READINESS_CACHE_SECONDS,
+    ):
+        self.checks = checks
+        self.timeout = timeout
+        self.cache_seconds = cache_seconds
+        self._executor = ThreadPoolExecutor(max_workers=max(1, len(checks)), thread_name_prefix="readiness")
+        self._lock = threading.Lock()
+        self._result: Optional[Dict] = None
+        self._checked_at = 0.0
+
+    def check(self) -> Dict:
+        """{"ready": bool, "checks": {name: {"status": "ok" | "error" | "timeout", ...}}}"""
+        with self._lock:
+            if self._result is not None and time.monotonic() - self._checked_at < self.cache_seconds:
+                return self._result
+
+            futures = {name: self._executor.submit(check) for name, check in self.checks.items()}
+            deadline = time.monotonic() + self.timeout
+            checks = {}
+            for name, future in futures.items():
+                started = time.monotonic()
+                try:
+                    detail = future.result(max(0.0, deadline - started))
+                    checks[name] = {"status": "ok", **(detail or {})}
+                except FutureTimeoutError:
+                    checks[name] = {"status": "timeout"}
+                except Exception as e:
+                    logger.warning(f"Readiness check {name} failed: {e}")
+                    checks[name] = {"status": "error", "error": str(e)}
+
+            self._result = {
+                "ready": all(check["status"] == "ok" for check in checks.values()),
+                "checks": checks,
+            }
+            self._checked_at = time.monotonic()
+            return self._result
+
+
+_probe: Optional[ReadinessProbe] = None
+_probe_lock = threading.Lock()
+
+def get_readiness_probe() -> ReadinessProbe:
+    """프로세스 전역 ReadinessProbe 반환 (최초 호출 시 생성)"""
+    global _probe
+    if _probe is None:
+        with _probe_lock:
+            if _probe is None:
+                _probe = ReadinessProbe()
+    return _probe
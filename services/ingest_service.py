@@ -0,0 +1,203 @@
+import logging
+from typing import Dict, Iterator, List, Optional
+from config import INGEST_MAX_WORKERS, INGEST_BATCH_SIZE, CHUNK_INDEXING_ENABLED, INGEST_SKIP_UNCHANGED
+from services import metadata_service, qdrant_service
+from services.embedding_service import get_embedding_service
+from services.pipeline import is_error_result, run_concurrently
+from utils.error_handler import handle_error
+
+logger = logging.getLogger(__name__)
+
+
+def _analyze_document(document: Dict, metadata_mode: Optional[str] = None) -> Dict:
+    """키워드/카테고리 추출 후 요약을 생성하여 저장용 payload를 반환"""
+    chat_context = document["content"]
+    metadata = metadata_service.extract_document_metadata(chat_context, document.get("metadataMode") or metadata_mode)
+    if is_error_result(metadata):
+        return metadata
+
+    return {
+        "title": metadata.get("title"),
+        "summary": metadata.get("summary"),
+        "document": chat_context,
+        "userId": document.get("userId"),
+        "createdBy": document.get("createdBy"),
+        "keywords": metadata.get("keywords"),
+        "category": metadata.get("category"),
+        "organizationId": document.get("organizationId"),
+        "createdAt": document.get("createdAt"),
+    }
+
+def _failed(document_id, error: Dict) -> Dict:
+    return {
+        "documentId": document_id,
+        "status": "failed",
+        "error": error.get("error"),
+        "message": error.get("message"),
+    }
+
+def _metadata(document: Dict) -> Dict:
+    return {field: document.get(field) for field in qdrant_service.DOCUMENT_METADATA_FIELDS}
+
+def skip_unchanged(documents: List[Dict]) -> Dict[int, str]:
+    """
+    저장된 문서와 내용 hash/모델/버전이 같아 다시 분석할 필요가 없는 문서를 처리하고 {index: 결과}를 반환.
+    unchanged: 변경 없음 | updated: 메타데이터만 바뀌어 payload만 갱신. 반환하지 않은 문서는 새로 저장해야 함
+    """
+    if not INGEST_SKIP_UNCHANGED:
+        return {}
+    stored = qdrant_service.get_document_payloads([document["documentId"] for document in documents])
+    statuses = {}
+    for index, document in enumerate(documents):
+        change = qdrant_service.classify_document_change(
+            stored.get(document["documentId"]), document.get("content"), _metadata(document)
+        )
+        if change == "unchanged":
+            statuses[index] = "unchanged"
+        elif change == "metadata":
+            try:
+                qdrant_service.update_document_metadata(document["documentId"], _metadata(document))
+                statuses[index] = "updated"
+            except Exception as e:
+                # payload 갱신에 실패하면 전체 저장으로 덮어씀
+                logger.warning(f"Failed to update metadata of document {document['documentId']}, storing it again: {e}")
+    return statuses
+
+def _ingest_batch(batch: List[Dict], metadata_mode: Optional[str] = None) -> List[Dict]:
+    """
+    문서 batch 하나를 처리: 변경되지 않은 문서는 건너뛰고, LLM 단계는 동시에, 임베딩과 upsert는 batch 단위로 실행
+    """
+    results: Dict[int, Dict] = {
+        index: {"documentId": batch[index]["documentId"], "status": status}
+        for index, status in skip_unchanged(batch).items()
+    }
+    pending = [(index, document) for index, document in enumerate(batch) if index not in results]
+    analyses = run_concurrently(
+        [lambda document=document: _analyze_document(document, metadata_mode) for _, document in pending],
+        max_workers=INGEST_MAX_WORKERS
+    )
+
+    analyzed = []
+    for (index, document), analysis in zip(pending, analyses):
+        if isinstance(analysis, Exception):
+            logger.error(f"Failed to analyze document {document['documentId']}: {analysis}")
+            analysis = handle_error("Error analyzing document", "문서 분석에 실패했습니다.", 500)
+        if is_error_result(analysis):
+            results[index] = _failed(document["documentId"], analysis)
+        else:
+            analyzed.append((index, document, analysis))
+
+    if analyzed:
+        try:
+            # 문서 벡터와 chunk 벡터를 한 번의 batch 임베딩으로 계산
+            chunks = [
+                qdrant_service.split_document(payload["document"]) if CHUNK_INDEXING_ENABLED else []
+                for _, _, payload in analyzed
+            ]
+            texts = [qdrant_service.document_embedding_text(payload) for _, _, payload in analyzed]
+            for (_, _, payload), document_chunks in zip(analyzed, chunks):
+                texts.extend(qdrant_service.chunk_embedding_text(payload, chunk) for chunk in document_chunks)
+            vectors = get_embedding_service().embed_documents(texts)
+
+            document_vectors = vectors[:len(analyzed)]
+            chunk_vectors = vectors[len(analyzed):]
+            qdrant_service.upsert_document_points([
+                qdrant_service.build_document_point(document["documentId"], vector, payload)
+                for (_, document, payload), vector in zip(analyzed, document_vectors)
+            ])
+
+            chunk_points = {}
+            offset = 0
+            for (_, document, payload), document_chunks in zip(analyzed, chunks):
+                # chunk가 없는 문서도 포함하여 이전 저장본의 chunk를 삭제
+                if CHUNK_INDEXING_ENABLED:
+                    chunk_points[document["documentId"]] = qdrant_service.build_chunk_points(
+                        document["documentId"],
+                        payload,
+                        document_chunks,
+                        chunk_vectors[offset:offset + len(document_chunks)]
+                    )
+                offset += len(document_chunks)
+            qdrant_service.replace_document_chunks(chunk_points)
+
+            for index, document, _ in analyzed:
+                results[index] = {"documentId": document["documentId"], "status": "stored"}
+        except Exception as e:
+            logger.exception("Failed to embed or store document batch")
+            error = handle_error("Error storing documents", f"문서 저장에 실패했습니다: {str(e)}", 500)
+            for index, document, _ in analyzed:
+                results[index] = _failed(document["documentId"], error)
+
+    return [results[index] for index in range(len(batch))]
+
+def validate_documents(documents: List[Dict]) -> List[Dict]:
+    """
+    요청 문서 목록을 정규화. 필수 필드가 없는 문서는 "invalid" 로 표시
+    """
+    normalized = []
+    for document in documents:
+        document_id = document.get("documentId") if isinstance(document, dict) else None
+        content = document.get("content") if isinstance(document, dict) else None
+        try:
+            document_id = int(document_id)
+        except (TypeError, ValueError):
+            document_id = None
+        normalized.append({
+            **(document if isinstance(document, dict) else {}),
+            "documentId": document_id,
+            "invalid": document_id is None or not content,
+        })
+    return normalized
+
+def iter_ingest_documents(
+    documents: List[Dict],
+    batch_size: int = INGEST_BATCH_SIZE,
+    metadata_mode: Optional[str] = None,
+) -> Iterator[Dict]:
+    """
+    여러 문서를 batch 단위로 저장하면서 문서별 결과 이벤트를 생성.
+    마지막에는 전체 처리 결과를 담은 summary 이벤트를 생성
+    """
+    documents = validate_documents(documents)
+    total = len(documents)
+    processed = 0
+    counts = {"stored": 0, "updated": 0, "unchanged": 0}
+
+    valid = []
+    for document in documents:
+        if document["invalid"]:
+            processed += 1
+            yield {
+                "type": "item",
+                "processed": processed,
+                "total": total,
+                **_failed(document["documentId"], handle_error(
+                    "Missing Fields", "documentId와 content는 필수입니다.", 400
+                )),
+            }
+        else:
+            valid.append(document)
+
+    for start in range(0, len(valid), max(1, batch_size)):
+        for result in _ingest_batch(valid[start:start + batch_size], metadata_mode):
+            processed += 1
+            if result["status"] in counts:
+                counts[result["status"]] += 1
+            yield {"type": "item", "processed": processed, "total": total, **result}
+
+    yield {"type": "summary", "total": total, **counts, "failed": total - sum(counts.values())}
+
+def ingest_documents(
+    documents: List[Dict],
+    batch_size: int = INGEST_BATCH_SIZE,
+    metadata_mode: Optional[str] = None,
+) -> Dict:
+    """여러 문서를 저장하고 문서별 결과와 전체 집계를 반환"""
+    results = []
+    summary = {}
+    for event in iter_ingest_documents(documents, batch_size=batch_size, metadata_mode=metadata_mode):
+        if event["type"] == "item":
+            results.append({k: v for k, v in event.items() if k not in ("type", "processed", "total")})
+        else:
+            summary = {k: v for k, v in event.items() if k != "type"}
+    return {**summary, "results": results}
@@ -0,0 +1,384 @@
+import atexit
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import urllib.parse
+import urllib.request
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+from config import (
+    JOB_STORE,
+    JOB_STORE_PATH,
+    JOB_MAX_WORKERS,
+    JOB_MAX_RETAINED,
+    JOB_RESUME_AFTER_SECONDS,
+    JOB_HEARTBEAT_SECONDS,
+    JOB_CALLBACK_TIMEOUT_SECONDS,
+    JOB_CALLBACK_ALLOWED_HOSTS,
+)
+from services import document_pipeline
+from utils.error_handler import handle_error
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+UNFINISHED_STATUSES = (QUEUED, RUNNING)
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+def validate_callback_url(url) -> Optional[str]:
+    """
+    callbackUrl 검증. http/https만 허용하고 JOB_CALLBACK_ALLOWED_HOSTS가 있으면 목록의 호스트만 허용.
+    문제가 없으면 None, 있으면 사유 메시지를 반환
+    """
+    if not isinstance(url, str):
+        return "callbackUrl은 문자열이어야 합니다."
+    parsed = urllib.parse.urlsplit(url.strip())
+    if parsed.scheme not in ("http", "https") or not parsed.hostname:
+        return "callbackUrl은 http 또는 https URL이어야 합니다."
+    allowed = [host.strip().lower() for host in JOB_CALLBACK_ALLOWED_HOSTS.split(",") if host.strip()]
+    hostname = parsed.hostname.lower()
+    if allowed and not any(hostname == host or (host.startswith(".") and hostname.endswith(host)) for host in allowed):
+        return "허용되지 않은 callbackUrl 호스트입니다."
+    return None
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    """callback 응답의 redirect로 허용되지 않은 호스트에 요청하지 않도록 redirect를 따르지 않음"""
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+_callback_opener = urllib.request.build_opener(_NoRedirect)
+
+
+class JobStore(ABC):
+    """
+    비동기 작업 상태 저장소 인터페이스.
+    작업의 owner는 실행을 맡은 JobRunner이며, owner가 살아 있는 동안 heartbeat로 updatedAt을 계속 갱신함
+    """
+
+    @abstractmethod
+    def create(self, job: Dict) -> None:
+        ...
+
+    @abstractmethod
+    def update(self, job_id: str, **fields) -> None:
+        ...
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[Dict]:
+        ...
+
+    @abstractmethod
+    def heartbeat(self, owner: str) -> int:
+        """owner가 맡은 미완료(queued/running) 작업의 updatedAt을 갱신하고 갱신한 작업 수를 반환"""
+
+    @abstractmethod
+    def claim_stale(self, updated_before: str, owner: str) -> List[Dict]:
+        """
+        updated_before 이전에 마지막으로 갱신된(heartbeat가 끊긴) 미완료 작업을 owner 소유의 queued로 표시하고 반환.
+        여러 워커가 동시에 호출해도 한 작업은 한 워커만 가져감
+        """
+
+
+class InMemoryJobStore(JobStore):
+    """
+    프로세스 메모리에 작업을 저장하는 기본 저장소. 완료된 작업은 최근 max_retained개만 유지
+    """
+
+    def __init__(self, max_retained: int = JOB_MAX_RETAINED):
+        self.max_retained = max_retained
+        self._jobs: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create(self, job: Dict) -> None:
+        with self._lock:
+            self._jobs[job["jobId"]] = dict(job)
+            self._evict()
+
+    def update(self, job_id: str, **fields) -> None:
+        with self._lock:
+            if job_id in self._jobs:
+                self._jobs[job_id].update(fields, updatedAt=_now())
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def heartbeat(self, owner: str) -> int:
+        with self._lock:
+            now = _now()
+            count = 0
+            for job in self._jobs.values():
+                if job.get("owner") == owner and job["status"] in UNFINISHED_STATUSES:
+                    job["updatedAt"] = now
+                    count += 1
+            return count
+
+    def claim_stale(self, updated_before: str, owner: str) -> List[Dict]:
+        with self._lock:
+            claimed = []
+            for job in self._jobs.values():
+                if job["status"] in UNFINISHED_STATUSES and job["updatedAt"] < updated_before:
+                    job.update(status=QUEUED, owner=owner, updatedAt=_now())
+                    claimed.append(dict(job))
+            return claimed
+
+    def _evict(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job["status"] not in UNFINISHED_STATUSES]
+        for job_id in finished[:max(0, len(self._jobs) - self.max_retained)]:
+            del self._jobs[job_id]
+
+
+class SQLiteJobStore(JobStore):
+    """
+    SQLite 파일에 작업을 저장하는 영구 저장소. 워커가 재시작되어도 작업 상태와 입력이 유지됨
+    """
+
+    _COLUMNS = ("jobId", "kind", "status", "payload", "result", "statusCode", "callbackUrl", "owner", "createdAt", "updatedAt")
+    _JSON_COLUMNS = ("payload", "result")
+
+    def __init__(self, path: str = JOB_STORE_PATH):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "jobId TEXT PRIMARY KEY, kind TEXT NOT NULL, status TEXT NOT NULL, payload TEXT, result TEXT, "
+            "statusCode INTEGER, callbackUrl TEXT, owner TEXT, createdAt TEXT, updatedAt TEXT)"
+        )
+        # owner 컬럼이 없던 이전 버전의 DB 파일은 컬럼을 추가
+        if "owner" not in {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}:
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN owner TEXT")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status)")
+        self._conn.commit()
+
+    def create(self, job: Dict) -> None:
+        row = [self._encode(column, job.get(column)) for column in self._COLUMNS]
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO jobs ({', '.join(self._COLUMNS)}) VALUES ({', '.join('?' * len(self._COLUMNS))})",
+                row,
+            )
+            self._conn.commit()
+
+    def update(self, job_id: str, **fields) -> None:
+        fields["updatedAt"] = _now()
+        columns = [column for column in fields if column in self._COLUMNS]
+        with self._lock:
+            self._conn.execute(
+                f"UPDATE jobs SET {', '.join(f'{column} = ?' for column in columns)} WHERE jobId = ?",
+                [self._encode(column, fields[column]) for column in columns] + [job_id],
+            )
+            self._conn.commit()
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(self._COLUMNS)} FROM jobs WHERE jobId = ?", (job_id,)
+            ).fetchone()
+        return self._decode(row) if row else None
+
+    def heartbeat(self, owner: str) -> int:
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET updatedAt = ? WHERE owner = ? AND status IN (?, ?)",
+                (_now(), owner, *UNFINISHED_STATUSES),
+            )
+            self._conn.commit()
+        return cursor.rowcount
+
+    def claim_stale(self, updated_before: str, owner: str) -> List[Dict]:
+        with self._lock:
+            # BEGIN IMMEDIATE로 쓰기 잠금을 잡아 다른 워커 프로세스와 중복 claim 방지
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._conn.execute(
+                    f"SELECT {', '.join(self._COLUMNS)} FROM jobs "
+                    "WHERE status IN (?, ?) AND updatedAt < ? ORDER BY createdAt",
+                    (*UNFINISHED_STATUSES, updated_before),
+                ).fetchall()
+                now = _now()
+                self._conn.executemany(
+                    "UPDATE jobs SET status = ?, owner = ?, updatedAt = ? WHERE jobId = ?",
+                    [(QUEUED, owner, now, row[0]) for row in rows],
+                )
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                raise
+        return [{**self._decode(row), "status": QUEUED, "owner": owner, "updatedAt": now} for row in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _encode(self, column: str, value):
+        if column in self._JSON_COLUMNS and value is not None:
+            return json.dumps(value, ensure_ascii=False)
+        return value
+
+    def _decode(self, row) -> Dict:
+        job = dict(zip(self._COLUMNS, row))
+        for column in self._JSON_COLUMNS:
+            if job[column] is not None:
+                job[column] = json.loads(job[column])
+        return job
+
+
+class JobRunner:
+    """
+    작업을 저장소에 기록하고 백그라운드 스레드 풀에서 실행.
+    handler는 payload를 받아 (응답 body, status code)를 반환.
+    실행을 맡은 작업(queued/running)은 heartbeat_seconds마다 updatedAt을 갱신하여 다른 워커가 가져가지 않도록 함
+    """
+
+    def __init__(self, store: JobStore, max_workers: int = JOB_MAX_WORKERS, heartbeat_seconds: float = JOB_HEARTBEAT_SECONDS):
+        self.store = store
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.handlers: Dict[str, Callable[[Dict], Tuple[Dict, int]]] = {}
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="job")
+        self.heartbeat_seconds = heartbeat_seconds
+        self._stop = threading.Event()
+        self._heartbeat_thread = None
+        if heartbeat_seconds > 0:
+            self._heartbeat_thread = threading.Thread(target=self._heartbeat, name="job-heartbeat", daemon=True)
+            self._heartbeat_thread.start()
+
+    def register(self, kind: str, handler: Callable[[Dict], Tuple[Dict, int]]) -> None:
+        self.handlers[kind] = handler
+
+    def submit(self, kind: str, payload: Dict, callback_url: Optional[str] = None) -> Dict:
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        now = _now()
+        job = {
+            "jobId": str(uuid.uuid4()),
+            "kind": kind,
+            "status": QUEUED,
+            "payload": payload,
+            "result": None,
+            "statusCode": None,
+            "callbackUrl": callback_url,
+            "owner": self.owner,
+            "createdAt": now,
+            "updatedAt": now,
+        }
+        self.store.create(job)
+        self._executor.submit(self._run, job)
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        return self.store.get(job_id)
+
+    def resume_unfinished(self, stale_after_seconds: int = JOB_RESUME_AFTER_SECONDS) -> int:
+        """
+        이전 프로세스에서 끝나지 못한 작업을 다시 실행.
+        살아 있는 워커가 맡은 작업은 heartbeat로 계속 갱신되므로, stale_after_seconds 이상 갱신되지 않은 작업만 가져옴
+        """
+        updated_before = (datetime.now(timezone.utc) - timedelta(seconds=stale_after_seconds)).isoformat()
+        jobs = [job for job in self.store.claim_stale(updated_before, self.owner) if job["kind"] in self.handlers]
+        for job in jobs:
+            logger.info(f"Resuming job {job['jobId']}")
+            self._executor.submit(self._run, job)
+        return len(jobs)
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+        # 남은 작업을 기다리는 동안에도 heartbeat를 유지하고, 끝난 뒤 중단
+        self._stop.set()
+        if self._heartbeat_thread is not None and wait:
+            self._heartbeat_thread.join(timeout=self.heartbeat_seconds)
+
+    def _heartbeat(self) -> None:
+        while not self._stop.wait(self.heartbeat_seconds):
+            try:
+                self.store.heartbeat(self.owner)
+            except Exception:
+                logger.exception("Failed to refresh job heartbeat")
+
+    def _run(self, job: Dict) -> None:
+        job_id = job["jobId"]
+        self.store.update(job_id, status=RUNNING)
+        try:
+            result, status_code = self.handlers[job["kind"]](job["payload"])
+        except Exception:
+            logger.exception(f"Job {job_id} failed")
+            result = handle_error("Job failed", "작업 실행에 실패했습니다.", 500)
+            status_code = 500
+
+        status = SUCCEEDED if status_code < 400 else FAILED
+        self.store.update(job_id, status=status, result=result, statusCode=status_code)
+
+        if job.get("callbackUrl"):
+            self._send_callback(job["callbackUrl"], {
+                "jobId": job_id,
+                "status": status,
+                "statusCode": status_code,
+                "result": result,
+            })
+
+    def _send_callback(self, url: str, body: Dict) -> None:
+        # 설정이 바뀌었거나 이전 버전에서 저장된 작업도 전송 직전에 다시 검증
+        error = validate_callback_url(url)
+        if error:
+            logger.warning(f"Skipping job callback to {url}: {error}")
+            return
+        request = urllib.request.Request(
+            url,
+            data=json.dumps(body, ensure_ascii=False).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        try:
+            with _callback_opener.open(request, timeout=JOB_CALLBACK_TIMEOUT_SECONDS) as response:
+                logger.info(f"Job callback to {url} returned {response.status}")
+        except Exception:
+            logger.exception(f"Job callback to {url} failed")
+
+
+def create_store() -> JobStore:
+    """JOB_STORE 설정에 맞는 작업 저장소 생성 (memory | sqlite)"""
+    if JOB_STORE == "sqlite":
+        return SQLiteJobStore(JOB_STORE_PATH)
+    return InMemoryJobStore()
+
+
+_runner: Optional[JobRunner] = None
+_runner_lock = threading.Lock()
+
+def get_job_runner() -> JobRunner:
+    """프로세스 전역 JobRunner 반환 (최초 호출 시 생성하고 작업 종류를 등록)"""
+    global _runner
+    if _runner is None:
+        with _runner_lock:
+            if _runner is None:
+                runner = JobRunner(create_store())
+                runner.register("process-document", lambda fields: document_pipeline.process_document(fields))
+                _runner = runner
+    return _runner
+
+def init_app(app) -> None:
+    """Flask 앱 생성 시 미완료 작업을 재개하고, 종료 시 실행 중인 작업을 마치도록 등록"""
+    runner = get_job_runner()
+    resumed = runner.resume_unfinished()
+    if resumed:
+        logger.info(f"Resumed {resumed} unfinished jobs")
+    atexit.register(runner.shutdown)
@@ -0,0 +1,138 @@
+import atexit
+import logging
+import threading
+from typing import Dict, Optional, Tuple
+import httpx
+from config import (
+    OPENAI_API_KEY,
+    LANGCHAIN_MODEL,
+    LLM_ROLE_MODELS,
+    LLM_ROLE_TEMPERATURES,
+    LLM_TIMEOUT_SECONDS,
+    LLM_CONNECT_TIMEOUT_SECONDS,
+    LLM_MAX_CONNECTIONS,
+    LLM_MAX_KEEPALIVE_CONNECTIONS,
+    LLM_KEEPALIVE_EXPIRY_SECONDS,
+    LLM_MAX_RETRIES,
+)
+
+logger = logging.getLogger(__name__)
+
+# 역할별 기본 temperature. 모델은 LLM_ROLE_MODELS에 없으면 LANGCHAIN_MODEL
+ROLES: Dict[str, float] = {
+    "generation": 0.1,      # 채팅 로그로 문서 생성
+    "extraction": 0.1,      # 키워드/카테고리/제목/요약 추출
+    "summarization": 0.0,   # /search-document reference 요약
+    "answering": 0.1,       # reference 기반 RAG 응답
+    "open_answering": 0.5,  # reference 없이 답변
+}
+
+
+def _parse_role_settings(value: str) -> Dict[str, str]:
+    """"role=value,role=value" 형식의 설정을 dict로 변환"""
+    settings = {}
+    for item in value.split(","):
+        role, _, setting = item.partition("=")
+        if role.strip() and setting.strip():
+            settings[role.strip()] = setting.strip()
+    return settings
+
+def role_config(role: str) -> Tuple[str, float]:
+    """역할의 (model, temperature). LLM_ROLE_MODELS / LLM_ROLE_TEMPERATURES로 역할별 지정"""
+    if role not in ROLES:
+        raise ValueError(f"Unknown LLM role: {role}")
+    model = _parse_role_settings(LLM_ROLE_MODELS).get(role, LANGCHAIN_MODEL)
+    temperature = _parse_role_settings(LLM_ROLE_TEMPERATURES).get(role)
+    return model, float(temperature) if temperature is not None else ROLES[role]
+
+def role_model(role: str) -> str:
+    return role_config(role)[0]
+
+
+class LLMRegistry:
+    """
+    역할별 chat 모델 레지스트리.
+    모든 모델(과 임베딩 클라이언트)이 keep-alive 연결 풀과 timeout 설정을 가진 httpx 클라이언트 하나를 공유하므로
+    모듈마다 별도의 연결 풀과 TLS handshake가 생기지 않음. 같은 (model, temperature)의 역할은 인스턴스도 공유
+    """
+
+    def __init__(self):
+        self._models: Dict[Tuple[str, float], object] = {}
+        self._http_client: Optional[httpx.Client] = None
+        self._http_async_client: Optional[httpx.AsyncClient] = None
+        self._lock = threading.Lock()
+
+    def _limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=LLM_MAX_CONNECTIONS,
+            max_keepalive_connections=LLM_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=LLM_KEEPALIVE_EXPIRY_SECONDS,
+        )
+
+    def _timeout(self) -> httpx.Timeout:
+        return httpx.Timeout(LLM_TIMEOUT_SECONDS, connect=LLM_CONNECT_TIMEOUT_SECONDS)
+
+    def http_client(self) -> httpx.Client:
+        """OpenAI 동기 요청에 공유하는 httpx 클라이언트"""
+        if self._http_client is None:
+            with self._lock:
+                if self._http_client is None:
+                    self._http_client = httpx.Client(limits=self._limits(), timeout=self._timeout())
+        return self._http_client
+
+    def http_async_client(self) -> httpx.AsyncClient:
+        """OpenAI 비동기 요청에 공유하는 httpx 클라이언트 (utils.async_runner의 이벤트 루프에서 사용)"""
+        if self._http_async_client is None:
+            with self._lock:
+                if self._http_async_client is None:
+                    self._http_async_client = httpx.AsyncClient(limits=self._limits(), timeout=self._timeout())
+        return self._http_async_client
+
+    def get(self, role: str):
+        """역할의 ChatOpenAI 인스턴스 반환 (최초 호출 시 생성)"""
+        key = role_config(role)
+        model = self._models.get(key)
+        if model is None:
+            http_client, http_async_client = self.http_client(), self.http_async_client()
+            with self._lock:
+                model = self._models.get(key)
+                if model is None:
+                    from langchain_openai import ChatOpenAI
+                    model = ChatOpenAI(
+                        api_key=OPENAI_API_KEY,
+                        model_name=key[0],
+                        temperature=key[1],
+                        timeout=LLM_TIMEOUT_SECONDS,
+                        max_retries=LLM_MAX_RETRIES,
+                        http_client=http_client,
+                        http_async_client=http_async_client,
+                    )
+                    self._models[key] = model
+                    logger.info(f"Created chat model {key[0]} (temperature={key[1]}) for role {role}")
+        return model
+
+    def close(self) -> None:
+        """공유 연결 풀을 닫음. 비동기 클라이언트는 이벤트 루프 종료와 함께 정리됨"""
+        with self._lock:
+            if self._http_client is not None:
+                self._http_client.close()
+            self._http_client = None
+            self._http_async_client = None
+            self._models.clear()
+
+
+_registry: Optional[LLMRegistry] = None
+_registry_lock = threading.Lock()
+
+def get_registry() -> LLMRegistry:
+    """프로세스 전역 LLMRegistry 반환 (최초 호출 시 생성)"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = LLMRegistry()
+                atexit.register(_registry.close)
+    return _registry
+
+def get_llm(role: str):
+    return get_registry().get(role)
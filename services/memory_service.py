@@ -1,43 +1,72 @@
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 import json
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from qdrant_client import QdrantClient
 from qdrant_client.http import models
-import numpy as np
-from langchain_openai import OpenAIEmbeddings
+import atexit
 import logging
 import uuid
+from config import (
+    MEMORY_COLLECTION_NAME,
+    MEMORY_TOP_K,
+    MEMORY_SCORE_THRESHOLD,
+    MEMORY_SEARCH_HNSW_EF,
+    MEMORY_WRITE_BEHIND_ENABLED,
+    MEMORY_WRITE_QUEUE_SIZE,
+    MEMORY_WRITE_BATCH_SIZE,
+    MEMORY_WRITE_FLUSH_SECONDS,
+)
+from services import qdrant_service
+from services.embedding_service import get_embedding_service
 from utils.error_handler import handle_error
+from utils.write_buffer import WriteBehindBuffer
+from utils import metrics
 
 logger = logging.getLogger(__name__)
 
+def build_memory_filter(organization_id: Optional[int] = None, user_id: Optional[int] = None) -> Optional[models.Filter]:
+    """조직/사용자 범위 필터. 둘 다 없으면 None"""
+    conditions = [
+        models.FieldCondition(key=key, match=models.MatchValue(value=value))
+        for key, value in (("organizationId", organization_id), ("userId", user_id))
+        if value is not None
+    ]
+    return models.Filter(must=conditions) if conditions else None
+
 class MemoryService:
-    def __init__(self, qdrant_client: QdrantClient, collection_name: str = "interaction_memory"):
+    def __init__(
+        self,
+        qdrant_client: QdrantClient,
+        collection_name: str = MEMORY_COLLECTION_NAME,
+        write_behind: bool = MEMORY_WRITE_BEHIND_ENABLED,
+        async_client=None
+    ):
         self.qdrant_client = qdrant_client
+        # 비동기 메서드(a*)에서 사용. 지정하지 않으면 qdrant_service의 공유 비동기 클라이언트 사용
+        self.async_client = async_client
         self.collection_name = collection_name
-        self.encoder = OpenAIEmbeddings(
-            model="text-embedding-3-large",
-            dimensions=1024
-        )
+        self.encoder = get_embedding_service()
         self._ensure_collection_exists()
 
+        # 상호작용 저장은 응답 경로에서 분리하여 백그라운드에서 batch 임베딩/upsert
+        self.write_buffer = None
+        if write_behind:
+            self.write_buffer = WriteBehindBuffer(
+                self.store_interactions,
+                max_size=MEMORY_WRITE_QUEUE_SIZE,
+                batch_size=MEMORY_WRITE_BATCH_SIZE,
+                flush_interval=MEMORY_WRITE_FLUSH_SECONDS,
+                name="memory-writer"
+            )
+            atexit.register(self.write_buffer.close)
+            metrics.REGISTRY.register_collector("memory_write_buffer", metrics.write_buffer_collector(self.write_buffer))
+
     def _ensure_collection_exists(self):
         """qdrant에 지정된 컬렉션이 존재하는지 확인하고, 없으면 생성"""
         try:
-            collections = self.qdrant_client.get_collections().collections
-            collection_names = [collection.name for collection in collections]
-            
-            if self.collection_name not in collection_names:
-                self.qdrant_client.create_collection(
-                    collection_name=self.collection_name,
-                    vectors_config=models.VectorParams(
-                        size=1024,
-                        distance=models.Distance.COSINE
-                    )
-                )
-                logger.info(f"신규 컬렉션 생성: {self.collection_name}")
+            qdrant_service.ensure_memory_collection(self.qdrant_client, self.collection_name)
         except Exception as e:
-            error_response, _ = handle_error(
+            error_response = handle_error(
                 "Error ensuring collection exists",
                 f"Failed to ensure collection {self.collection_name} exists: {str(e)}",
                 500
@@ -45,25 +74,49 @@ class MemoryService:
             logger.error(error_response["message"])
             raise Exception(error_response["message"])
 
-    def store_interaction(self, query: str, response: str, metadata: Optional[Dict] = None) -> str:
+    def store_interaction(
+        self,
+        query: str,
+        response: str,
+        metadata: Optional[Dict] = None,
+        organization_id: Optional[int] = None,
+        user_id: Optional[int] = None,
+        refs_hash: Optional[str] = None
+    ) -> str:
         """
-        querty와 response를 저장하고, 메타데이터를 포함하여 Qdrant에 상호작용 기록을 저장
+        querty와 response를 저장하고, 메타데이터를 포함하여 Qdrant에 상호작용 기록을 저장.
+        organizationId/userId는 검색 범위를 제한하기 위해, refsHash는 응답 캐시 조회를 위해 payload 최상위에 저장.
+        write-behind 버퍼를 사용하면 큐에 넣고 바로 반환
+        """
+        # Create interaction record
+        interaction = {
+            "query": query,
+            "response": response,
+            "timestamp": datetime.utcnow().isoformat(),
+            "metadata": metadata or {},
+            "organizationId": organization_id,
+            "userId": user_id,
+            "refsHash": refs_hash
+        }
+
+        # Generate a unique ID using UUID
+        interaction_id = str(uuid.uuid4())
+
+        if self.write_buffer is not None:
+            self.write_buffer.put((interaction_id, interaction))
+            return interaction_id
+
+        self.store_interactions([(interaction_id, interaction)])
+        return interaction_id
+
+    def store_interactions(self, interactions: List[Tuple[str, Dict]]) -> None:
+        """
+        (id, payload) 상호작용 목록을 한 번의 batch 임베딩과 upsert로 저장
         """
         try:
-            # Create interaction record
-            interaction = {
-                "query": query,
-                "response": response,
-                "timestamp": datetime.utcnow().isoformat(),
-                "metadata": metadata or {}
-            }
-            
-            # Encode the query for vector search
-            query_vector = self.encoder.embed_query(query)
-            
-            # Generate a unique ID using UUID
-            interaction_id = str(uuid.uuid4())
-            
+            # Encode the queries for vector search
+            query_vectors = self.encoder.embed_documents([interaction["query"] for _, interaction in interactions])
+
             # Store in Qdrant
             self.qdrant_client.upsert(
                 collection_name=self.collection_name,
@@ -73,13 +126,12 @@ class MemoryService:
                         vector=query_vector,
                         payload=interaction
                     )
+                    for (interaction_id, interaction), query_vector in zip(interactions, query_vectors)
                 ]
             )
             
-            return interaction_id
-            
         except Exception as e:
-            error_response, _ = handle_error(
+            error_response = handle_error(
                 "Error storing interaction",
                 f"Failed to store interaction: {str(e)}",
                 500
@@ -87,9 +139,21 @@ class MemoryService:
             logger.error(error_response["message"])
             raise Exception(error_response["message"])
 
-    def retrieve_relevant_memories(self, query: str, limit: int = 3) -> List[Dict]:
+    def write_stats(self) -> Dict[str, int]:
+        """write-behind 큐 길이와 enqueued/flushed/dropped/failed 카운터"""
+        return self.write_buffer.stats() if self.write_buffer is not None else {}
+
+    def retrieve_relevant_memories(
+        self,
+        query: str,
+        limit: int = MEMORY_TOP_K,
+        organization_id: Optional[int] = None,
+        user_id: Optional[int] = None,
+        score_threshold: Optional[float] = MEMORY_SCORE_THRESHOLD
+    ) -> List[Dict]:
         """
-        기존 상호작용에서 관련된 기억을 검색하고 반환
+        기존 상호작용에서 관련된 기억을 검색하고 반환.
+        organization_id/user_id가 주어지면 해당 조직/사용자의 기억만, score_threshold 이상인 것만 반환
         """
         try:
             # Encode the query
@@ -97,22 +161,108 @@ class MemoryService:
             
             # Search for similar interactions
             search_result = self.qdrant_client.search(
-                collection_name=self.collection_name,
-                query_vector=query_vector,
-                limit=limit
+                **self._memory_search(query_vector, limit, organization_id, user_id, score_threshold)
             )
             
             # Extract and return the interactions
             return [hit.payload for hit in search_result]
             
         except Exception as e:
-            error_response, _ = handle_error(
-                "Error retrieving memories",
-                f"Failed to retrieve relevant memories: {str(e)}",
-                500
+            self._raise_retrieval_error(e)
+
+    async def aretrieve_relevant_memories(
+        self,
+        query: str,
+        limit: int = MEMORY_TOP_K,
+        organization_id: Optional[int] = None,
+        user_id: Optional[int] = None,
+        score_threshold: Optional[float] = MEMORY_SCORE_THRESHOLD
+    ) -> List[Dict]:
+        """
+        retrieve_relevant_memories의 비동기 버전
+        """
+        try:
+            query_vector = await self.encoder.aembed_query(query)
+            search_result = await self._async_client().search(
+                **self._memory_search(query_vector, limit, organization_id, user_id, score_threshold)
             )
-            logger.error(error_response["message"])
-            raise Exception(error_response["message"])
+            return [hit.payload for hit in search_result]
+        except Exception as e:
+            self._raise_retrieval_error(e)
+
+    def _memory_search(self, query_vector, limit, organization_id, user_id, score_threshold) -> Dict:
+        return {
+            "collection_name": self.collection_name,
+            "query_vector": query_vector,
+            "query_filter": build_memory_filter(organization_id, user_id),
+            "search_params": models.SearchParams(hnsw_ef=MEMORY_SEARCH_HNSW_EF),
+            "score_threshold": score_threshold,
+            "limit": limit,
+        }
+
+    def _raise_retrieval_error(self, error: Exception) -> None:
+        error_response = handle_error(
+            "Error retrieving memories",
+            f"Failed to retrieve relevant memories: {str(error)}",
+            500
+        )
+        logger.error(error_response["message"])
+        raise Exception(error_response["message"])
+
+    def _async_client(self):
+        return self.async_client or qdrant_service.get_async_client()
+
+    def find_similar_interaction(
+        self,
+        query: str,
+        organization_id: int,
+        refs_hash: str,
+        score_threshold: float,
+        max_age_seconds: int
+    ) -> Optional[Dict]:
+        """
+        같은 조직에서 같은 reference 집합으로 max_age_seconds 이내에 저장된 상호작용 중
+        질문 유사도가 score_threshold 이상인 가장 가까운 상호작용 payload(score 포함)를 반환
+        """
+        query_vector = self.encoder.embed_query(query)
+        search_result = self.qdrant_client.search(
+            **self._similar_interaction_search(query_vector, organization_id, refs_hash, score_threshold, max_age_seconds)
+        )
+        if not search_result:
+            return None
+        return {**search_result[0].payload, "score": search_result[0].score}
+
+    async def afind_similar_interaction(
+        self,
+        query: str,
+        organization_id: int,
+        refs_hash: str,
+        score_threshold: float,
+        max_age_seconds: int
+    ) -> Optional[Dict]:
+        """find_similar_interaction의 비동기 버전"""
+        query_vector = await self.encoder.aembed_query(query)
+        search_result = await self._async_client().search(
+            **self._similar_interaction_search(query_vector, organization_id, refs_hash, score_threshold, max_age_seconds)
+        )
+        if not search_result:
+            return None
+        return {**search_result[0].payload, "score": search_result[0].score}
+
+    def _similar_interaction_search(self, query_vector, organization_id, refs_hash, score_threshold, max_age_seconds) -> Dict:
+        since = datetime.now(timezone.utc) - timedelta(seconds=max_age_seconds)
+        return {
+            "collection_name": self.collection_name,
+            "query_vector": query_vector,
+            "query_filter": models.Filter(must=[
+                models.FieldCondition(key="organizationId", match=models.MatchValue(value=organization_id)),
+                models.FieldCondition(key="refsHash", match=models.MatchValue(value=refs_hash)),
+                models.FieldCondition(key="timestamp", range=models.DatetimeRange(gte=since)),
+            ]),
+            "search_params": models.SearchParams(hnsw_ef=MEMORY_SEARCH_HNSW_EF),
+            "score_threshold": score_threshold,
+            "limit": 1,
+        }
 
     def format_memories_for_prompt(self, memories: List[Dict]) -> str:
         """
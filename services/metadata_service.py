@@ -0,0 +1,87 @@
+import logging
+import time
+from typing import Optional
+from config import METADATA_EXTRACTION_MODE
+from services import extract_keyword, generate_summary
+from services.pipeline import is_error_result
+from utils import metrics
+
+logger = logging.getLogger(__name__)
+
+SPLIT = "split"
+COMBINED = "combined"
+MODES = (SPLIT, COMBINED)
+
+
+def resolve_mode(mode: Optional[str] = None) -> str:
+    """요청별 metadataMode 값을 확인하고, 없거나 알 수 없는 값이면 METADATA_EXTRACTION_MODE 사용"""
+    mode = (mode or METADATA_EXTRACTION_MODE).lower()
+    if mode not in MODES:
+        logger.warning(f"Unknown metadata extraction mode '{mode}', using '{SPLIT}'")
+        return SPLIT
+    return mode
+
+def extract_metadata(chat_context: str, mode: Optional[str] = None) -> dict:
+    """
+    키워드와 카테고리를 추출. combined 모드에서는 제목과 요약까지 한 번의 호출로 추출하며,
+    실패하면 기존 키워드/카테고리 추출 호출로 fallback (이 경우 제목/요약은 summarize에서 생성)
+    """
+    mode = resolve_mode(mode)
+    started = time.perf_counter()
+    if mode == COMBINED:
+        result = extract_keyword.extract_document_metadata(chat_context)
+        if not is_error_result(result):
+            logger.info(f"Metadata extraction mode={mode} took {time.perf_counter() - started:.2f}s")
+            return result
+        logger.warning(f"Combined metadata extraction failed, falling back to split: {result.get('error')}")
+        metrics.record_fallback("extract_metadata", "combined_failed")
+
+    result = extract_keyword.extract_keywords_and_category(chat_context)
+    logger.info(f"Metadata extraction mode={mode} (keywords/category) took {time.perf_counter() - started:.2f}s")
+    return result
+
+async def aextract_metadata(chat_context: str, mode: Optional[str] = None) -> dict:
+    """extract_metadata의 비동기 버전"""
+    mode = resolve_mode(mode)
+    started = time.perf_counter()
+    if mode == COMBINED:
+        result = await extract_keyword.aextract_document_metadata(chat_context)
+        if not is_error_result(result):
+            logger.info(f"Metadata extraction mode={mode} took {time.perf_counter() - started:.2f}s")
+            return result
+        logger.warning(f"Combined metadata extraction failed, falling back to split: {result.get('error')}")
+        metrics.record_fallback("extract_metadata", "combined_failed")
+
+    result = await extract_keyword.aextract_keywords_and_category(chat_context)
+    logger.info(f"Metadata extraction mode={mode} (keywords/category) took {time.perf_counter() - started:.2f}s")
+    return result
+
+def has_summary(metadata: dict) -> bool:
+    return bool(metadata.get("title")) and bool(metadata.get("summary"))
+
+def summarize(chat_context: str, metadata: dict) -> dict:
+    """combined 추출 결과에 제목/요약이 있으면 그대로 사용하고, 없으면 요약 LLM 호출"""
+    if has_summary(metadata):
+        return {"title": metadata["title"], "summary": metadata["summary"]}
+    return generate_summary.generate_document_summary(chat_context, metadata.get("category"))
+
+async def asummarize(chat_context: str, metadata: dict) -> dict:
+    """summarize의 비동기 버전"""
+    if has_summary(metadata):
+        return {"title": metadata["title"], "summary": metadata["summary"]}
+    return await generate_summary.agenerate_document_summary(chat_context, metadata.get("category"))
+
+def extract_document_metadata(chat_context: str, mode: Optional[str] = None) -> dict:
+    """키워드, 카테고리, 제목, 요약을 모두 반환 (실패 시 error dict)"""
+    metadata = extract_metadata(chat_context, mode)
+    if is_error_result(metadata):
+        return metadata
+    summary_doc = summarize(chat_context, metadata)
+    if is_error_result(summary_doc):
+        return summary_doc
+    return {
+        "keywords": metadata.get("keywords"),
+        "category": metadata.get("category"),
+        "title": summary_doc.get("title"),
+        "summary": summary_doc.get("summary"),
+    }
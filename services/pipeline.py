@@ -0,0 +1,171 @@
+import asyncio
+import contextvars
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Sequence
+from config import PIPELINE_MAX_WORKERS
+from utils import metrics
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Stage:
+    """
+    파이프라인의 단일 단계. func는 선행 단계 결과(dict)를 받아 결과를 반환
+    """
+    name: str
+    func: Callable[[Dict[str, Any]], Any]
+    depends_on: Sequence[str] = ()
+
+
+class StageFailed(Exception):
+    """단계가 error dict를 반환했을 때 남은 단계 실행을 중단하기 위한 예외"""
+
+    def __init__(self, stage: str, result: Dict):
+        super().__init__(f"Stage '{stage}' failed: {result.get('error')}")
+        self.stage = stage
+        self.result = result
+
+
+def is_error_result(result: Any) -> bool:
+    """서비스 함수가 handle_error 형식의 dict를 반환했는지 확인"""
+    return isinstance(result, dict) and "error" in result
+
+
+def _check_dependencies(stages: List[Stage]) -> None:
+    names = {stage.name for stage in stages}
+    for stage in stages:
+        missing = [dep for dep in stage.depends_on if dep not in names]
+        if missing:
+            raise ValueError(f"Stage '{stage.name}' depends on unknown stages: {missing}")
+
+def _run_stage(pipeline: str, stage: Stage, deps: Dict[str, Any]) -> Any:
+    """단계 실행 시간을 pipeline/stage 라벨로 기록 (status: ok | failed(error dict) | error(예외))"""
+    started = time.perf_counter()
+    status = "error"
+    try:
+        result = stage.func(deps)
+        status = "failed" if is_error_result(result) else "ok"
+        return result
+    finally:
+        metrics.STAGE_SECONDS.observe(time.perf_counter() - started, pipeline=pipeline, stage=stage.name, status=status)
+
+def run_stages(
+    stages: List[Stage],
+    max_workers: int = PIPELINE_MAX_WORKERS,
+    name: str = "pipeline",
+) -> Dict[str, Any]:
+    """
+    의존성이 해결된 단계부터 최대 max_workers개까지 동시에 실행하고 단계별 결과를 반환.
+    어떤 단계가 error dict를 반환하면 StageFailed, 예외가 발생하면 그대로 다시 발생시킴
+    """
+    _check_dependencies(stages)
+
+    results: Dict[str, Any] = {}
+    pending = list(stages)
+    running = {}
+
+    executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="stage")
+    try:
+        while pending or running:
+            ready = [s for s in pending if all(dep in results for dep in s.depends_on)]
+            for stage in ready:
+                pending.remove(stage)
+                deps = {dep: results[dep] for dep in stage.depends_on}
+                # 요청의 지연 예산(utils.resilience) 등 contextvar를 단계 스레드로 전달
+                running[executor.submit(contextvars.copy_context().run, _run_stage, name, stage, deps)] = stage
+
+            if not running:
+                raise ValueError(f"Unresolvable stage dependencies: {[s.name for s in pending]}")
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage = running.pop(future)
+                result = future.result()
+                if is_error_result(result):
+                    raise StageFailed(stage.name, result)
+                results[stage.name] = result
+    finally:
+        # 실패 시 이미 실행 중인 단계를 기다리지 않고 바로 반환
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return results
+
+
+def run_concurrently(tasks: Sequence[Callable[[], Any]], max_workers: int = PIPELINE_MAX_WORKERS) -> List[Any]:
+    """
+    인자 없는 작업들을 최대 max_workers개까지 동시에 실행.
+    결과는 입력 순서를 유지하며, 작업에서 발생한 예외는 해당 위치의 결과로 반환
+    """
+    if not tasks:
+        return []
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(tasks))), thread_name_prefix="task") as executor:
+        futures = [executor.submit(contextvars.copy_context().run, task) for task in tasks]
+
+    results = []
+    for future in futures:
+        error = future.exception()
+        results.append(error if error is not None else future.result())
+    return results
+
+
+async def _arun_stage(pipeline: str, stage: Stage, deps: Dict[str, Any]) -> Any:
+    started = time.perf_counter()
+    status = "error"
+    try:
+        result = await stage.func(deps)
+        status = "failed" if is_error_result(result) else "ok"
+        return result
+    finally:
+        metrics.STAGE_SECONDS.observe(time.perf_counter() - started, pipeline=pipeline, stage=stage.name, status=status)
+
+async def arun_stages(stages: List[Stage], name: str = "pipeline") -> Dict[str, Any]:
+    """
+    run_stages의 코루틴 버전. stage.func는 async 함수이며, 의존성이 해결된 단계를 현재 이벤트 루프에서 동시에 실행.
+    실패 시 실행 중인 나머지 단계는 취소
+    """
+    _check_dependencies(stages)
+
+    results: Dict[str, Any] = {}
+    pending = list(stages)
+    running = {}
+    try:
+        while pending or running:
+            ready = [s for s in pending if all(dep in results for dep in s.depends_on)]
+            for stage in ready:
+                pending.remove(stage)
+                deps = {dep: results[dep] for dep in stage.depends_on}
+                running[asyncio.ensure_future(_arun_stage(name, stage, deps))] = stage
+
+            if not running:
+                raise ValueError(f"Unresolvable stage dependencies: {[s.name for s in pending]}")
+
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                stage = running.pop(task)
+                result = task.result()
+                if is_error_result(result):
+                    raise StageFailed(stage.name, result)
+                results[stage.name] = result
+    finally:
+        for task in running:
+            task.cancel()
+
+    return results
+
+async def arun_concurrently(tasks: Sequence[Callable[[], Awaitable]], max_workers: int = PIPELINE_MAX_WORKERS) -> List[Any]:
+    """
+    run_concurrently의 코루틴 버전. 최대 max_workers개까지 동시에 await하며,
+    결과는 입력 순서를 유지하고 예외는 해당 위치의 결과로 반환
+    """
+    semaphore = asyncio.Semaphore(max(1, max_workers))
+
+    async def limited(task):
+        async with semaphore:
+            return await task()
+
+    return list(await asyncio.gather(*(limited(task) for task in tasks), return_exceptions=True))
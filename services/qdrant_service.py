@@ -1,83 +1,574 @@
+import atexit
+import hashlib
 import logging
-from typing import Dict
+import threading
+import uuid
+from functools import lru_cache
+from typing import Dict, List, Optional
 import os
 import sys
 from qdrant_client import QdrantClient
 from qdrant_client.http import models
-from langchain_openai import OpenAIEmbeddings
-from config import QDRANT_URL, QDRANT_COLLECTION_NAME
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from config import (
+    QDRANT_URL,
+    QDRANT_COLLECTION_NAME,
+    QDRANT_CHUNK_COLLECTION_NAME,
+    CHUNK_INDEXING_ENABLED,
+    CHUNK_SIZE_TOKENS,
+    CHUNK_OVERLAP_TOKENS,
+    QDRANT_UPSERT_BATCH_SIZE,
+    MEMORY_COLLECTION_NAME,
+    MEMORY_HNSW_M,
+    MEMORY_HNSW_EF_CONSTRUCT,
+    MEMORY_HNSW_PAYLOAD_M,
+    EMBEDDING_MODEL,
+    EMBEDDING_DIMENSIONS,
+    QDRANT_BOOTSTRAP,
+    INGEST_VERSION,
+)
+from services import generate_summary, llm_registry
+from services.embedding_service import get_embedding_service
+from services.vector_store import create_client, create_async_client
 from utils.error_handler import handle_error
+from utils import resilience
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 
-def get_client() -> QdrantClient:
+# (url, prefer_grpc) 별로 프로세스 전역에서 재사용하는 클라이언트. gRPC 채널은 thread-safe.
+# VECTOR_STORE=local 이면 Qdrant 대신 같은 메서드를 제공하는 프로세스 내 저장소를 사용
+_clients: Dict[tuple, QdrantClient] = {}
+_clients_lock = threading.Lock()
+# SERVING_MODE=async에서 사용하는 비동기 클라이언트 (utils.async_runner의 이벤트 루프에서만 사용)
+_async_clients: Dict[tuple, object] = {}
+
+# documents/chunk 컬렉션의 필터 검색용 payload 인덱스
+DOCUMENT_PAYLOAD_INDEXES = {
+    "organizationId": models.PayloadSchemaType.INTEGER,
+    "category": models.PayloadSchemaType.KEYWORD,
+    "createdAt": models.PayloadSchemaType.DATETIME,
+}
+CHUNK_PAYLOAD_INDEXES = {
+    **DOCUMENT_PAYLOAD_INDEXES,
+    "documentId": models.PayloadSchemaType.INTEGER,
+}
+# 상호작용 메모리 컬렉션은 조직/사용자 범위로만 검색. refsHash/timestamp는 응답 캐시 조회용
+MEMORY_PAYLOAD_INDEXES = {
+    "organizationId": models.PayloadSchemaType.INTEGER,
+    "userId": models.PayloadSchemaType.INTEGER,
+    "refsHash": models.PayloadSchemaType.KEYWORD,
+    "timestamp": models.PayloadSchemaType.DATETIME,
+}
+
+# 본문과 무관하게 바뀔 수 있는 문서 필드. 이 필드만 바뀌면 재분석/재임베딩 없이 payload만 갱신
+DOCUMENT_METADATA_FIELDS = ("userId", "createdBy", "createdAt", "organizationId")
+# 그중 chunk payload에도 복사되는 필드
+CHUNK_METADATA_FIELDS = ("createdAt", "organizationId")
+
+# 존재 여부를 이미 확인한 컬렉션
+_ready_collections = set()
+_collections_lock = threading.Lock()
+
+def get_client(url: str = QDRANT_URL, prefer_grpc: bool = True) -> QdrantClient:
+    """
+    qdrant 클라이언트 반환. 최초 호출 시에만 생성하고 이후에는 같은 채널을 재사용
+    """
+    key = (url, prefer_grpc)
+    client = _clients.get(key)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is None:
+                client = create_client(url, prefer_grpc)
+                _clients[key] = client
+    return client
+
+def get_async_client(url: str = QDRANT_URL, prefer_grpc: bool = True):
+    """
+    비동기 qdrant 클라이언트 반환. 연결이 처음 사용한 이벤트 루프에 묶이므로 async_runner의 루프에서만 호출
+    """
+    key = (url, prefer_grpc)
+    client = _async_clients.get(key)
+    if client is None:
+        local_client = get_client(url, prefer_grpc)
+        with _clients_lock:
+            client = _async_clients.get(key)
+            if client is None:
+                client = create_async_client(url, prefer_grpc, local_client=local_client)
+                _async_clients[key] = client
+    return client
+
+def ensure_collection(
+    collection_name: str,
+    distance: models.Distance = models.Distance.DOT,
+    size: int = EMBEDDING_DIMENSIONS,
+    client: Optional[QdrantClient] = None,
+    payload_indexes: Optional[Dict[str, models.PayloadSchemaType]] = None,
+    hnsw_config: Optional[models.HnswConfigDiff] = None,
+) -> None:
+    """
+    컬렉션이 없으면 생성하고 payload 인덱스를 생성. 프로세스당 컬렉션별로 한 번만 Qdrant에 확인.
+    hnsw_config를 지정하면 기존 컬렉션의 HNSW 설정이 다를 때 갱신
+    """
+    if collection_name in _ready_collections:
+        return
+    with _collections_lock:
+        if collection_name in _ready_collections:
+            return
+        client = client or get_client()
+        if not client.collection_exists(collection_name):
+            client.create_collection(
+                collection_name=collection_name,
+                vectors_config=models.VectorParams(size=size, distance=distance),
+                hnsw_config=hnsw_config,
+            )
+            logging.info(f"Created Qdrant collection: {collection_name}")
+        elif hnsw_config is not None:
+            current = client.get_collection(collection_name).config.hnsw_config
+            changed = {
+                name: value for name, value in hnsw_config.model_dump(exclude_none=True).items()
+                if getattr(current, name, None) != value
+            }
+            if changed:
+                client.update_collection(collection_name=collection_name, hnsw_config=hnsw_config)
+                logging.info(f"Updated HNSW config of {collection_name}: {changed}")
+        # 이미 존재하는 인덱스에 대한 생성 요청은 Qdrant에서 무시됨
+        for field_name, field_schema in (payload_indexes or {}).items():
+            client.create_payload_index(
+                collection_name=collection_name,
+                field_name=field_name,
+                field_schema=field_schema,
+            )
+        _ready_collections.add(collection_name)
+
+def ensure_document_collections(client: Optional[QdrantClient] = None) -> None:
+    """documents 컬렉션과 (사용 시) chunk 컬렉션을 payload 인덱스와 함께 준비"""
+    ensure_collection(
+        QDRANT_COLLECTION_NAME,
+        distance=models.Distance.DOT,
+        client=client,
+        payload_indexes=DOCUMENT_PAYLOAD_INDEXES,
+    )
+    if CHUNK_INDEXING_ENABLED:
+        ensure_collection(
+            QDRANT_CHUNK_COLLECTION_NAME,
+            distance=models.Distance.COSINE,
+            client=client,
+            payload_indexes=CHUNK_PAYLOAD_INDEXES,
+        )
+
+def memory_hnsw_config() -> models.HnswConfigDiff:
+    """
+    메모리 컬렉션 HNSW 설정. MEMORY_HNSW_PAYLOAD_M을 지정하면 조직/사용자별 그래프를 추가로 구성
+    """
+    return models.HnswConfigDiff(
+        m=MEMORY_HNSW_M,
+        ef_construct=MEMORY_HNSW_EF_CONSTRUCT,
+        payload_m=MEMORY_HNSW_PAYLOAD_M or None,
+    )
+
+def ensure_memory_collection(
+    client: Optional[QdrantClient] = None,
+    collection_name: str = MEMORY_COLLECTION_NAME,
+) -> None:
+    """상호작용 메모리 컬렉션을 payload 인덱스 및 HNSW 설정과 함께 준비"""
+    ensure_collection(
+        collection_name,
+        distance=models.Distance.COSINE,
+        client=client,
+        payload_indexes=MEMORY_PAYLOAD_INDEXES,
+        hnsw_config=memory_hnsw_config(),
+    )
+
+def bootstrap_collections() -> None:
+    """서버 시작 시 사용하는 컬렉션을 한 번에 준비"""
+    ensure_document_collections()
+    ensure_memory_collection()
+
+def close_clients() -> None:
+    """생성된 클라이언트의 채널을 모두 닫음"""
+    with _clients_lock:
+        for client in _clients.values():
+            try:
+                client.close()
+            except Exception:
+                logging.exception("Error closing Qdrant client")
+        _clients.clear()
+        _async_clients.clear()
+    with _collections_lock:
+        _ready_collections.clear()
+
+def _bootstrap_in_background() -> None:
+    try:
+        bootstrap_collections()
+    except Exception as e:
+        # 준비하지 못한 컬렉션은 해당 컬렉션을 처음 사용하는 요청에서 다시 준비
+        logging.warning(f"Qdrant bootstrap failed, collections will be prepared on first use: {e}")
+
+def init_app(app) -> None:
     """
-    qdrant 클라이언트 초기화
+    Flask 앱 생성 시 컬렉션 준비를 시작하고, 프로세스 종료 시 채널을 닫도록 등록.
+    QDRANT_BOOTSTRAP=background(기본값)이면 별도 스레드에서 준비하므로 Qdrant 연결을 기다리지 않고 바로 요청을 받음
     """
-    return QdrantClient(
-        url=QDRANT_URL,
-        prefer_grpc=True,
+    atexit.register(close_clients)
+    if QDRANT_BOOTSTRAP == "sync":
+        bootstrap_collections()
+    elif QDRANT_BOOTSTRAP == "background":
+        threading.Thread(target=_bootstrap_in_background, name="qdrant-bootstrap", daemon=True).start()
+
+def document_embedding_text(payload: Dict) -> str:
+    """
+    문서 임베딩에 사용하는 텍스트.
+    chunk 인덱싱을 사용하면 본문은 chunk 벡터로 저장되므로 제목 + 요약만 사용
+    """
+    if CHUNK_INDEXING_ENABLED and payload.get("summary"):
+        return f"{payload.get('title', '')} {payload.get('summary', '')}".strip()
+    return f"{payload.get('title', '')} {payload.get('document', '')}".strip()
+
+def build_document_point(document_id, vector: List[float], payload: Dict) -> models.PointStruct:
+    """documents 컬렉션에 저장할 point 생성"""
+    return models.PointStruct(
+        id=document_id,
+        vector=vector,
+        payload={
+            "title": payload.get("title"),
+            "summary": payload.get("summary"),
+            "userId": payload.get("userId"),
+            "createdBy": payload.get("createdBy"),
+            "keywords": payload.get("keywords"),
+            "category": payload.get("category"),
+            "createdAt": payload.get("createdAt"),
+            "organizationId": payload.get("organizationId"),
+            # 생성봇은 LLM이 만든 문서가 아니라 입력 채팅(sourceContent)을 기준으로 변경 여부를 판단
+            "contentHash": document_content_hash(payload.get("sourceContent") or payload.get("document") or ""),
+            **ingest_versions(),
+        }
     )
 
-def store_document_embedding(document_id: str, payload: Dict) -> None:
+def document_content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+def ingest_versions() -> Dict:
+    """문서 분석/요약/임베딩 결과를 결정하는 모델과 버전. payload에 함께 저장하여 변경 시 다시 저장"""
+    return {
+        "llmModel": llm_registry.role_model("extraction"),
+        "summaryModel": llm_registry.role_model(generate_summary.SUMMARY_ROLE),
+        "embeddingModel": f"{EMBEDDING_MODEL}:{EMBEDDING_DIMENSIONS}",
+        "ingestVersion": INGEST_VERSION,
+    }
+
+def classify_document_change(stored: Optional[Dict], content: str, metadata: Dict) -> str:
+    """
+    저장된 payload와 비교한 변경 종류.
+    new: 저장된 적 없음 | content: 내용 또는 모델/버전 변경 | metadata: 메타데이터만 변경 | unchanged: 변경 없음
+    """
+    if not stored:
+        return "new"
+    expected = {"contentHash": document_content_hash(content or ""), **ingest_versions()}
+    if any(stored.get(key) != value for key, value in expected.items()):
+        return "content"
+    if any(stored.get(field) != metadata.get(field) for field in DOCUMENT_METADATA_FIELDS):
+        return "metadata"
+    return "unchanged"
+
+def get_document_payloads(document_ids: List) -> Dict:
     """
-    document_id를 기반으로 Qdrant에 문서 임베딩을 저장
+    저장된 문서 payload {document_id: payload}. 조회에 실패하면 빈 dict를 반환하여 모두 새로 저장하도록 함
     """
+    if not document_ids:
+        return {}
     try:
-        # Initialize embeddings model
-        embeddings_model = OpenAIEmbeddings(
-            model="text-embedding-3-large",
-            dimensions=1024
+        client = get_client()
+        ensure_document_collections(client)
+        records = client.retrieve(
+            collection_name=QDRANT_COLLECTION_NAME,
+            ids=list(document_ids),
+            with_payload=True,
+            with_vectors=False,
         )
-        
-        # Combine title and summary for embedding
-        combined_text = f"{payload.get('title', '')} {payload.get('document', '')}".strip()
-        
-        # Compute the embedding vector
-        vector = embeddings_model.embed_query(combined_text)
-        
-        # Initialize Qdrant client
-        client = QdrantClient(
-            url=QDRANT_URL,
-            prefer_grpc=True,
+        return {record.id: record.payload or {} for record in records}
+    except Exception as e:
+        logging.warning(f"Failed to look up stored documents, storing them again: {e}")
+        return {}
+
+def update_document_metadata(document_id, metadata: Dict) -> None:
+    """본문이 같은 문서의 메타데이터 필드만 set_payload로 갱신 (벡터와 LLM 메타데이터는 유지)"""
+    client = get_client()
+    client.set_payload(
+        collection_name=QDRANT_COLLECTION_NAME,
+        payload={field: metadata.get(field) for field in DOCUMENT_METADATA_FIELDS},
+        points=[document_id],
+    )
+    if CHUNK_INDEXING_ENABLED:
+        client.set_payload(
+            collection_name=QDRANT_CHUNK_COLLECTION_NAME,
+            payload={field: metadata.get(field) for field in CHUNK_METADATA_FIELDS},
+            points=models.FilterSelector(filter=models.Filter(must=[
+                models.FieldCondition(key="documentId", match=models.MatchValue(value=document_id)),
+            ])),
         )
-        
-        # Check if the collection exists, create if it doesn't
-        if not client.collection_exists(QDRANT_COLLECTION_NAME):
-            client.create_collection(
-                collection_name=QDRANT_COLLECTION_NAME,
-                vectors_config=models.VectorParams(size=1024, distance=models.Distance.DOT),
-            )
-        
-        # Create the point with the required structure
-        point = models.PointStruct(
-            id=document_id,
+
+def upsert_document_points(points: List[models.PointStruct], batch_size: int = QDRANT_UPSERT_BATCH_SIZE) -> None:
+    """
+    여러 문서 point를 batch_size 단위로 나눠서 upsert
+    """
+    client = get_client()
+    ensure_document_collections(client)
+    for start in range(0, len(points), batch_size):
+        client.upsert(
+            collection_name=QDRANT_COLLECTION_NAME,
+            points=points[start:start + batch_size]
+        )
+
+@lru_cache(maxsize=1)
+def _get_text_splitter() -> RecursiveCharacterTextSplitter:
+    return RecursiveCharacterTextSplitter.from_tiktoken_encoder(
+        encoding_name="cl100k_base",
+        chunk_size=CHUNK_SIZE_TOKENS,
+        chunk_overlap=CHUNK_OVERLAP_TOKENS,
+    )
+
+def split_document(text: str) -> List[str]:
+    """문서 본문을 CHUNK_SIZE_TOKENS 이하의 chunk로 분할"""
+    if not text or not text.strip():
+        return []
+    return [chunk for chunk in _get_text_splitter().split_text(text) if chunk.strip()]
+
+def chunk_embedding_text(payload: Dict, chunk: str) -> str:
+    """chunk 임베딩 텍스트. 문맥 유지를 위해 문서 제목을 앞에 붙임"""
+    return f"{payload.get('title') or ''}\n{chunk}".strip()
+
+def chunk_point_id(document_id, chunk_index: int) -> str:
+    """문서 ID와 chunk 순번으로 결정되는 point ID (재저장 시 같은 point를 덮어씀)"""
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"{QDRANT_CHUNK_COLLECTION_NAME}/{document_id}/{chunk_index}"))
+
+def build_chunk_points(document_id, payload: Dict, chunks: List[str], vectors: List[List[float]]) -> List[models.PointStruct]:
+    """chunk 컬렉션에 저장할 point 목록 생성. 각 point는 documentId로 원본 문서를 가리킴"""
+    return [
+        models.PointStruct(
+            id=chunk_point_id(document_id, index),
             vector=vector,
             payload={
+                "documentId": document_id,
+                "chunkIndex": index,
+                "chunkCount": len(chunks),
+                "text": chunk,
                 "title": payload.get("title"),
-                "summary": payload.get("summary"),
-                "userId": payload.get("userId"),
-                "createdBy": payload.get("createdBy"),
                 "keywords": payload.get("keywords"),
                 "category": payload.get("category"),
                 "createdAt": payload.get("createdAt"),
                 "organizationId": payload.get("organizationId"),
             }
         )
+        for index, (chunk, vector) in enumerate(zip(chunks, vectors))
+    ]
+
+def replace_document_chunks(chunk_points: Dict, batch_size: int = QDRANT_UPSERT_BATCH_SIZE) -> None:
+    """
+    문서별 chunk point를 upsert하고, 이전 저장본에서 남은 chunk(현재 chunk 수 이상의 순번)를 삭제.
+    chunk_points: {document_id: [PointStruct, ...]}. 빈 목록인 문서는 저장된 chunk를 모두 삭제
+    """
+    if not chunk_points:
+        return
+    client = get_client()
+    ensure_document_collections(client)
+
+    points = [point for document_points in chunk_points.values() for point in document_points]
+    for start in range(0, len(points), batch_size):
+        client.upsert(
+            collection_name=QDRANT_CHUNK_COLLECTION_NAME,
+            points=points[start:start + batch_size]
+        )
+
+    client.delete(
+        collection_name=QDRANT_CHUNK_COLLECTION_NAME,
+        points_selector=models.FilterSelector(filter=stale_chunk_filter(chunk_points))
+    )
+
+async def areplace_document_chunks(chunk_points: Dict, batch_size: int = QDRANT_UPSERT_BATCH_SIZE) -> None:
+    """replace_document_chunks의 비동기 버전"""
+    if not chunk_points:
+        return
+    ensure_document_collections(get_client())
+    client = get_async_client()
+
+    points = [point for document_points in chunk_points.values() for point in document_points]
+    for start in range(0, len(points), batch_size):
+        await client.upsert(
+            collection_name=QDRANT_CHUNK_COLLECTION_NAME,
+            points=points[start:start + batch_size]
+        )
+
+    await client.delete(
+        collection_name=QDRANT_CHUNK_COLLECTION_NAME,
+        points_selector=models.FilterSelector(filter=stale_chunk_filter(chunk_points))
+    )
+
+def stale_chunk_filter(chunk_points: Dict) -> models.Filter:
+    """이전 저장본에서 남은 chunk(현재 chunk 수 이상의 순번) 조건"""
+    return models.Filter(should=[
+        models.Filter(must=[
+            models.FieldCondition(key="documentId", match=models.MatchValue(value=document_id)),
+            models.FieldCondition(key="chunkIndex", range=models.Range(gte=len(document_points))),
+        ])
+        for document_id, document_points in chunk_points.items()
+    ])
+
+def search_document_chunks(
+    query_vector: List[float],
+    limit: int = 5,
+    query_filter: Optional[models.Filter] = None,
+    chunks_per_document: int = 3,
+    oversample: int = 4,
+) -> List[Dict]:
+    """
+    chunk 단위로 검색한 뒤 documentId 기준으로 묶어서 문서 단위 결과를 반환.
+    문서 점수는 가장 유사한 chunk의 점수이며, 문서마다 상위 chunk를 chunkIndex 순으로 포함
+    """
+    client = get_client()
+    ensure_document_collections(client)
+    hits = client.search(
+        collection_name=QDRANT_CHUNK_COLLECTION_NAME,
+        query_vector=query_vector,
+        query_filter=query_filter,
+        limit=limit * max(1, oversample),
+        with_payload=True,
+    )
+
+    documents: Dict = {}
+    for hit in hits:
+        payload = hit.payload or {}
+        document_id = payload.get("documentId")
+        document = documents.get(document_id)
+        if document is None:
+            if len(documents) >= limit:
+                continue
+            document = documents[document_id] = {
+                "documentId": document_id,
+                "score": hit.score,
+                "title": payload.get("title"),
+                "category": payload.get("category"),
+                "organizationId": payload.get("organizationId"),
+                "createdAt": payload.get("createdAt"),
+                "chunks": [],
+            }
+        if len(document["chunks"]) < chunks_per_document:
+            document["chunks"].append({
+                "chunkIndex": payload.get("chunkIndex"),
+                "text": payload.get("text"),
+                "score": hit.score,
+            })
+
+    for document in documents.values():
+        document["chunks"].sort(key=lambda chunk: chunk["chunkIndex"])
+    return sorted(documents.values(), key=lambda document: document["score"], reverse=True)
+
+def build_document_filter(
+    organization_id=None,
+    category: Optional[str] = None,
+    created_from: Optional[str] = None,
+    created_to: Optional[str] = None,
+) -> Optional[models.Filter]:
+    """
+    organizationId / category / createdAt 범위 조건으로 payload 필터 생성. 조건이 없으면 None
+    """
+    conditions = []
+    if organization_id is not None:
+        conditions.append(models.FieldCondition(key="organizationId", match=models.MatchValue(value=organization_id)))
+    if category:
+        conditions.append(models.FieldCondition(key="category", match=models.MatchValue(value=category)))
+    if created_from or created_to:
+        conditions.append(models.FieldCondition(
+            key="createdAt",
+            range=models.DatetimeRange(gte=created_from, lte=created_to)
+        ))
+    return models.Filter(must=conditions) if conditions else None
+
+def search_documents(
+    query_vector: List[float],
+    limit: int = 5,
+    query_filter: Optional[models.Filter] = None,
+) -> List[Dict]:
+    """documents 컬렉션에서 문서 단위로 검색"""
+    client = get_client()
+    ensure_document_collections(client)
+    hits = client.search(
+        collection_name=QDRANT_COLLECTION_NAME,
+        query_vector=query_vector,
+        query_filter=query_filter,
+        limit=limit,
+        with_payload=True,
+    )
+    return [{"documentId": hit.id, "score": hit.score, **(hit.payload or {})} for hit in hits]
+
+def store_document_embedding(document_id: str, payload: Dict) -> Optional[Dict]:
+    """
+    document_id를 기반으로 Qdrant에 문서 임베딩을 저장. 실패하면 handle_error 형식의 dict를 반환
+    """
+    try:
+        # Combine title and summary for embedding
+        combined_text = document_embedding_text(payload)
+        chunks = split_document(payload.get("document") or "") if CHUNK_INDEXING_ENABLED else []
+        
+        # Compute the document vector and the chunk vectors in one batched call
+        vector, *chunk_vectors = get_embedding_service().embed_documents(
+            [combined_text] + [chunk_embedding_text(payload, chunk) for chunk in chunks]
+        )
+        
+        # Reuse the pooled client; the collection is created once per process
+        client = get_client()
+        ensure_document_collections(client)
+        
+        # Create the point with the required structure
+        point = build_document_point(document_id, vector, payload)
         
         # Upsert the point into Qdrant
         client.upsert(
             collection_name=QDRANT_COLLECTION_NAME,
             points=[point]
         )
+        if CHUNK_INDEXING_ENABLED:
+            # chunk가 없어도(빈 내용) 이전 저장본의 chunk를 삭제하도록 항상 호출
+            replace_document_chunks({document_id: build_chunk_points(document_id, payload, chunks, chunk_vectors)})
         
-        print(f"Document with ID {document_id} stored successfully in Qdrant.")
+        logging.info(f"Document with ID {document_id} stored successfully in Qdrant.")
+
+    except Exception as e:
+        logging.exception("Error storing document in Qdrant")
+        return handle_error(
+            "Error storing document in Qdrant",
+            f"Failed to store document with ID {document_id}: {str(e)}",
+            resilience.error_status(e)
+        )
+
+async def astore_document_embedding(document_id: str, payload: Dict) -> Optional[Dict]:
+    """
+    store_document_embedding의 비동기 버전. 임베딩과 upsert를 비동기 클라이언트로 수행
+    """
+    try:
+        combined_text = document_embedding_text(payload)
+        chunks = split_document(payload.get("document") or "") if CHUNK_INDEXING_ENABLED else []
+
+        vector, *chunk_vectors = await get_embedding_service().aembed_documents(
+            [combined_text] + [chunk_embedding_text(payload, chunk) for chunk in chunks]
+        )
+
+        # 컬렉션 확인은 프로세스당 한 번이며 보통 서버 시작 시 백그라운드 준비에서 완료됨
+        ensure_document_collections(get_client())
+        await get_async_client().upsert(
+            collection_name=QDRANT_COLLECTION_NAME,
+            points=[build_document_point(document_id, vector, payload)]
+        )
+        if CHUNK_INDEXING_ENABLED:
+            await areplace_document_chunks({document_id: build_chunk_points(document_id, payload, chunks, chunk_vectors)})
+
+        logging.info(f"Document with ID {document_id} stored successfully in Qdrant.")
 
     except Exception as e:
         logging.exception("Error storing document in Qdrant")
         return handle_error(
             "Error storing document in Qdrant",
             f"Failed to store document with ID {document_id}: {str(e)}",
-            500
-        )
\ No newline at end of file
+            resilience.error_status(e)
+        )
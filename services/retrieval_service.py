@@ -0,0 +1,51 @@
+import logging
+from typing import Dict, List, Optional
+from config import CHUNK_INDEXING_ENABLED, RETRIEVAL_TOP_K
+from services import qdrant_service
+from services.embedding_service import get_embedding_service
+
+logger = logging.getLogger(__name__)
+
+
+def retrieve_references(
+    query: str,
+    organization_id,
+    category: Optional[str] = None,
+    created_from: Optional[str] = None,
+    created_to: Optional[str] = None,
+    limit: int = RETRIEVAL_TOP_K,
+) -> List[Dict]:
+    """
+    사용자 질문을 임베딩하여 documents 컬렉션에서 직접 관련 문서를 검색하고
+    /search-document의 references 형식({"title", "content", ...})으로 반환.
+    chunk 인덱싱을 사용하면 관련 chunk만 content로 사용하고, 아니면 문서 요약을 사용
+    """
+    query_vector = get_embedding_service().embed_query(query)
+    query_filter = qdrant_service.build_document_filter(organization_id, category, created_from, created_to)
+
+    if CHUNK_INDEXING_ENABLED:
+        documents = qdrant_service.search_document_chunks(query_vector, limit=limit, query_filter=query_filter)
+        references = [
+            {
+                "documentId": document["documentId"],
+                "title": document.get("title") or "",
+                "content": "\n\n".join(chunk["text"] for chunk in document["chunks"] if chunk.get("text")),
+                "score": document["score"],
+            }
+            for document in documents
+        ]
+    else:
+        documents = qdrant_service.search_documents(query_vector, limit=limit, query_filter=query_filter)
+        references = [
+            {
+                "documentId": document["documentId"],
+                "title": document.get("title") or "",
+                "content": document.get("summary") or "",
+                "score": document["score"],
+            }
+            for document in documents
+        ]
+
+    references = [ref for ref in references if ref["title"] and ref["content"]]
+    logger.info(f"Retrieved {len(references)} references for organization {organization_id}")
+    return references
@@ -1,23 +1,108 @@
-from langchain_openai import OpenAI
+import hashlib
+import json
 import logging
+from config import (
+    SUMMARY_CACHE_MAX_ENTRIES,
+    SUMMARY_CACHE_MAX_BYTES,
+    SUMMARY_CACHE_TTL_SECONDS,
+    SUMMARY_CACHE_DB_PATH,
+    SUMMARY_CACHE_VERSION,
+)
+from utils.cache import LRUCache, SQLiteCache, TieredCache
 from utils.error_handler import handle_error
+from utils import metrics, rate_limiter, resilience
+from services import llm_registry
 
 logger = logging.getLogger(__name__)
 
-# LLM 초기화 (Production에서는 별도 config 관리 권장)
-llm = OpenAI(temperature=0)
+# 기본은 llm_registry의 summarization 역할 모델. 테스트/벤치마크에서 대체할 때만 llm을 지정
+llm = None
+
+def get_llm():
+    return llm or llm_registry.get_llm("summarization")
+
+# 동일한 content + prompt + model 조합의 요약 결과 캐시
+summary_cache = TieredCache(
+    LRUCache(
+        max_entries=SUMMARY_CACHE_MAX_ENTRIES,
+        ttl_seconds=SUMMARY_CACHE_TTL_SECONDS,
+        max_bytes=SUMMARY_CACHE_MAX_BYTES,
+        sizeof=lambda value: len(value.encode("utf-8")),
+    ),
+    SQLiteCache(SUMMARY_CACHE_DB_PATH, table="summary_cache", ttl_seconds=SUMMARY_CACHE_TTL_SECONDS)
+    if SUMMARY_CACHE_DB_PATH else None,
+)
+metrics.REGISTRY.register_collector("reference_summary_cache", metrics.cache_size_collector("reference_summary", summary_cache.stats))
+
+def summary_cache_key(content: str, prompt_template) -> str:
+    """content, 프롬프트 원문, 모델 및 캐시 버전을 해싱한 캐시 키"""
+    model = get_llm()
+    key_source = json.dumps({
+        "version": SUMMARY_CACHE_VERSION,
+        "model": getattr(model, "model_name", ""),
+        "temperature": getattr(model, "temperature", None),
+        "prompt": getattr(prompt_template, "template", str(prompt_template)),
+        "content": content,
+    }, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(key_source.encode("utf-8")).hexdigest()
 
 def summarize_content(content: str, prompt_template: str) -> str:
     """
-    Robust 프롬프트 기반 문서 요약
+    Robust 프롬프트 기반 문서 요약. 동일 문서는 캐시된 요약을 반환
+    """
+    try:
+        content = content.strip()
+        cache_key = summary_cache_key(content, prompt_template)
+        cached = summary_cache.get(cache_key)
+        if cached is not None:
+            metrics.record_cache("reference_summary", "hit")
+            return cached
+        metrics.record_cache("reference_summary", "miss")
+
+        prompt = prompt_template.format(content=content)
+        model = get_llm()
+        with metrics.track_llm("reference_summary", model) as call:
+            result = resilience.call("openai", lambda: model.invoke(prompt, config=call.config), "reference_summary", hedge=True,
+                cost=rate_limiter.chat_cost(call.model, prompt)).content.strip()
+        if result:
+            summary_cache.set(cache_key, result)
+        return result
+    except Exception as e:
+        return handle_error(
+            "Error generating summary",
+            "문서 요약 생성에 실패했습니다.",
+            resilience.error_status(e)
+        )
+
+async def asummarize_content(content: str, prompt_template: str) -> str:
+    """
+    summarize_content의 비동기 버전
     """
     try:
-        prompt = prompt_template.format(content=content.strip())
-        result = llm.invoke(prompt)
-        return result.strip()
+        content = content.strip()
+        cache_key = summary_cache_key(content, prompt_template)
+        cached = summary_cache.get(cache_key)
+        if cached is not None:
+            metrics.record_cache("reference_summary", "hit")
+            return cached
+        metrics.record_cache("reference_summary", "miss")
+
+        prompt = prompt_template.format(content=content)
+        model = get_llm()
+        with metrics.track_llm("reference_summary", model) as call:
+            result = (await resilience.acall("openai", lambda: model.ainvoke(prompt, config=call.config), "reference_summary", hedge=True,
+                cost=rate_limiter.chat_cost(call.model, prompt))).content.strip()
+        if result:
+            summary_cache.set(cache_key, result)
+        return result
     except Exception as e:
+        logger.exception("Error generating summary")
         return handle_error(
             "Error generating summary",
             "문서 요약 생성에 실패했습니다.",
-            500
-        )
\ No newline at end of file
+            resilience.error_status(e)
+        )
+
+def get_cache_stats() -> dict:
+    """요약 캐시 hit/miss 통계"""
+    return summary_cache.stats()
@@ -0,0 +1,492 @@
+import asyncio
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Any, Dict, Iterable, List, Optional
+import numpy as np
+from qdrant_client import AsyncQdrantClient, QdrantClient
+from qdrant_client.http import models
+from config import VECTOR_STORE, VECTOR_STORE_PATH, VECTOR_TIMEOUT_SECONDS
+from utils import metrics, resilience
+
+logger = logging.getLogger(__name__)
+
+_INITIAL_CAPACITY = 1024
+
+
+def create_client(url: str, prefer_grpc: bool = True):
+    """
+    VECTOR_STORE 설정에 맞는 벡터 저장소 클라이언트 생성.
+    qdrant(기본값): Qdrant 서버 | local: 프로세스 내 NumPy memmap 저장소 (QdrantClient와 같은 메서드 제공)
+    """
+    if VECTOR_STORE == "local":
+        return InstrumentedClient(LocalVectorStore(VECTOR_STORE_PATH))
+    return InstrumentedClient(
+        QdrantClient(url=url, prefer_grpc=prefer_grpc, timeout=int(VECTOR_TIMEOUT_SECONDS)),
+        dependency="qdrant"
+    )
+
+
+def create_async_client(url: str, prefer_grpc: bool = True, local_client=None):
+    """
+    SERVING_MODE=async에서 사용하는 비동기 클라이언트 생성.
+    qdrant: AsyncQdrantClient | local: 동기 클라이언트(local_client)를 worker 스레드에서 호출하는 adapter
+    (호출 시간은 local_client의 InstrumentedClient에서 기록)
+    """
+    if VECTOR_STORE == "local":
+        return AsyncLocalVectorStore(local_client)
+    return InstrumentedClient(
+        AsyncQdrantClient(url=url, prefer_grpc=prefer_grpc, timeout=int(VECTOR_TIMEOUT_SECONDS)),
+        dependency="qdrant"
+    )
+
+
+class AsyncLocalVectorStore:
+    """LocalVectorStore 메서드를 asyncio.to_thread로 실행하는 코루틴 adapter (AsyncQdrantClient와 같은 호출 방식)"""
+
+    def __init__(self, client):
+        self._client = client
+
+    def __getattr__(self, name):
+        method = getattr(self._client, name)
+
+        async def call(*args, **kwargs):
+            return await asyncio.to_thread(method, *args, **kwargs)
+        return call
+
+
+class InstrumentedClient:
+    """
+    벡터 저장소 클라이언트 proxy. 데이터 조회/변경 메서드의 호출 시간을 docflow_vector_operation_seconds로 기록.
+    dependency를 지정하면(Qdrant 서버) 요청 지연 예산, 재시도, circuit breaker(utils.resilience)를 적용하고 조회는 hedge 대상
+    """
+
+    TIMED_OPERATIONS = frozenset({
+        "search", "query_points", "upsert", "delete", "retrieve", "scroll", "count", "set_payload",
+    })
+    READ_OPERATIONS = frozenset({"search", "query_points", "retrieve", "scroll", "count"})
+
+    def __init__(self, client, dependency: Optional[str] = None):
+        self._client = client
+        self._dependency = dependency
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if name not in self.TIMED_OPERATIONS:
+            return attr
+        dependency = self._dependency
+        hedge = name in self.READ_OPERATIONS
+
+        if asyncio.iscoroutinefunction(attr):
+            async def atimed(*args, **kwargs):
+                with metrics.VECTOR_OPERATION_SECONDS.time(operation=name):
+                    if dependency is None:
+                        return await attr(*args, **kwargs)
+                    return await resilience.acall(dependency, lambda: attr(*args, **kwargs), f"vector.{name}", hedge=hedge)
+            return atimed
+
+        def timed(*args, **kwargs):
+            with metrics.VECTOR_OPERATION_SECONDS.time(operation=name):
+                if dependency is None:
+                    return attr(*args, **kwargs)
+                return resilience.call(dependency, lambda: attr(*args, **kwargs), f"vector.{name}", hedge=hedge)
+        return timed
+
+
+def _parse_datetime(value) -> Optional[datetime]:
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        try:
+            parsed = datetime.fromisoformat(str(value))
+        except ValueError:
+            return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+def _match_condition(payload: Dict, condition) -> bool:
+    if isinstance(condition, models.Filter):
+        return matches_filter(payload, condition)
+    if not isinstance(condition, models.FieldCondition):
+        raise ValueError(f"Unsupported filter condition: {type(condition).__name__}")
+
+    value = payload.get(condition.key)
+    values = value if isinstance(value, list) else [value]
+    if condition.match is not None:
+        match = condition.match
+        if isinstance(match, models.MatchValue):
+            return match.value in values
+        if isinstance(match, models.MatchAny):
+            return any(item in match.any for item in values)
+        if isinstance(match, models.MatchExcept):
+            return all(item not in match.except_ for item in values)
+        raise ValueError(f"Unsupported match: {type(match).__name__}")
+    if condition.range is not None:
+        bounds = condition.range
+        if isinstance(bounds, models.DatetimeRange):
+            value, convert = _parse_datetime(value), _parse_datetime
+        elif isinstance(value, bool) or not isinstance(value, (int, float)):
+            return False
+        else:
+            convert = lambda bound: bound
+        if value is None:
+            return False
+        checks = (
+            (bounds.gt, lambda bound: value > bound),
+            (bounds.gte, lambda bound: value >= bound),
+            (bounds.lt, lambda bound: value < bound),
+            (bounds.lte, lambda bound: value <= bound),
+        )
+        return all(check(convert(bound)) for bound, check in checks if bound is not None)
+    if condition.is_empty is not None:
+        return value in (None, [])
+    raise ValueError(f"Unsupported field condition on '{condition.key}'")
+
+def matches_filter(payload: Dict, query_filter: Optional[models.Filter]) -> bool:
+    """Qdrant models.Filter의 must/should/must_not 조건을 payload에 적용"""
+    if query_filter is None:
+        return True
+    if query_filter.must and not all(_match_condition(payload, c) for c in query_filter.must):
+        return False
+    if query_filter.should and not any(_match_condition(payload, c) for c in query_filter.should):
+        return False
+    if query_filter.must_not and any(_match_condition(payload, c) for c in query_filter.must_not):
+        return False
+    return True
+
+
+class _Collection:
+    """컬렉션 하나의 벡터(float32 memmap 또는 메모리 배열)와 payload"""
+
+    def __init__(self, name: str, size: int, distance: str, config: Dict, vector_path: Optional[str]):
+        self.name = name
+        self.size = size
+        self.distance = distance
+        self.config = config
+        self.vector_path = vector_path
+        self.ids: Dict[str, int] = {}
+        self.point_ids: List[Any] = []
+        self.payloads: List[Optional[Dict]] = []
+        self.free_slots: List[int] = []
+        self.valid = np.zeros(0, dtype=bool)
+        self.vectors = self._allocate(_INITIAL_CAPACITY)
+
+    def _allocate(self, capacity: int) -> np.ndarray:
+        if self.vector_path is None:
+            vectors = np.zeros((capacity, self.size), dtype=np.float32)
+            if hasattr(self, "vectors"):
+                vectors[:len(self.vectors)] = self.vectors
+            return vectors
+        # 파일 크기를 늘린 뒤 다시 매핑 (기존 벡터는 파일에 그대로 유지)
+        required = capacity * self.size * 4
+        mode = "r+b" if os.path.exists(self.vector_path) else "w+b"
+        with open(self.vector_path, mode) as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() < required:
+                f.truncate(required)
+        return np.memmap(self.vector_path, dtype=np.float32, mode="r+", shape=(capacity, self.size))
+
+    def capacity(self) -> int:
+        return self.vectors.shape[0]
+
+    def slot_for(self, point_id) -> int:
+        key = str(point_id)
+        if key in self.ids:
+            return self.ids[key]
+        if self.free_slots:
+            slot = self.free_slots.pop()
+        else:
+            slot = len(self.point_ids)
+            self.point_ids.append(None)
+            self.payloads.append(None)
+        if slot >= self.capacity():
+            if isinstance(self.vectors, np.memmap):
+                self.vectors.flush()
+            self.vectors = self._allocate(self.capacity() * 2)
+        if slot >= len(self.valid):
+            self.valid = np.concatenate([self.valid, np.zeros(max(slot + 1, len(self.valid) * 2) - len(self.valid), dtype=bool)])
+        self.ids[key] = slot
+        return slot
+
+    def normalize(self, vector) -> np.ndarray:
+        array = np.asarray(vector, dtype=np.float32)
+        if array.shape != (self.size,):
+            raise ValueError(f"Vector dimension mismatch for '{self.name}': expected {self.size}, got {array.shape}")
+        if self.distance == models.Distance.COSINE:
+            norm = np.linalg.norm(array)
+            if norm > 0:
+                array = array / norm
+        return array
+
+    def slots_matching(self, query_filter: Optional[models.Filter]) -> np.ndarray:
+        slots = np.flatnonzero(self.valid[:len(self.point_ids)])
+        if query_filter is None:
+            return slots
+        return np.asarray([slot for slot in slots if matches_filter(self.payloads[slot], query_filter)], dtype=np.int64)
+
+
+class LocalVectorStore:
+    """
+    Qdrant 서버 없이 프로세스 안에서 동작하는 벡터 저장소.
+    벡터는 컬렉션별 float32 memmap 파일, payload는 SQLite에 저장하고 검색은 NumPy brute-force로 수행.
+    path가 ":memory:" 이면 파일 없이 메모리에만 저장 (테스트/벤치마크용)
+    QdrantClient에서 이 서비스가 사용하는 메서드(search, upsert, delete, count, retrieve, set_payload 등)를 같은 형태로 제공
+    """
+
+    def __init__(self, path: str = VECTOR_STORE_PATH):
+        self.path = path
+        self.in_memory = path == ":memory:"
+        self._lock = threading.RLock()
+        self._collections: Dict[str, _Collection] = {}
+        if not self.in_memory:
+            os.makedirs(path, exist_ok=True)
+        self._conn = sqlite3.connect(
+            ":memory:" if self.in_memory else os.path.join(path, "payloads.db"),
+            check_same_thread=False,
+            timeout=30,
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS collections ("
+            "name TEXT PRIMARY KEY, size INTEGER NOT NULL, distance TEXT NOT NULL, config TEXT)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS points ("
+            "collection TEXT NOT NULL, point_key TEXT NOT NULL, point_id TEXT NOT NULL, slot INTEGER NOT NULL, "
+            "payload TEXT, PRIMARY KEY (collection, point_key))"
+        )
+        self._conn.commit()
+        self._load()
+
+    # --- 컬렉션 관리 ---
+
+    def collection_exists(self, collection_name: str) -> bool:
+        return collection_name in self._collections
+
+    def create_collection(self, collection_name: str, vectors_config: models.VectorParams, hnsw_config=None, **kwargs) -> bool:
+        if not re.fullmatch(r"[A-Za-z0-9_\-]+", collection_name):
+            raise ValueError(f"Invalid collection name: {collection_name}")
+        config = {"hnsw_config": hnsw_config.model_dump(exclude_none=True) if hnsw_config else {}, "payload_indexes": {}}
+        with self._lock:
+            if collection_name in self._collections:
+                raise ValueError(f"Collection {collection_name} already exists")
+            self._conn.execute(
+                "INSERT INTO collections (name, size, distance, config) VALUES (?, ?, ?, ?)",
+                (collection_name, vectors_config.size, str(vectors_config.distance.value), json.dumps(config)),
+            )
+            self._conn.commit()
+            self._collections[collection_name] = self._open_collection(
+                collection_name, vectors_config.size, vectors_config.distance, config
+            )
+        return True
+
+    def get_collection(self, collection_name: str):
+        collection = self._get(collection_name)
+        hnsw = collection.config.get("hnsw_config", {})
+        return SimpleNamespace(
+            points_count=int(collection.valid.sum()),
+            config=SimpleNamespace(
+                hnsw_config=SimpleNamespace(**{name: hnsw.get(name) for name in models.HnswConfigDiff.model_fields}),
+                params=SimpleNamespace(vectors=models.VectorParams(size=collection.size, distance=collection.distance)),
+            ),
+        )
+
+    def update_collection(self, collection_name: str, hnsw_config: Optional[models.HnswConfigDiff] = None, **kwargs) -> bool:
+        # brute-force 검색에서는 HNSW 설정을 사용하지 않으므로 기록만 함
+        with self._lock:
+            collection = self._get(collection_name)
+            if hnsw_config is not None:
+                collection.config["hnsw_config"].update(hnsw_config.model_dump(exclude_none=True))
+                self._save_config(collection)
+        return True
+
+    def create_payload_index(self, collection_name: str, field_name: str, field_schema=None, **kwargs) -> None:
+        with self._lock:
+            collection = self._get(collection_name)
+            collection.config["payload_indexes"][field_name] = str(getattr(field_schema, "value", field_schema))
+            self._save_config(collection)
+
+    def delete_collection(self, collection_name: str, **kwargs) -> bool:
+        with self._lock:
+            collection = self._collections.pop(collection_name, None)
+            if collection is None:
+                return False
+            self._conn.execute("DELETE FROM collections WHERE name = ?", (collection_name,))
+            self._conn.execute("DELETE FROM points WHERE collection = ?", (collection_name,))
+            self._conn.commit()
+            if collection.vector_path:
+                del collection.vectors
+                os.remove(collection.vector_path)
+        return True
+
+    # --- point 쓰기 ---
+
+    def upsert(self, collection_name: str, points: Iterable[models.PointStruct], wait: bool = True, **kwargs) -> None:
+        with self._lock:
+            collection = self._get(collection_name)
+            rows = []
+            for point in points:
+                vector = collection.normalize(point.vector)
+                slot = collection.slot_for(point.id)
+                collection.vectors[slot] = vector
+                collection.valid[slot] = True
+                collection.point_ids[slot] = point.id
+                collection.payloads[slot] = dict(point.payload or {})
+                rows.append((collection_name, str(point.id), json.dumps(point.id), slot,
+                             json.dumps(collection.payloads[slot], ensure_ascii=False)))
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO points (collection, point_key, point_id, slot, payload) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+            if isinstance(collection.vectors, np.memmap):
+                collection.vectors.flush()
+
+    def delete(self, collection_name: str, points_selector, wait: bool = True, **kwargs) -> None:
+        with self._lock:
+            collection = self._get(collection_name)
+            slots = self._select_slots(collection, points_selector)
+            for slot in slots:
+                collection.ids.pop(str(collection.point_ids[slot]), None)
+                collection.valid[slot] = False
+                collection.payloads[slot] = None
+                collection.free_slots.append(int(slot))
+            self._conn.executemany(
+                "DELETE FROM points WHERE collection = ? AND slot = ?",
+                [(collection_name, int(slot)) for slot in slots],
+            )
+            self._conn.commit()
+
+    def set_payload(self, collection_name: str, payload: Dict, points, wait: bool = True, **kwargs) -> None:
+        """기존 payload에 키를 덮어씀 (벡터는 그대로 유지)"""
+        with self._lock:
+            collection = self._get(collection_name)
+            slots = self._select_slots(collection, points)
+            for slot in slots:
+                collection.payloads[slot].update(payload)
+            self._conn.executemany(
+                "UPDATE points SET payload = ? WHERE collection = ? AND slot = ?",
+                [(json.dumps(collection.payloads[slot], ensure_ascii=False), collection_name, int(slot)) for slot in slots],
+            )
+            self._conn.commit()
+
+    # --- 조회 ---
+
+    def search(
+        self,
+        collection_name: str,
+        query_vector,
+        query_filter: Optional[models.Filter] = None,
+        limit: int = 10,
+        score_threshold: Optional[float] = None,
+        with_payload=True,
+        with_vectors: bool = False,
+        **kwargs,
+    ) -> List[models.ScoredPoint]:
+        """필터를 만족하는 전체 벡터와의 점수를 한 번의 행렬 곱으로 계산한 뒤 상위 limit개를 반환"""
+        with self._lock:
+            collection = self._get(collection_name)
+            slots = collection.slots_matching(query_filter)
+            if len(slots) == 0:
+                return []
+            query = collection.normalize(query_vector)
+            if collection.distance == models.Distance.EUCLID:
+                scores = -np.linalg.norm(collection.vectors[slots] - query, axis=1)
+            else:
+                scores = collection.vectors[slots] @ query
+            if score_threshold is not None:
+                keep = scores >= score_threshold
+                slots, scores = slots[keep], scores[keep]
+            if len(slots) > limit:
+                top = np.argpartition(-scores, limit - 1)[:limit]
+                slots, scores = slots[top], scores[top]
+            order = np.argsort(-scores, kind="stable")
+            return [
+                models.ScoredPoint(
+                    id=collection.point_ids[slot],
+                    version=0,
+                    score=float(score),
+                    payload=dict(collection.payloads[slot]) if with_payload else None,
+                    vector=collection.vectors[slot].tolist() if with_vectors else None,
+                )
+                for slot, score in zip(slots[order], scores[order])
+            ]
+
+    def retrieve(self, collection_name: str, ids, with_payload=True, with_vectors: bool = False, **kwargs) -> List[models.Record]:
+        with self._lock:
+            collection = self._get(collection_name)
+            slots = [collection.ids[str(point_id)] for point_id in ids if str(point_id) in collection.ids]
+            return [
+                models.Record(
+                    id=collection.point_ids[slot],
+                    payload=dict(collection.payloads[slot]) if with_payload else None,
+                    vector=collection.vectors[slot].tolist() if with_vectors else None,
+                )
+                for slot in slots
+            ]
+
+    def count(self, collection_name: str, count_filter: Optional[models.Filter] = None, exact: bool = True, **kwargs) -> models.CountResult:
+        with self._lock:
+            return models.CountResult(count=len(self._get(collection_name).slots_matching(count_filter)))
+
+    def close(self, **kwargs) -> None:
+        with self._lock:
+            for collection in self._collections.values():
+                if isinstance(collection.vectors, np.memmap):
+                    collection.vectors.flush()
+            self._conn.close()
+
+    # --- 내부 ---
+
+    def _get(self, collection_name: str) -> _Collection:
+        collection = self._collections.get(collection_name)
+        if collection is None:
+            raise ValueError(f"Collection {collection_name} not found")
+        return collection
+
+    def _select_slots(self, collection: _Collection, selector) -> List[int]:
+        if isinstance(selector, models.FilterSelector):
+            return [int(slot) for slot in collection.slots_matching(selector.filter)]
+        if isinstance(selector, models.Filter):
+            return [int(slot) for slot in collection.slots_matching(selector)]
+        point_ids = selector.points if isinstance(selector, models.PointIdsList) else selector
+        return [collection.ids[str(point_id)] for point_id in point_ids if str(point_id) in collection.ids]
+
+    def _save_config(self, collection: _Collection) -> None:
+        self._conn.execute(
+            "UPDATE collections SET config = ? WHERE name = ?",
+            (json.dumps(collection.config), collection.name),
+        )
+        self._conn.commit()
+
+    def _open_collection(self, name: str, size: int, distance, config: Dict) -> _Collection:
+        vector_path = None if self.in_memory else os.path.join(self.path, f"{name}.f32")
+        return _Collection(name, size, models.Distance(distance), config, vector_path)
+
+    def _load(self) -> None:
+        """재시작 시 SQLite와 memmap 파일에서 컬렉션을 복원"""
+        for name, size, distance, config in self._conn.execute("SELECT name, size, distance, config FROM collections").fetchall():
+            collection = self._open_collection(name, size, distance, json.loads(config or "{}"))
+            rows = self._conn.execute(
+                "SELECT point_id, slot, payload FROM points WHERE collection = ? ORDER BY slot", (name,)
+            ).fetchall()
+            max_slot = max((slot for _, slot, _ in rows), default=-1)
+            while collection.capacity() <= max_slot:
+                collection.vectors = collection._allocate(collection.capacity() * 2)
+            collection.point_ids = [None] * (max_slot + 1)
+            collection.payloads = [None] * (max_slot + 1)
+            collection.valid = np.zeros(max(max_slot + 1, _INITIAL_CAPACITY), dtype=bool)
+            for point_id, slot, payload in rows:
+                point_id = json.loads(point_id)
+                collection.ids[str(point_id)] = slot
+                collection.point_ids[slot] = point_id
+                collection.payloads[slot] = json.loads(payload) if payload else {}
+                collection.valid[slot] = True
+            collection.free_slots = [slot for slot in range(max_slot + 1) if not collection.valid[slot]]
+            self._collections[name] = collection
+            logger.info(f"Loaded local vector collection {name}: {len(rows)} points")
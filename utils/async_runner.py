@@ -0,0 +1,67 @@
+import asyncio
+import atexit
+import contextvars
+import logging
+import threading
+from typing import Any, Awaitable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncRunner:
+    """
+    백그라운드 스레드에서 도는 프로세스 전역 이벤트 루프.
+    Flask(WSGI) view는 코루틴을 제출하고 결과만 기다리며, LLM/임베딩/Qdrant I/O는 모두 이 루프에서 동시에 진행.
+    async 클라이언트(httpx, grpc.aio)의 연결은 처음 사용한 루프에 묶이므로 항상 같은 루프에서만 사용
+    """
+
+    def __init__(self, name: str = "async-runner"):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def run(self, coro: Awaitable, timeout: Optional[float] = None) -> Any:
+        """
+        코루틴을 루프에서 실행하고 결과를 반환. timeout이 지나면 코루틴을 취소하고 TimeoutError.
+        호출한 스레드의 contextvar(요청 지연 예산 등)를 그대로 적용하여 실행
+        """
+        future = asyncio.run_coroutine_threadsafe(_with_context(contextvars.copy_context(), coro), self.loop)
+        try:
+            return future.result(timeout)
+        except TimeoutError:
+            future.cancel()
+            raise
+
+    def close(self, timeout: float = 5.0) -> None:
+        if not self.loop.is_running():
+            return
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout)
+
+
+async def _with_context(context: contextvars.Context, coro: Awaitable) -> Any:
+    # Task마다 context가 복사되므로 여기서 설정한 값은 이 코루틴 안에서만 유효
+    for var, value in context.items():
+        var.set(value)
+    return await coro
+
+
+_runner: Optional[AsyncRunner] = None
+_runner_lock = threading.Lock()
+
+def get_runner() -> AsyncRunner:
+    """프로세스 전역 AsyncRunner 반환 (최초 호출 시 생성)"""
+    global _runner
+    if _runner is None:
+        with _runner_lock:
+            if _runner is None:
+                _runner = AsyncRunner()
+                atexit.register(_runner.close)
+    return _runner
+
+def run(coro: Awaitable, timeout: Optional[float] = None) -> Any:
+    return get_runner().run(coro, timeout)
@@ -0,0 +1,343 @@
+"""
+프로세스 내 Prometheus text format 메트릭 레지스트리.
+Counter/Gauge/Histogram과 함께 LLM, 임베딩, 벡터 저장소 호출 계측 헬퍼를 제공하며 /metrics 엔드포인트에서 render()로 노출
+"""
+import logging
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+from langchain_core.callbacks import BaseCallbackHandler
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# (이름, 타입, 설명, [(라벨 dict, 값)]) 형식의 metric family를 반환하는 수집 함수
+Collector = Callable[[], Iterable[Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]]]
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[tuple, object] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: tuple) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Counter(_Metric):
+    """단조 증가 카운터"""
+    type = "counter"
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        if amount < 0:
+            raise ValueError("Counter can only increase")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def get(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        with self._lock:
+            return [(self.name, self._labels(key), value) for key, value in sorted(self._values.items())]
+
+
+class Gauge(Counter):
+    """임의로 증감하는 값"""
+    type = "gauge"
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+
+class Histogram(_Metric):
+    """누적 bucket 히스토그램. 값은 초 단위"""
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state["buckets"][index] += 1
+                    break
+            state["sum"] += value
+            state["count"] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """
+        블록 실행 시간을 기록. status 라벨이 있으면 자동으로 채움
+        (ok | error | cancelled: 스트리밍 generator가 끝까지 소비되지 않고 닫힌 경우)
+        """
+        started = time.perf_counter()
+        status = "ok"
+        try:
+            yield
+        except GeneratorExit:
+            status = "cancelled"
+            raise
+        except BaseException:
+            status = "error"
+            raise
+        finally:
+            if "status" in self.labelnames:
+                labels["status"] = status
+            self.observe(time.perf_counter() - started, **labels)
+
+    def get_count(self, **labels) -> int:
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            return state["count"] if state else 0
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        result = []
+        with self._lock:
+            items = sorted((key, {**state, "buckets": list(state["buckets"])}) for key, state in self._values.items())
+        for key, state in items:
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, count in zip(self.buckets, state["buckets"]):
+                cumulative += count
+                result.append((f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative))
+            result.append((f"{self.name}_sum", labels, state["sum"]))
+            result.append((f"{self.name}_count", labels, state["count"]))
+        return result
+
+
+class Registry:
+    """메트릭과 수집 함수 모음. render()는 Prometheus text exposition format(0.0.4)을 반환"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: Dict[str, Collector] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                    raise ValueError(f"Metric {metric.name} already registered with a different definition")
+                return existing
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def register_collector(self, key: str, collector: Collector) -> None:
+        """scrape 시점에 값을 읽는 수집 함수 등록. 같은 key로 다시 등록하면 교체"""
+        with self._lock:
+            self._collectors[key] = collector
+
+    def unregister_collector(self, key: str) -> None:
+        with self._lock:
+            self._collectors.pop(key, None)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors.items())
+
+        families: Dict[str, Tuple[str, str, List[Tuple[str, Dict[str, str], float]]]] = {}
+        for metric in metrics:
+            families[metric.name] = (metric.type, metric.documentation, metric.samples())
+        for key, collector in collectors:
+            try:
+                for name, kind, documentation, samples in collector():
+                    family = families.setdefault(name, (kind, documentation, []))
+                    family[2].extend((name, labels, value) for labels, value in samples)
+            except Exception:
+                logger.exception(f"Metrics collector '{key}' failed")
+
+        lines = []
+        for name, (kind, documentation, samples) in sorted(families.items()):
+            lines.append(f"# HELP {name} {_escape(documentation)}")
+            lines.append(f"# TYPE {name} {kind}")
+            for sample_name, labels, value in samples:
+                lines.append(f"{sample_name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "docflow_http_request_seconds", "HTTP 요청 처리 시간 (스트리밍 응답은 첫 응답까지)", ["endpoint", "method", "status"])
+STAGE_SECONDS = REGISTRY.histogram(
+    "docflow_stage_seconds", "파이프라인 단계별 실행 시간", ["pipeline", "stage", "status"])
+LLM_REQUEST_SECONDS = REGISTRY.histogram(
+    "docflow_llm_request_seconds", "LLM 호출 시간 (프롬프트, 모델별)", ["prompt", "model", "status"])
+LLM_TOKENS = REGISTRY.counter(
+    "docflow_llm_tokens_total", "LLM 토큰 사용량 (type=prompt|completion)", ["prompt", "model", "type"])
+EMBEDDING_REQUEST_SECONDS = REGISTRY.histogram(
+    "docflow_embedding_request_seconds", "임베딩 API 호출 시간", ["model", "status"])
+VECTOR_OPERATION_SECONDS = REGISTRY.histogram(
+    "docflow_vector_operation_seconds", "벡터 저장소 호출 시간", ["operation", "status"])
+CACHE_REQUESTS = REGISTRY.counter(
+    "docflow_cache_requests_total", "캐시 조회 결과 (result=hit|miss|bypassed|error)", ["cache", "result"])
+FALLBACKS = REGISTRY.counter(
+    "docflow_fallbacks_total", "실패 후 대체 경로로 처리한 횟수", ["stage", "reason"])
+RESILIENCE_EVENTS = REGISTRY.counter(
+    "docflow_resilience_events_total",
+    "외부 호출 재시도/hedge/timeout 횟수 (event=retry|timeout|hedge|hedge_won|pool_full|rejected|deadline_exceeded)",
+    ["dependency", "operation", "event"])
+RATE_LIMIT_WAIT_SECONDS = REGISTRY.histogram(
+    "docflow_rate_limit_wait_seconds", "OpenAI 호출 한도 확보까지 대기한 시간", ["model", "priority"])
+SINGLE_FLIGHT_REQUESTS = REGISTRY.counter(
+    "docflow_single_flight_requests_total", "single-flight 요청 수 (role=leader: 직접 실행|shared: 실행 중인 결과를 공유)", ["flight", "role"])
+
+
+def record_fallback(stage: str, reason: str) -> None:
+    FALLBACKS.inc(stage=stage, reason=reason)
+
+def record_cache(cache: str, result: str, amount: int = 1) -> None:
+    if amount:
+        CACHE_REQUESTS.inc(amount, cache=cache, result=result)
+
+def cache_size_collector(cache: str, stats: Callable[[], Dict]) -> Collector:
+    """utils.cache의 stats()에서 항목 수와 메모리 사용량을 gauge로 수집"""
+    def collect():
+        values = stats()
+        yield "docflow_cache_entries", "gauge", "캐시 항목 수", [({"cache": cache}, values.get("entries", 0))]
+        yield "docflow_cache_bytes", "gauge", "메모리 캐시 사용량(bytes)", [({"cache": cache}, values.get("bytes", 0))]
+    return collect
+
+def write_buffer_collector(buffer) -> Collector:
+    """WriteBehindBuffer.stats()를 항목 수 counter와 큐 길이 gauge로 수집"""
+    def collect():
+        values = buffer.stats()
+        labels = {"buffer": buffer.name}
+        yield "docflow_write_buffer_items_total", "counter", "write-behind 버퍼 항목 수 (event=enqueued|dropped|flushed|failed)", [
+            ({**labels, "event": event}, values.get(event, 0)) for event in ("enqueued", "dropped", "flushed", "failed")
+        ]
+        yield "docflow_write_buffer_batches_total", "counter", "write-behind 버퍼 flush 횟수", [(labels, values.get("batches", 0))]
+        yield "docflow_write_buffer_depth", "gauge", "write-behind 버퍼 대기 항목 수", [(labels, values.get("depth", 0))]
+    return collect
+
+def model_name(llm) -> str:
+    """LangChain LLM 객체의 모델 이름 (with_structured_output 결과는 내부 LLM에서 확인)"""
+    for candidate in (llm, getattr(llm, "first", None), getattr(llm, "bound", None)):
+        name = getattr(candidate, "model_name", None) or getattr(candidate, "model", None)
+        if isinstance(name, str) and name:
+            return name
+    return "unknown"
+
+
+class LLMCall(BaseCallbackHandler):
+    """LLM 호출 한 번의 토큰 사용량을 기록하는 LangChain callback. invoke/stream의 config로 전달"""
+
+    def __init__(self, prompt: str, model: str):
+        self.prompt = prompt
+        self.model = model
+
+    @property
+    def config(self) -> Dict:
+        return {"callbacks": [self]}
+
+    def on_llm_end(self, response, **kwargs) -> None:
+        prompt_tokens, completion_tokens = _token_usage(response)
+        if prompt_tokens:
+            LLM_TOKENS.inc(prompt_tokens, prompt=self.prompt, model=self.model, type="prompt")
+        if completion_tokens:
+            LLM_TOKENS.inc(completion_tokens, prompt=self.prompt, model=self.model, type="completion")
+
+def _token_usage(response) -> Tuple[int, int]:
+    """LLMResult에서 (prompt, completion) 토큰 수. completions API는 llm_output, chat 모델은 message.usage_metadata 사용"""
+    usage = (getattr(response, "llm_output", None) or {}).get("token_usage") or {}
+    if usage.get("prompt_tokens") or usage.get("completion_tokens"):
+        return int(usage.get("prompt_tokens") or 0), int(usage.get("completion_tokens") or 0)
+
+    prompt_tokens = completion_tokens = 0
+    for generations in getattr(response, "generations", None) or []:
+        for generation in generations:
+            metadata = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+            prompt_tokens += int(metadata.get("input_tokens") or 0)
+            completion_tokens += int(metadata.get("output_tokens") or 0)
+    return prompt_tokens, completion_tokens
+
+@contextmanager
+def track_llm(prompt: str, llm):
+    """
+    LLM 호출 시간을 prompt/model 라벨로 기록. 반환하는 LLMCall의 config를 invoke/stream에 전달하면 토큰 수도 기록
+        with track_llm("extract_keywords", structured_llm) as call:
+            structured_llm.invoke(formatted_prompt, config=call.config)
+    """
+    model = model_name(llm)
+    with LLM_REQUEST_SECONDS.time(prompt=prompt, model=model):
+        yield LLMCall(prompt, model)
+
+
+def init_app(app) -> None:
+    """요청별 처리 시간 기록. endpoint 라벨은 URL 규칙을 사용하여 라벨 수가 늘어나지 않도록 함"""
+    from flask import g, request
+
+    @app.before_request
+    def _start_timer():
+        g._metrics_started = time.perf_counter()
+
+    @app.after_request
+    def _record_request(response):
+        started = getattr(g, "_metrics_started", None)
+        if started is not None:
+            endpoint = request.url_rule.rule if request.url_rule is not None else "unmatched"
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - started,
+                endpoint=endpoint,
+                method=request.method,
+                status=str(response.status_code),
+            )
+        return response
@@ -0,0 +1,268 @@
+"""
+OpenAI 모델별 요청 수(RPM)/토큰 수(TPM) token bucket 스케줄러.
+
+- 호출 전에 토큰 사용량을 추정하여 모델의 요청/토큰 bucket에서 차감하고, 부족하면 채워질 때까지 대기
+- 우선순위: interactive(사용자가 응답을 기다리는 요청)는 bucket 전체를 사용하고, batch(일괄 저장, 비동기 작업,
+  write-behind 등 그 외 호출)는 RATE_LIMIT_INTERACTIVE_RESERVE 비율을 남겨두고 사용
+- RATE_LIMIT_STORE=sqlite이면 bucket 상태를 SQLite 파일에 두어 같은 호스트의 워커 프로세스들이 한도를 공유
+"""
+import asyncio
+import contextvars
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from config import (
+    RATE_LIMITS,
+    RATE_LIMIT_COMPLETION_TOKENS,
+    RATE_LIMIT_INTERACTIVE_RESERVE,
+    RATE_LIMIT_INTERACTIVE_PATHS,
+    RATE_LIMIT_STORE,
+    RATE_LIMIT_STORE_PATH,
+)
+from utils import metrics
+from utils.tokens import count_tokens
+
+logger = logging.getLogger(__name__)
+
+PRIORITIES = ("interactive", "batch")
+# 대기 중 bucket을 다시 확인하는 최대 간격(초). 다른 프로세스가 한도를 먼저 사용했을 수 있으므로 길게 자지 않음
+MAX_WAIT_STEP_SECONDS = 1.0
+
+_priority: contextvars.ContextVar[str] = contextvars.ContextVar("rate_priority", default="batch")
+
+
+class Cost(NamedTuple):
+    """호출 1회가 사용할 한도 (추정치)"""
+    model: str
+    requests: int
+    tokens: int
+
+
+class Bucket(NamedTuple):
+    key: str
+    capacity: float
+    rate: float     # 초당 충전량
+    amount: float
+    floor: float    # 이 수준 아래로는 차감하지 않음 (우선순위별 예약분)
+
+
+def parse_limits(value: str) -> Dict[str, Tuple[float, float]]:
+    """"model=rpm:tpm,..." 형식의 설정을 {model: (rpm, tpm)}로 변환. 0 또는 빈 값은 제한 없음"""
+    limits = {}
+    for item in value.split(","):
+        model, _, setting = item.partition("=")
+        if model.strip() and setting.strip():
+            rpm, _, tpm = setting.partition(":")
+            limits[model.strip()] = (float(rpm.strip() or 0), float(tpm.strip() or 0))
+    return limits
+
+def _take(levels: Dict[str, Tuple[float, float]], buckets: Iterable[Bucket], now: float) -> Tuple[float, Dict[str, Tuple[float, float]]]:
+    """
+    bucket들을 충전한 뒤 모두 차감할 수 있으면 차감. (기다려야 하는 시간(초), 갱신된 {key: (level, updated_at)}) 반환.
+    기다려야 하면 어느 bucket도 차감하지 않음
+    """
+    refilled = {}
+    wait = 0.0
+    for bucket in buckets:
+        level, updated_at = levels.get(bucket.key, (bucket.capacity, now))
+        level = min(bucket.capacity, level + max(0.0, now - updated_at) * bucket.rate)
+        # 예약분을 제외한 용량보다 큰 호출은 bucket이 가득 찼을 때 허용
+        amount = min(bucket.amount, bucket.capacity - bucket.floor)
+        shortage = bucket.floor + amount - level
+        if shortage > 0:
+            wait = max(wait, shortage / bucket.rate)
+        refilled[bucket.key] = (level, amount)
+
+    if wait > 0:
+        return wait, {key: (level, now) for key, (level, _) in refilled.items()}
+    return 0.0, {key: (level - amount, now) for key, (level, amount) in refilled.items()}
+
+
+class MemoryBucketStore:
+    """프로세스 내 bucket 상태 저장소"""
+
+    def __init__(self):
+        self._levels: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def take(self, buckets: List[Bucket]) -> float:
+        with self._lock:
+            wait, levels = _take(self._levels, buckets, time.time())
+            self._levels.update(levels)
+        return wait
+
+    def close(self) -> None:
+        pass
+
+
+class SQLiteBucketStore:
+    """
+    SQLite 파일에 bucket 상태를 저장하여 여러 워커 프로세스가 한도를 공유.
+    충전/차감은 BEGIN IMMEDIATE 트랜잭션 안에서 처리하므로 프로세스 간에도 원자적
+    """
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS rate_buckets ("
+            "key TEXT PRIMARY KEY, level REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+
+    def take(self, buckets: List[Bucket]) -> float:
+        keys = [bucket.key for bucket in buckets]
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._conn.execute(
+                    f"SELECT key, level, updated_at FROM rate_buckets WHERE key IN ({','.join('?' * len(keys))})", keys
+                ).fetchall()
+                wait, levels = _take({key: (level, updated_at) for key, level, updated_at in rows}, buckets, time.time())
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO rate_buckets (key, level, updated_at) VALUES (?, ?, ?)",
+                    [(key, level, updated_at) for key, (level, updated_at) in levels.items()],
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return wait
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class RateLimiter:
+    """모델별 RPM/TPM bucket에서 호출 한도를 확보. 한도가 설정되지 않은 모델은 제한하지 않음"""
+
+    def __init__(self, limits: Dict[str, Tuple[float, float]], store=None, reserve: float = RATE_LIMIT_INTERACTIVE_RESERVE):
+        self.limits = limits
+        self.store = store or MemoryBucketStore()
+        self.reserve = min(max(reserve, 0.0), 1.0)
+
+    def limited(self, model: str) -> bool:
+        return model in self.limits
+
+    def _buckets(self, cost: Cost, priority: str) -> List[Bucket]:
+        rpm, tpm = self.limits[cost.model]
+        reserve = 0.0 if priority == "interactive" else self.reserve
+        return [
+            Bucket(f"{cost.model}:{kind}", limit, limit / 60, amount, limit * reserve)
+            for kind, limit, amount in (("requests", rpm, cost.requests), ("tokens", tpm, cost.tokens))
+            if limit > 0
+        ]
+
+    def try_acquire(self, cost: Optional[Cost]) -> bool:
+        """기다리지 않고 확보할 수 있을 때만 차감"""
+        if cost is None or not self.limited(cost.model):
+            return True
+        return self.store.take(self._buckets(cost, _priority.get())) <= 0
+
+    def acquire(self, cost: Optional[Cost], timeout: Optional[float] = None) -> bool:
+        """한도를 확보할 때까지 대기. timeout(초) 안에 확보할 수 없으면 기다리지 않고 False"""
+        if cost is None or not self.limited(cost.model):
+            return True
+        priority = _priority.get()
+        started = time.monotonic()
+        while True:
+            wait = self.store.take(self._buckets(cost, priority))
+            waited = time.monotonic() - started
+            if wait <= 0:
+                metrics.RATE_LIMIT_WAIT_SECONDS.observe(waited, model=cost.model, priority=priority)
+                return True
+            if timeout is not None and waited + wait > timeout:
+                return False
+            time.sleep(min(wait, MAX_WAIT_STEP_SECONDS))
+
+    async def aacquire(self, cost: Optional[Cost], timeout: Optional[float] = None) -> bool:
+        """acquire의 비동기 버전"""
+        if cost is None or not self.limited(cost.model):
+            return True
+        priority = _priority.get()
+        started = time.monotonic()
+        while True:
+            wait = await asyncio.to_thread(self.store.take, self._buckets(cost, priority))
+            waited = time.monotonic() - started
+            if wait <= 0:
+                metrics.RATE_LIMIT_WAIT_SECONDS.observe(waited, model=cost.model, priority=priority)
+                return True
+            if timeout is not None and waited + wait > timeout:
+                return False
+            await asyncio.sleep(min(wait, MAX_WAIT_STEP_SECONDS))
+
+
+_limiter: Optional[RateLimiter] = None
+_limiter_lock = threading.Lock()
+
+def create_store():
+    """RATE_LIMIT_STORE 설정에 맞는 bucket 저장소 생성 (memory | sqlite)"""
+    if RATE_LIMIT_STORE == "sqlite":
+        return SQLiteBucketStore(RATE_LIMIT_STORE_PATH)
+    return MemoryBucketStore()
+
+def get_rate_limiter() -> RateLimiter:
+    """프로세스 전역 RateLimiter 반환 (최초 호출 시 생성)"""
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                limits = parse_limits(RATE_LIMITS)
+                _limiter = RateLimiter(limits, create_store() if limits else MemoryBucketStore())
+                if limits:
+                    logger.info(f"Rate limits enabled for {', '.join(sorted(limits))} ({RATE_LIMIT_STORE} store)")
+    return _limiter
+
+def chat_cost(model: str, prompt: str) -> Optional[Cost]:
+    """chat 호출 1회의 추정 사용량 (프롬프트 토큰 + RATE_LIMIT_COMPLETION_TOKENS). 한도가 없는 모델은 None"""
+    if not get_rate_limiter().limited(model):
+        return None
+    return Cost(model, 1, count_tokens(str(prompt), model) + RATE_LIMIT_COMPLETION_TOKENS)
+
+def embedding_cost(model: str, texts: List[str]) -> Optional[Cost]:
+    """임베딩 batch 요청 1회의 추정 사용량. 한도가 없는 모델은 None"""
+    if not get_rate_limiter().limited(model):
+        return None
+    return Cost(model, 1, sum(count_tokens(text, model) for text in texts))
+
+
+@contextmanager
+def priority(name: str):
+    """이 블록 안의 호출에 우선순위(interactive | batch) 적용"""
+    if name not in PRIORITIES:
+        raise ValueError(f"Unknown rate limit priority: {name}")
+    token = _priority.set(name)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+def current_priority() -> str:
+    return _priority.get()
+
+def request_priority(path: str) -> str:
+    """RATE_LIMIT_INTERACTIVE_PATHS에 포함된 경로는 interactive, 그 외는 batch"""
+    paths = {item.strip() for item in RATE_LIMIT_INTERACTIVE_PATHS.split(",") if item.strip()}
+    return "interactive" if path in paths else "batch"
+
+def init_app(app) -> None:
+    """요청 경로에 따라 우선순위 설정. 요청 밖(비동기 작업, write-behind flush)의 호출은 batch"""
+    from flask import g, request
+
+    @app.before_request
+    def _set_priority():
+        g._rate_priority_token = _priority.set(request_priority(request.path))
+
+    @app.teardown_request
+    def _reset_priority(exc=None):
+        token = g.pop("_rate_priority_token", None)
+        if token is not None:
+            _priority.reset(token)
@@ -0,0 +1,490 @@
+"""
+외부 의존성(OpenAI, Qdrant) 호출의 지연 예산, 재시도, hedge 요청, circuit breaker.
+
+- deadline: 요청 단위 지연 예산을 contextvar로 전달. 하위 LLM/임베딩/Qdrant 호출은 남은 예산 안에서만 실행/재시도
+- retry: 일시적 오류(연결 오류, timeout, 429, 5xx)는 full jitter 지수 backoff 후 재시도
+- hedge: HEDGE_ENABLED이면 hedge 대상 호출이 최근 p95 지연을 넘길 때 같은 요청을 한 번 더 보내고 먼저 끝난 결과를 사용
+- circuit breaker: 의존성별로 연속 실패가 CIRCUIT_FAILURE_THRESHOLD회 이상이면 CIRCUIT_RESET_SECONDS 동안 바로 실패
+- rate limit: cost가 주어진 호출은 시도마다 utils.rate_limiter에서 남은 예산 안에 호출 한도를 확보
+- 시도 시간은 클라이언트 자체 timeout으로 제한하고 호출 스레드에서 실행. 남은 예산이 더 짧거나 hedge할 때만
+  의존성별 스레드 풀을 사용하므로 느린 의존성이 다른 의존성의 호출을 막지 않음
+"""
+import asyncio
+import contextvars
+import logging
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+from config import (
+    REQUEST_DEADLINE_SECONDS,
+    REQUEST_DEADLINES,
+    RETRY_MAX_ATTEMPTS,
+    RETRY_BASE_DELAY_SECONDS,
+    RETRY_MAX_DELAY_SECONDS,
+    HEDGE_ENABLED,
+    HEDGE_PERCENTILE,
+    HEDGE_MIN_SAMPLES,
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_RESET_SECONDS,
+    LLM_TIMEOUT_SECONDS,
+    VECTOR_TIMEOUT_SECONDS,
+    RESILIENCE_MAX_WORKERS,
+)
+from utils import metrics, rate_limiter
+
+logger = logging.getLogger(__name__)
+
+
+class DeadlineExceeded(TimeoutError):
+    """요청의 지연 예산을 모두 사용함"""
+
+
+class CircuitOpenError(Exception):
+    """circuit breaker가 열려 있어 호출하지 않고 실패"""
+
+
+# 의존성별 시도 1회의 최대 시간(초). 남은 예산이 더 짧으면 남은 예산까지만 기다림
+DEPENDENCY_TIMEOUTS = {
+    "openai": LLM_TIMEOUT_SECONDS,
+    "qdrant": VECTOR_TIMEOUT_SECONDS,
+}
+
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("deadline", default=None)
+
+
+@contextmanager
+def deadline(seconds: Optional[float]):
+    """이 블록 안의 호출에 seconds 예산을 적용. 바깥에 더 짧은 예산이 있으면 그 예산을 유지"""
+    if seconds is None:
+        yield
+        return
+    expires = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(expires if current is None else min(current, expires))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+def remaining() -> Optional[float]:
+    """남은 예산(초). 예산이 없으면 None"""
+    expires = _deadline.get()
+    return None if expires is None else expires - time.monotonic()
+
+def check_deadline() -> None:
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceeded("request deadline exceeded")
+
+def error_status(exc: BaseException, default: int = 500) -> int:
+    """예산 초과는 504, circuit open은 503, 그 외는 default"""
+    if isinstance(exc, DeadlineExceeded):
+        return 504
+    if isinstance(exc, CircuitOpenError):
+        return 503
+    return default
+
+def is_retryable(exc: BaseException) -> bool:
+    """연결 오류/timeout/429/5xx 등 일시적 오류인지 판단. 입력/파싱 오류(ValueError 등)는 재시도하지 않음"""
+    if isinstance(exc, (DeadlineExceeded, CircuitOpenError, ValueError, TypeError, KeyError, AttributeError)):
+        return False
+    status = getattr(exc, "status_code", None)
+    if isinstance(status, int):
+        return status in (408, 409, 425, 429) or status >= 500
+    code = getattr(exc, "code", None)
+    if callable(code):
+        # grpc.RpcError
+        try:
+            return getattr(code(), "name", "") in ("UNAVAILABLE", "DEADLINE_EXCEEDED", "RESOURCE_EXHAUSTED", "ABORTED")
+        except Exception:
+            return True
+    return True
+
+def request_budget(path: str) -> Optional[float]:
+    """엔드포인트별 지연 예산. REQUEST_DEADLINES("path=seconds,...")에 없으면 REQUEST_DEADLINE_SECONDS (0이면 예산 없음)"""
+    for item in REQUEST_DEADLINES.split(","):
+        name, _, seconds = item.partition("=")
+        if name.strip() == path and seconds.strip():
+            return float(seconds) or None
+    return REQUEST_DEADLINE_SECONDS or None
+
+
+class CircuitBreaker:
+    """
+    연속 실패 수 기반 circuit breaker.
+    closed → (연속 실패 failure_threshold회) → open → (reset_seconds 경과) → half_open: 시험 호출 1건만 허용,
+    성공하면 closed, 실패하면 다시 open
+    """
+
+    def __init__(self, name: str, failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD, reset_seconds: float = CIRCUIT_RESET_SECONDS):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """호출 가능 여부 확인. 열려 있으면 CircuitOpenError. half_open의 시험 호출이면 True"""
+        with self._lock:
+            if self.state == "open" and time.monotonic() - self._opened_at >= self.reset_seconds:
+                self.state = "half_open"
+                self._probing = False
+            if self.state == "closed":
+                return False
+            if self.state == "half_open" and not self._probing:
+                self._probing = True
+                return True
+        raise CircuitOpenError(f"circuit for {self.name} is open")
+
+    def release(self) -> None:
+        """결과를 기록하지 않고 끝난 시험 호출(취소 등)의 자격을 반환. half_open이면 다음 호출이 다시 시험 호출이 됨"""
+        with self._lock:
+            self._probing = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._probing = False
+            self.state = "closed"
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._probing = False
+            if self.state == "half_open" or self._failures >= self.failure_threshold:
+                if self.state != "open":
+                    logger.warning(f"Circuit for {self.name} opened after {self._failures} consecutive failures")
+                self.state = "open"
+                self._opened_at = time.monotonic()
+
+
+class LatencyTracker:
+    """작업별 최근 성공 호출 지연(초)을 보관하고 hedge 기준 percentile을 계산"""
+
+    def __init__(self, window: int = 200):
+        self.window = window
+        self._samples: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, operation: str, seconds: float) -> None:
+        with self._lock:
+            self._samples.setdefault(operation, deque(maxlen=self.window)).append(seconds)
+
+    def percentile(self, operation: str, q: float, min_samples: int = HEDGE_MIN_SAMPLES) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples.get(operation, ()))
+        if len(samples) < max(1, min_samples):
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+latencies = LatencyTracker()
+
+
+class _AttemptPool:
+    """
+    의존성별로 분리된 크기 제한 스레드 풀. 남은 예산이 클라이언트 timeout보다 짧은 동기 호출과 hedge 요청에만 사용.
+    제한 시간이 지나 버려진 호출은 클라이언트 timeout까지 자리를 차지하므로, 자리가 없으면 대기열에 넣지 않고 None을 반환
+    """
+
+    def __init__(self, dependency: str, size: int = RESILIENCE_MAX_WORKERS):
+        size = max(2, size)
+        self._slots = threading.BoundedSemaphore(size)
+        self._executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix=f"resilience-{dependency}")
+
+    def submit(self, fn: Callable[[], Any]):
+        if not self._slots.acquire(blocking=False):
+            return None
+        try:
+            future = self._executor.submit(contextvars.copy_context().run, fn)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+
+_pools: Dict[str, _AttemptPool] = {}
+_pools_lock = threading.Lock()
+
+def _get_pool(dependency: str) -> _AttemptPool:
+    pool = _pools.get(dependency)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(dependency)
+            if pool is None:
+                pool = _pools[dependency] = _AttemptPool(dependency)
+    return pool
+
+def get_breaker(dependency: str) -> CircuitBreaker:
+    breaker = _breakers.get(dependency)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.setdefault(dependency, CircuitBreaker(dependency))
+    return breaker
+
+def reset() -> None:
+    """circuit breaker와 지연 기록 초기화 (테스트용)"""
+    with _breakers_lock:
+        _breakers.clear()
+    global latencies
+    latencies = LatencyTracker()
+
+def circuit_breaker_collector():
+    """의존성별 circuit 상태 gauge (0: closed, 1: half_open, 2: open)"""
+    states = {"closed": 0, "half_open": 1, "open": 2}
+    def collect():
+        with _breakers_lock:
+            breakers = list(_breakers.values())
+        yield "docflow_circuit_state", "gauge", "의존성별 circuit breaker 상태 (0: closed, 1: half_open, 2: open)", [
+            ({"dependency": breaker.name}, states[breaker.state]) for breaker in breakers
+        ]
+    return collect
+
+metrics.REGISTRY.register_collector("circuit_breakers", circuit_breaker_collector())
+
+
+def _backoff(attempt: int) -> float:
+    """full jitter 지수 backoff (attempt는 1부터)"""
+    return random.uniform(0, min(RETRY_MAX_DELAY_SECONDS, RETRY_BASE_DELAY_SECONDS * (2 ** (attempt - 1))))
+
+def _attempt_timeout(dependency: str) -> Optional[float]:
+    left = remaining()
+    timeout = DEPENDENCY_TIMEOUTS.get(dependency)
+    if left is None:
+        return timeout
+    return left if timeout is None else min(timeout, left)
+
+def _hedge_delay(operation: str, hedge: bool) -> Optional[float]:
+    if not (hedge and HEDGE_ENABLED):
+        return None
+    return latencies.percentile(operation, HEDGE_PERCENTILE)
+
+def schedule(cost: Optional[rate_limiter.Cost]) -> None:
+    """cost만큼 호출 한도를 확보. 남은 예산 안에 확보할 수 없으면 DeadlineExceeded (스트리밍 호출은 직접 사용)"""
+    if not rate_limiter.get_rate_limiter().acquire(cost, remaining()):
+        raise DeadlineExceeded(f"rate limit for {cost.model} is not available within the request deadline")
+
+async def aschedule(cost: Optional[rate_limiter.Cost]) -> None:
+    """schedule의 비동기 버전"""
+    if not await rate_limiter.get_rate_limiter().aacquire(cost, remaining()):
+        raise DeadlineExceeded(f"rate limit for {cost.model} is not available within the request deadline")
+
+def _hedge_allowed(cost: Optional[rate_limiter.Cost]) -> bool:
+    # hedge 요청은 기다리지 않고 확보할 수 있는 한도가 있을 때만 보냄
+    return rate_limiter.get_rate_limiter().try_acquire(cost)
+
+def _run_sync_attempt(fn: Callable[[], Any], timeout: Optional[float], hedge_delay: Optional[float], dependency: str, operation: str, cost: Optional[rate_limiter.Cost] = None) -> Any:
+    """
+    시도 1회 실행. 클라이언트 자체 timeout(DEPENDENCY_TIMEOUTS)이 시도 시간을 제한하므로 보통은 현재 스레드에서 실행하고,
+    남은 예산이 그보다 짧거나 hedge 요청을 보낼 수 있을 때만 의존성별 스레드 풀에서 실행하여 기다리는 시간을 제한
+    """
+    hedging = hedge_delay is not None and (timeout is None or hedge_delay < timeout)
+    client_timeout = DEPENDENCY_TIMEOUTS.get(dependency)
+    if not hedging and (timeout is None or (client_timeout is not None and timeout >= client_timeout)):
+        return fn()
+
+    started = time.monotonic()
+    pool = _get_pool(dependency)
+    try:
+        future = pool.submit(fn)
+    except RuntimeError:
+        # 인터프리터 종료 중에는 스레드 풀이 새 작업을 받지 않으므로 (write-behind flush 등) 현재 스레드에서 실행
+        return fn()
+    if future is None:
+        # 버려진 호출이 풀을 모두 차지하고 있으면 기다리지 않고 현재 스레드에서 실행 (클라이언트 timeout까지만 실행됨)
+        metrics.RESILIENCE_EVENTS.inc(dependency=dependency, operation=operation, event="pool_full")
+        return fn()
+    futures = [future]
+    if hedging:
+        done, _ = wait(futures, timeout=hedge_delay)
+        if not done and _hedge_allowed(cost):
+            hedge_future = pool.submit(fn)
+            if hedge_future is not None:
+                metrics.RESILIENCE_EVENTS.inc(dependency=dependency, operation=operation, event="hedge")
+                futures.append(hedge_future)
+
+    error = None
+    pending = set(futures)
+    while pending:
+        left = None if timeout is None else timeout - (time.monotonic() - started)
+        if left is not None and left <= 0:
+            break
+        done, pending = wait(pending, timeout=left, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                if len(futures) > 1 and future is futures[1]:
+                    metrics.RESILIENCE_EVENTS.inc(dependency=dependency, operation=operation, event="hedge_won")
+                for other in pending:
+                    other.cancel()
+                return future.result()
+            error = future.exception()
+    if pending:
+        for future in pending:
+            future.cancel()
+        raise TimeoutError(f"{dependency}.{operation} timed out after {timeout:.2f}s")
+    raise error
+
+def call(
+    dependency: str,
+    fn: Callable[[], Any],
+    operation: str,
+    hedge: bool = False,
+    max_attempts: int = RETRY_MAX_ATTEMPTS,
+    cost: Optional[rate_limiter.Cost] = None,
+) -> Any:
+    """
+    동기 호출을 남은 예산 안에서 실행. 일시적 오류는 backoff 후 재시도하고,
+    hedge=True이면 HEDGE_ENABLED일 때 p95를 넘긴 호출에 hedge 요청을 보냄.
+    cost(utils.rate_limiter.chat_cost/embedding_cost)가 있으면 시도마다 호출 한도를 먼저 확보
+    """
+    breaker = get_breaker(dependency)
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            check_deadline()
+            schedule(cost)
+            probe = breaker.allow()
+        except (DeadlineExceeded, CircuitOpenError) as e:
+            metrics.RESILIENCE_EVENTS.inc(dependency=dependency, operation=operation, event=_event(e))
+            raise
+
+        started = time.monotonic()
+        try:
+            result = _run_sync_attempt(fn, _attempt_timeout(dependency), _hedge_delay(operation, hedge), dependency, operation, cost)
+        except Exception as e:
+            delay = _retry_delay(e, breaker, attempt, max_attempts, dependency, operation)
+            if delay is None:
+                raise
+            time.sleep(delay)
+            continue
+        finally:
+            # 결과가 기록되지 않은 채 끝나도(BaseException 등) half_open 시험 호출이 묶이지 않도록 함
+            if probe:
+                breaker.release()
+        breaker.record_success()
+        latencies.observe(operation, time.monotonic() - started)
+        return result
+
+async def _run_async_attempt(factory: Callable[[], Awaitable], timeout: Optional[float], hedge_delay: Optional[float], dependency: str, operation: str, cost: Optional[rate_limiter.Cost] = None) -> Any:
+    started = time.monotonic()
+    tasks = [asyncio.ensure_future(factory())]
+    try:
+        if hedge_delay is not None and (timeout is None or hedge_delay < timeout):
+            done, _ = await asyncio.wait(tasks, timeout=hedge_delay)
+            if not done and _hedge_allowed(cost):
+                metrics.RESILIENCE_EVENTS.inc(dependency=dependency, operation=operation, event="hedge")
+                tasks.append(asyncio.ensure_future(factory()))
+
+        error = None
+        pending = set(tasks)
+        while pending:
+            left = None if timeout is None else timeout - (time.monotonic() - started)
+            if left is not None and left <= 0:
+                break
+            done, pending = await asyncio.wait(pending, timeout=left, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if len(tasks) > 1 and task is tasks[1]:
+                        metrics.RESILIENCE_EVENTS.inc(dependency=dependency, operation=operation, event="hedge_won")
+                    return task.result()
+                error = task.exception()
+        if pending:
+            raise TimeoutError(f"{dependency}.{operation} timed out after {timeout:.2f}s")
+        raise error
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+async def acall(
+    dependency: str,
+    factory: Callable[[], Awaitable],
+    operation: str,
+    hedge: bool = False,
+    max_attempts: int = RETRY_MAX_ATTEMPTS,
+    cost: Optional[rate_limiter.Cost] = None,
+) -> Any:
+    """call의 비동기 버전. factory는 호출할 때마다 새 코루틴을 반환해야 함"""
+    breaker = get_breaker(dependency)
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            check_deadline()
+            await aschedule(cost)
+            probe = breaker.allow()
+        except (DeadlineExceeded, CircuitOpenError) as e:
+            metrics.RESILIENCE_EVENTS.inc(dependency=dependency, operation=operation, event=_event(e))
+            raise
+
+        started = time.monotonic()
+        try:
+            result = await _run_async_attempt(factory, _attempt_timeout(dependency), _hedge_delay(operation, hedge), dependency, operation, cost)
+        except Exception as e:
+            delay = _retry_delay(e, breaker, attempt, max_attempts, dependency, operation)
+            if delay is None:
+                raise
+            await asyncio.sleep(delay)
+            continue
+        finally:
+            # 작업 취소(CancelledError)로 끝나도 half_open 시험 호출이 묶이지 않도록 함
+            if probe:
+                breaker.release()
+        breaker.record_success()
+        latencies.observe(operation, time.monotonic() - started)
+        return result
+
+def _event(exc: BaseException) -> str:
+    return "deadline_exceeded" if isinstance(exc, DeadlineExceeded) else "rejected"
+
+def _retry_delay(exc: Exception, breaker: CircuitBreaker, attempt: int, max_attempts: int, dependency: str, operation: str) -> Optional[float]:
+    """재시도 전까지 기다릴 시간(초). 재시도하지 않으면 None"""
+    if isinstance(exc, TimeoutError):
+        metrics.RESILIENCE_EVENTS.inc(dependency=dependency, operation=operation, event="timeout")
+    if not is_retryable(exc):
+        # 400, 응답 파싱 오류 등은 의존성이 응답한 것이므로 성공으로 기록 (half_open 시험 호출도 종료)
+        if not isinstance(exc, (DeadlineExceeded, CircuitOpenError)):
+            breaker.record_success()
+        return None
+    breaker.record_failure()
+    left = remaining()
+    if isinstance(exc, TimeoutError) and left is not None and left <= 0:
+        # 예산을 모두 쓴 timeout은 504로 응답하도록 DeadlineExceeded로 변환
+        raise DeadlineExceeded(f"{dependency}.{operation} exceeded the request deadline") from exc
+    if attempt >= max_attempts:
+        return None
+    delay = _backoff(attempt)
+    if left is not None and delay >= left:
+        return None
+    metrics.RESILIENCE_EVENTS.inc(dependency=dependency, operation=operation, event="retry")
+    logger.warning(f"Retrying {dependency}.{operation} in {delay:.2f}s after attempt {attempt} failed: {exc!r}")
+    return delay
+
+
+def init_app(app) -> None:
+    """요청마다 엔드포인트별 지연 예산(REQUEST_DEADLINES / REQUEST_DEADLINE_SECONDS)을 설정"""
+    from flask import g, request
+
+    @app.before_request
+    def _start_deadline():
+        budget = request_budget(request.path)
+        if budget is not None:
+            expires = time.monotonic() + budget
+            g._deadline_token = _deadline.set(expires)
+
+    @app.teardown_request
+    def _reset_deadline(exc=None):
+        token = g.pop("_deadline_token", None)
+        if token is not None:
+            _deadline.reset(token)
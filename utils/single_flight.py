@@ -0,0 +1,98 @@
+"""
+같은 요청이 동시에 여러 번 들어왔을 때 한 번만 실행하는 single-flight.
+같은 key로 실행 중인 작업이 있으면 새로 시작하지 않고 그 결과(또는 예외)를 함께 받음.
+완료된 결과는 보관하지 않으므로 실행이 끝난 뒤 들어온 요청은 다시 실행됨
+"""
+import asyncio
+import hashlib
+import json
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Tuple
+from config import SINGLE_FLIGHT_ENABLED
+from utils import metrics, resilience
+
+
+def content_hash(payload: Any) -> str:
+    """JSON으로 직렬화한 payload의 sha256 (key 순서와 무관)"""
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class SingleFlight:
+    """key별로 실행 중인 작업을 추적. 먼저 들어온 요청(leader)이 실행하고 나머지는 결과를 기다림"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+    def _join(self, key: str) -> Tuple[Future, bool]:
+        """(공유 Future, leader 여부)"""
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                # 기다리던 요청이 취소되어도 공유 Future는 취소되지 않도록 실행 중 상태로 둠
+                future.set_running_or_notify_cancel()
+                self._calls[key] = future
+        metrics.SINGLE_FLIGHT_REQUESTS.inc(flight=self.name, role="leader" if leader else "shared")
+        return future, leader
+
+    def _finish(self, key: str, future: Future, result: Any = None, error: BaseException = None) -> None:
+        with self._lock:
+            self._calls.pop(key, None)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def _deadline_exceeded(self, key: str) -> resilience.DeadlineExceeded:
+        return resilience.DeadlineExceeded(f"request deadline exceeded while waiting for in-flight {self.name} {key[:16]}")
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """key로 실행 중인 작업이 없으면 fn을 실행하고, 있으면 그 결과를 남은 지연 예산 안에서 기다림"""
+        if not SINGLE_FLIGHT_ENABLED:
+            return fn()
+        future, leader = self._join(key)
+        if not leader:
+            try:
+                return future.result(timeout=resilience.remaining())
+            except TimeoutError:
+                if future.done():
+                    raise
+                raise self._deadline_exceeded(key)
+
+        try:
+            result = fn()
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result=result)
+        return result
+
+    async def ado(self, key: str, factory: Callable[[], Awaitable]) -> Any:
+        """do의 비동기 버전. 동기/비동기 요청이 같은 key를 공유함"""
+        if not SINGLE_FLIGHT_ENABLED:
+            return await factory()
+        future, leader = self._join(key)
+        if not leader:
+            try:
+                return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), resilience.remaining())
+            except TimeoutError:
+                if future.done():
+                    raise
+                raise self._deadline_exceeded(key)
+
+        try:
+            result = await factory()
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result=result)
+        return result
@@ -0,0 +1,22 @@
+import json
+from typing import Iterable, Optional
+from flask import Response, stream_with_context
+
+
+def format_sse(data: dict, event: Optional[str] = None) -> str:
+    """dict를 server-sent event 한 건으로 직렬화"""
+    message = f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+    if event:
+        message = f"event: {event}\n{message}"
+    return message
+
+def sse_response(events: Iterable[str]) -> Response:
+    """SSE 문자열 generator를 버퍼링 없이 전송하는 응답 생성"""
+    return Response(
+        stream_with_context(events),
+        mimetype="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        },
+    )
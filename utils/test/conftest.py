@@ -31,4 +31,11 @@ def mock_qdrant():
     with patch('qdrant_client.QdrantClient') as mock_client:
         mock_instance = MagicMock()
         mock_client.return_value = mock_instance
-        yield mock_instance 
\ No newline at end of file
+        yield mock_instance 
+
+@pytest.fixture(autouse=True)
+def reset_resilience():
+    # circuit breaker 상태가 다른 테스트의 실패 시나리오에 영향을 주지 않도록 초기화
+    from utils import resilience
+    resilience.reset()
+    yield
@@ -0,0 +1,23 @@
+from unittest.mock import MagicMock
+from services import answer_cache
+
+
+def test_references_hash_ignores_order():
+    first = [{"title": "A", "content": "a"}, {"title": "B", "content": "b"}]
+
+    assert answer_cache.references_hash(first) == answer_cache.references_hash(list(reversed(first)))
+    assert answer_cache.references_hash(first) != answer_cache.references_hash(first[:1])
+
+def test_lookup_counts_hits_misses_and_bypasses():
+    cache = answer_cache.SemanticAnswerCache(enabled=True, threshold=0.9, ttl_seconds=60)
+    memory = MagicMock()
+    memory.find_similar_interaction.side_effect = [{"response": "캐시된 응답", "score": 0.97}, None]
+
+    assert cache.lookup(memory, "회의 결과 알려줘", 1, "hash") == "캐시된 응답"
+    assert cache.lookup(memory, "배포 일정은?", 1, "hash") is None
+    assert cache.lookup(memory, "회의 결과 알려줘", None, "hash") is None
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["bypassed"]) == (1, 1, 1)
+    assert stats["hit_rate"] == 0.5
+    assert memory.find_similar_interaction.call_args.kwargs == {"score_threshold": 0.9, "max_age_seconds": 60}
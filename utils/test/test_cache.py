@@ -0,0 +1,59 @@
+import time
+from unittest.mock import patch
+from langchain_core.messages import AIMessage
+from utils.cache import LRUCache, SQLiteCache, TieredCache
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+def test_lru_cache_respects_byte_limit_and_ttl():
+    cache = LRUCache(max_entries=10, max_bytes=10, ttl_seconds=0.05, sizeof=len)
+    cache.set("a", "12345")
+    cache.set("b", "123456")
+
+    assert cache.get("a") is None
+    assert cache.get("b") == "123456"
+
+    time.sleep(0.06)
+    assert cache.get("b") is None
+
+def test_tiered_cache_survives_restart_through_sqlite(tmp_path):
+    db_path = str(tmp_path / "cache.db")
+    first = TieredCache(LRUCache(), SQLiteCache(db_path, table="summary_cache"))
+    first.set("key", "요약")
+    first.persistent.close()
+
+    second = TieredCache(LRUCache(), SQLiteCache(db_path, table="summary_cache"))
+    assert second.get("key") == "요약"
+    assert second.get("key") == "요약"
+    assert second.get("other") is None
+
+    stats = second.stats()
+    assert stats["persistent_hits"] == 1
+    assert stats["memory_hits"] == 1
+    assert stats["misses"] == 1
+
+def test_summarize_content_uses_cache():
+    from services import summary_service
+    from prompts.prompts import summary_prompt
+
+    summary_service.summary_cache.memory.clear()
+    with patch.object(summary_service, "llm") as mock_llm:
+        mock_llm.model_name = "test-model"
+        mock_llm.temperature = 0
+        mock_llm.invoke.return_value = AIMessage(content=" 요약 결과 ")
+
+        first = summary_service.summarize_content("같은 문서", summary_prompt)
+        second = summary_service.summarize_content("  같은 문서\n", summary_prompt)
+
+    assert first == second == "요약 결과"
+    assert mock_llm.invoke.call_count == 1
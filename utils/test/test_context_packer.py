@@ -0,0 +1,66 @@
+from unittest.mock import MagicMock, patch
+from services import context_packer
+
+
+def summarize(content):
+    return f"summary of {content[:5]}"
+
+def test_short_references_are_used_verbatim():
+    mock_summarize = MagicMock(side_effect=summarize)
+    references = [
+        {"title": "짧은 문서", "content": "JWT를 사용한다."},
+        {"title": "긴 문서", "content": "long " * 500},
+    ]
+
+    packed = context_packer.pack_references("인증 방식?", references, mock_summarize, budget_tokens=2000)
+
+    assert packed["text"] == "# 짧은 문서\nJWT를 사용한다.\n\n# 긴 문서\nsummary of long "
+    assert (packed["verbatim"], packed["summarized"]) == (1, 1)
+    mock_summarize.assert_called_once()
+
+@patch("services.context_packer.get_embedding_service")
+def test_budget_keeps_most_relevant_references_in_request_order(mock_embedding_service):
+    references = [
+        {"title": "A", "content": "a" * 300, "score": 0.2},
+        {"title": "B", "content": "b" * 300, "score": 0.9},
+        {"title": "C", "content": "c" * 300, "score": 0.5},
+    ]
+    budget = 2 * context_packer.count_tokens(context_packer.format_reference("A", "a" * 300))
+
+    packed = context_packer.pack_references("질문", references, summarize, budget_tokens=budget)
+
+    assert packed["included"] == [1, 2]
+    assert packed["text"].startswith("# B\n")
+    assert packed["dropped"] == 1
+    mock_embedding_service.assert_not_called()
+
+def test_oversized_references_keep_most_relevant_truncated():
+    references = [
+        {"title": "A", "content": "a " * 300, "score": 0.2},
+        {"title": "B", "content": "b " * 300, "score": 0.9},
+    ]
+
+    packed = context_packer.pack_references("질문", references, summarize, budget_tokens=20)
+
+    assert packed["included"] == [1]
+    assert packed["truncated"] == 1
+    assert packed["text"].startswith("# B\n")
+    assert 0 < packed["tokens"] <= 20
+
+@patch("services.context_packer.get_embedding_service")
+def test_rank_references_uses_query_similarity(mock_embedding_service):
+    mock_embedding_service.return_value.embed_documents.return_value = [
+        [1.0, 0.0], [0.0, 1.0], [0.9, 0.1]
+    ]
+
+    scores = context_packer.rank_references("질문", [
+        {"title": "A", "content": "a"},
+        {"title": "B", "content": "b"},
+    ])
+
+    assert scores[1] > scores[0]
+
+def test_get_token_budget_per_model():
+    with patch("services.context_packer.CONTEXT_TOKEN_BUDGETS", "gpt-4o-mini=12000, gpt-3.5-turbo=3000"):
+        assert context_packer.get_token_budget("gpt-4o-mini") == 12000
+        assert context_packer.get_token_budget("unknown") == context_packer.CONTEXT_TOKEN_BUDGET
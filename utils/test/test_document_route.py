@@ -1,3 +1,4 @@
+import time
 import pytest
 from unittest.mock import patch
 from app import create_app  # Adjust if create_app is in a different module
@@ -54,6 +55,39 @@ def test_process_document_success(
     assert json_data["data"]["summary"] == "요약된 회의 내용입니다."
     mock_store_document.assert_called_once()
 
+@patch("routes.document_route.extract_keyword.extract_keywords_and_category")
+@patch("routes.document_route.generate_document.generate_document")
+@patch("routes.document_route.generate_summary.generate_document_summary")
+@patch("routes.document_route.qdrant_service.store_document_embedding")
+def test_process_document_reports_store_failure(
+    mock_store_document,
+    mock_generate_summary,
+    mock_generate_doc,
+    mock_extract_keywords,
+    client
+):
+    payload = {
+        "documentId": 124,
+        "organizationId": 456,
+        "userId": 789,
+        "chatContext": "저장 실패 확인용 회의 내용입니다.",
+        "createdBy": "홍길동",
+        "createdAt": "2023-10-01T12:00:00Z"
+    }
+    mock_extract_keywords.return_value = {"keywords": ["회의"], "category": "MEETING_DOC"}
+    mock_generate_doc.return_value = "회의 전체 문서 내용입니다."
+    mock_generate_summary.return_value = {"title": "회의 요약 제목", "summary": "요약된 회의 내용입니다."}
+    mock_store_document.return_value = {
+        "error": "Error storing document in Qdrant",
+        "message": "Failed to store document with ID 124: connection refused",
+        "status_code": 503
+    }
+
+    response = client.post("/api/process-document", json=payload)
+
+    assert response.status_code == 503
+    assert response.get_json()["error"] == "Error storing document in Qdrant"
+
 def test_process_document_missing_fields(client):
     payload = {
         "documentId": 123,
@@ -67,3 +101,186 @@ def test_process_document_missing_fields(client):
     assert response.status_code == 400
     json_data = response.get_json()
     assert "생성봇 필수 필드가 누락되었습니다." in json_data["message"]
+
+@patch("routes.document_route.extract_keyword.extract_keywords_and_category")
+@patch("routes.document_route.generate_document.stream_document")
+@patch("routes.document_route.generate_summary.generate_document_summary")
+@patch("routes.document_route.qdrant_service.store_document_embedding")
+def test_process_document_stream_sends_tokens_then_done(
+    mock_store_document,
+    mock_generate_summary,
+    mock_stream_document,
+    mock_extract_keywords,
+    client
+):
+    payload = {
+        "documentId": 123,
+        "organizationId": 456,
+        "userId": 789,
+        "chatContext": "회의에서 논의된 주요 내용입니다.",
+        "createdBy": "홍길동",
+        "createdAt": "2023-10-01T12:00:00Z"
+    }
+    mock_extract_keywords.return_value = {"keywords": ["회의"], "category": "MEETING_DOC"}
+    mock_stream_document.return_value = iter(["회의 ", "문서"])
+    mock_generate_summary.return_value = {"title": "회의 요약 제목", "summary": "요약된 회의 내용입니다."}
+
+    response = client.post("/api/process-document/stream", json=payload)
+
+    assert response.mimetype == "text/event-stream"
+    body = response.get_data(as_text=True)
+    events = [block.split("\n")[0] for block in body.strip().split("\n\n")]
+    assert events == ["event: metadata", "event: token", "event: token", "event: done"]
+    assert '"document": "회의 문서"' in body
+    assert mock_store_document.call_args[0][1]["document"] == "회의 문서"
+
+@patch("routes.document_route.extract_keyword.extract_keywords_and_category")
+@patch("routes.document_route.generate_document.stream_document")
+@patch("routes.document_route.generate_summary.generate_document_summary")
+@patch("routes.document_route.qdrant_service.store_document_embedding")
+def test_process_document_stream_reports_store_failure(
+    mock_store_document,
+    mock_generate_summary,
+    mock_stream_document,
+    mock_extract_keywords,
+    client
+):
+    payload = {
+        "documentId": 123,
+        "organizationId": 456,
+        "userId": 789,
+        "chatContext": "회의에서 논의된 주요 내용입니다.",
+        "createdBy": "홍길동",
+        "createdAt": "2023-10-01T12:00:00Z"
+    }
+    mock_extract_keywords.return_value = {"keywords": ["회의"], "category": "MEETING_DOC"}
+    mock_stream_document.return_value = iter(["회의 ", "문서"])
+    mock_generate_summary.return_value = {"title": "회의 요약 제목", "summary": "요약된 회의 내용입니다."}
+    mock_store_document.return_value = {
+        "error": "Error storing document in Qdrant",
+        "message": "Failed to store document with ID 123: connection refused",
+        "status_code": 503
+    }
+
+    response = client.post("/api/process-document/stream", json=payload)
+
+    body = response.get_data(as_text=True)
+    events = [block.split("\n")[0] for block in body.strip().split("\n\n")]
+    assert events == ["event: metadata", "event: token", "event: token", "event: error"]
+    assert "Error storing document in Qdrant" in body
+
+@patch("services.job_service.document_pipeline.run_process_document")
+def test_process_document_async_returns_job(mock_run_pipeline, client):
+    payload = {
+        "documentId": 123,
+        "organizationId": 456,
+        "userId": 789,
+        "chatContext": "회의에서 논의된 주요 내용입니다.",
+        "createdBy": "홍길동",
+        "createdAt": "2023-10-01T12:00:00Z",
+        "async": True
+    }
+    mock_run_pipeline.return_value = ({"statusCode": 200, "message": "성공했습니다", "data": {"documentId": 123}}, 200)
+
+    response = client.post("/api/process-document", json=payload)
+
+    assert response.status_code == 202
+    job_id = response.get_json()["data"]["jobId"]
+
+    for _ in range(100):
+        job = client.get(f"/api/jobs/{job_id}").get_json()["data"]
+        if job["status"] == "succeeded":
+            break
+        time.sleep(0.01)
+    assert job["status"] == "succeeded"
+    assert job["result"]["data"]["documentId"] == 123
+
+@pytest.mark.parametrize("callback_url", ["file:///etc/passwd", "ftp://internal/jobs", "not a url"])
+@patch("services.job_service.JobRunner.submit")
+def test_process_document_async_rejects_invalid_callback_url(mock_submit, callback_url, client):
+    payload = {
+        "documentId": 123,
+        "organizationId": 456,
+        "userId": 789,
+        "chatContext": "회의에서 논의된 주요 내용입니다.",
+        "createdBy": "홍길동",
+        "createdAt": "2023-10-01T12:00:00Z",
+        "async": True,
+        "callbackUrl": callback_url
+    }
+
+    response = client.post("/api/process-document", json=payload)
+
+    assert response.status_code == 400
+    mock_submit.assert_not_called()
+
+def test_get_job_not_found(client):
+    response = client.get("/api/jobs/unknown-job")
+    assert response.status_code == 404
+
+@patch("routes.document_route.metadata_service.extract_keyword.extract_document_metadata")
+@patch("routes.document_route.generate_document.generate_document")
+@patch("routes.document_route.generate_summary.generate_document_summary")
+@patch("routes.document_route.qdrant_service.store_document_embedding")
+def test_process_document_combined_metadata_mode(
+    mock_store_document,
+    mock_generate_summary,
+    mock_generate_doc,
+    mock_extract_metadata,
+    client
+):
+    mock_extract_metadata.return_value = {
+        "keywords": ["회의"],
+        "category": "MEETING_DOC",
+        "title": "회의 요약 제목",
+        "summary": "요약된 회의 내용입니다."
+    }
+    mock_generate_doc.return_value = "회의 전체 문서 내용입니다."
+
+    response = client.post("/api/process-document", json={
+        "documentId": 123,
+        "organizationId": 456,
+        "userId": 789,
+        "chatContext": "회의에서 논의된 주요 내용입니다.",
+        "createdBy": "홍길동",
+        "createdAt": "2023-10-01T12:00:00Z",
+        "metadataMode": "combined"
+    })
+
+    assert response.status_code == 200
+    assert response.get_json()["data"]["title"] == "회의 요약 제목"
+    mock_generate_summary.assert_not_called()
+    assert mock_store_document.call_args[0][1]["summary"] == "요약된 회의 내용입니다."
+
+@patch("routes.document_route.SERVING_MODE", "async")
+@patch("routes.document_route.metadata_service.extract_keyword.aextract_keywords_and_category")
+@patch("routes.document_route.generate_document.agenerate_document")
+@patch("routes.document_route.generate_summary.agenerate_document_summary")
+@patch("routes.document_route.qdrant_service.astore_document_embedding")
+def test_process_document_async_serving_mode(
+    mock_store_document,
+    mock_generate_summary,
+    mock_generate_doc,
+    mock_extract_keywords,
+    client
+):
+    mock_extract_keywords.return_value = {"keywords": ["회의"], "category": "MEETING_DOC"}
+    mock_generate_doc.return_value = "회의 전체 문서 내용입니다."
+    mock_generate_summary.return_value = {"title": "회의 요약 제목", "summary": "요약된 회의 내용입니다."}
+    mock_store_document.return_value = None
+
+    response = client.post("/api/process-document", json={
+        "documentId": 123,
+        "organizationId": 456,
+        "userId": 789,
+        "chatContext": "회의에서 논의된 주요 내용입니다.",
+        "createdBy": "홍길동",
+        "createdAt": "2023-10-01T12:00:00Z"
+    })
+
+    assert response.status_code == 200
+    data = response.get_json()["data"]
+    assert data["title"] == "회의 요약 제목"
+    assert data["category"] == "MEETING_DOC"
+    mock_generate_doc.assert_awaited_once()
+    mock_store_document.assert_awaited_once()
@@ -0,0 +1,39 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+from services.embedding_service import EmbeddingService
+
+
+def make_service(batch_size=2):
+    encoder = MagicMock()
+    encoder.embed_documents.side_effect = lambda texts: [[float(len(text))] * 4 for text in texts]
+    return EmbeddingService(model="test-model", dimensions=4, batch_size=batch_size, encoder=encoder), encoder
+
+def test_embed_documents_batches_and_deduplicates():
+    service, encoder = make_service(batch_size=2)
+
+    vectors = service.embed_documents(["a", "bb", "a", "ccc"])
+
+    assert vectors == [[1.0] * 4, [2.0] * 4, [1.0] * 4, [3.0] * 4]
+    assert [call.args[0] for call in encoder.embed_documents.call_args_list] == [["a", "bb"], ["ccc"]]
+
+def test_embed_query_reuses_cached_vector():
+    service, encoder = make_service()
+
+    first = service.embed_query("회의 결과 알려줘")
+    second = service.embed_query("회의 결과 알려줘")
+
+    assert first == second
+    assert encoder.embed_documents.call_count == 1
+    stats = service.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+def test_aembed_documents_shares_cache_with_sync_path():
+    service, encoder = make_service(batch_size=2)
+    encoder.aembed_documents = AsyncMock(side_effect=lambda texts: [[float(len(text))] * 4 for text in texts])
+    service.embed_documents(["a"])
+
+    vectors = asyncio.run(service.aembed_documents(["a", "bb", "ccc", "bb"]))
+
+    assert vectors == [[1.0] * 4, [2.0] * 4, [3.0] * 4, [2.0] * 4]
+    assert [call.args[0] for call in encoder.aembed_documents.call_args_list] == [["bb", "ccc"]]
@@ -0,0 +1,66 @@
+import threading
+import time
+import pytest
+from unittest.mock import patch
+from app import create_app
+from services import health_service
+
+
+@pytest.fixture
+def client():
+    app = create_app()
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+def test_healthz_returns_ok(client):
+    response = client.get("/healthz")
+
+    assert response.status_code == 200
+    assert response.get_json()["statusCode"] == 200
+
+@patch("routes.health_route.health_service.get_readiness_probe")
+def test_readyz_reports_failed_dependency(mock_probe, client):
+    def unreachable():
+        raise ConnectionError("connection refused")
+    mock_probe.return_value = health_service.ReadinessProbe(checks={
+        "vectorStore": unreachable,
+        "llm": lambda: {},
+    })
+
+    response = client.get("/readyz")
+
+    assert response.status_code == 503
+    checks = response.get_json()["data"]["checks"]
+    assert checks["vectorStore"] == {"status": "error", "error": "connection refused"}
+    assert checks["llm"] == {"status": "ok"}
+
+def test_readiness_probe_times_out_and_caches_result():
+    calls = []
+    def slow():
+        calls.append(1)
+        time.sleep(0.5)
+        return {}
+    probe = health_service.ReadinessProbe(checks={"vectorStore": slow}, timeout=0.05, cache_seconds=60)
+
+    started = time.monotonic()
+    result = probe.check()
+
+    assert time.monotonic() - started < 0.4
+    assert result == {"ready": False, "checks": {"vectorStore": {"status": "timeout"}}}
+    assert probe.check() is result
+    assert len(calls) == 1
+
+@patch("services.qdrant_service.bootstrap_collections", side_effect=ConnectionError("connection refused"))
+def test_app_starts_when_qdrant_is_unavailable(mock_bootstrap):
+    with patch("services.qdrant_service.QDRANT_BOOTSTRAP", "sync"):
+        with pytest.raises(ConnectionError):
+            create_app()
+
+    app = create_app()
+    for thread in threading.enumerate():
+        if thread.name == "qdrant-bootstrap":
+            thread.join(1)
+
+    assert mock_bootstrap.call_count == 2
+    assert app.test_client().get("/healthz").status_code == 200
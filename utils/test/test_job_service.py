@@ -0,0 +1,112 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+import pytest
+from unittest.mock import patch
+from services.job_service import InMemoryJobStore, JobRunner, JobStore, SQLiteJobStore, validate_callback_url
+
+
+def wait_for_status(runner, job_id, statuses=("succeeded", "failed"), timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = runner.get(job_id)
+        if job["status"] in statuses:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not finish")
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "sqlite":
+        store = SQLiteJobStore(str(tmp_path / "jobs.db"))
+        yield store
+        store.close()
+    else:
+        yield InMemoryJobStore()
+
+def test_job_runner_records_result(store):
+    runner = JobRunner(store, max_workers=1)
+    runner.register("echo", lambda payload: ({"statusCode": 200, "data": payload}, 200))
+
+    job = runner.submit("echo", {"documentId": 1})
+    finished = wait_for_status(runner, job["jobId"])
+
+    assert finished["status"] == "succeeded"
+    assert finished["result"] == {"statusCode": 200, "data": {"documentId": 1}}
+    runner.shutdown()
+
+def test_job_runner_marks_failure(store):
+    def fail(payload):
+        raise RuntimeError("LLM down")
+
+    runner = JobRunner(store, max_workers=1)
+    runner.register("fail", fail)
+
+    job = runner.submit("fail", {})
+    finished = wait_for_status(runner, job["jobId"])
+
+    assert finished["status"] == "failed"
+    assert finished["statusCode"] == 500
+    runner.shutdown()
+
+def test_sqlite_store_resumes_stale_jobs_after_restart(tmp_path):
+    path = str(tmp_path / "jobs.db")
+    old = (datetime.now(timezone.utc) - timedelta(hours=1)).isoformat()
+    first = SQLiteJobStore(path)
+    first.create({
+        "jobId": "job-1", "kind": "echo", "status": "running", "payload": {"documentId": 1},
+        "result": None, "statusCode": None, "callbackUrl": None, "createdAt": old, "updatedAt": old,
+    })
+    first.close()
+
+    runner = JobRunner(SQLiteJobStore(path), max_workers=1)
+    runner.register("echo", lambda payload: ({"data": payload}, 200))
+
+    assert runner.resume_unfinished(stale_after_seconds=60) == 1
+    finished = wait_for_status(runner, "job-1")
+    assert finished["result"] == {"data": {"documentId": 1}}
+    assert finished["owner"] == runner.owner
+    assert runner.resume_unfinished(stale_after_seconds=0) == 0
+    runner.shutdown()
+
+def test_live_worker_jobs_are_not_resumed_by_other_workers(store):
+    release = threading.Event()
+    calls = []
+
+    def slow(payload):
+        calls.append(payload)
+        release.wait(2)
+        return {"data": payload}, 200
+
+    live = JobRunner(store, max_workers=1, heartbeat_seconds=0.05)
+    live.register("slow", slow)
+    running = live.submit("slow", {"documentId": 1})
+    queued = live.submit("slow", {"documentId": 2})
+    other = JobRunner(store, max_workers=1, heartbeat_seconds=0)
+    other.register("slow", slow)
+
+    # heartbeat가 실행 중/대기 중 작업을 계속 갱신하므로 stale 기준 시간이 지나도 가져가지 않음
+    time.sleep(0.3)
+    assert other.resume_unfinished(stale_after_seconds=0.2) == 0
+
+    release.set()
+    for job in (running, queued):
+        assert wait_for_status(live, job["jobId"])["status"] == "succeeded"
+    assert len(calls) == 2
+    live.shutdown()
+    other.shutdown()
+
+def test_job_store_requires_all_methods():
+    with pytest.raises(TypeError):
+        JobStore()
+
+def test_validate_callback_url():
+    assert validate_callback_url("https://api.example.com/jobs/done") is None
+    assert validate_callback_url("file:///etc/passwd") is not None
+    assert validate_callback_url("gopher://example.com") is not None
+
+    with patch("services.job_service.JOB_CALLBACK_ALLOWED_HOSTS", "backend.internal, .example.com"):
+        assert validate_callback_url("http://backend.internal:3000/callback") is None
+        assert validate_callback_url("https://api.example.com/jobs/done") is None
+        assert validate_callback_url("http://169.254.169.254/latest/meta-data") is not None
+        assert validate_callback_url("https://example.com.evil.io/") is not None
@@ -0,0 +1,32 @@
+import pytest
+from unittest.mock import patch
+from services import llm_registry
+from services.llm_registry import LLMRegistry
+
+
+def test_role_config_applies_overrides():
+    with patch("services.llm_registry.LLM_ROLE_MODELS", "answering=gpt-4o, extraction=gpt-4o-mini"), \
+         patch("services.llm_registry.LLM_ROLE_TEMPERATURES", "answering=0.3"), \
+         patch("services.llm_registry.LANGCHAIN_MODEL", "gpt-3.5-turbo"):
+        assert llm_registry.role_config("answering") == ("gpt-4o", 0.3)
+        assert llm_registry.role_config("extraction") == ("gpt-4o-mini", 0.1)
+        assert llm_registry.role_config("open_answering") == ("gpt-3.5-turbo", 0.5)
+
+def test_unknown_role_raises():
+    with pytest.raises(ValueError):
+        llm_registry.role_config("translation")
+
+def test_roles_share_http_pool_and_instances():
+    registry = LLMRegistry()
+    with patch("services.llm_registry.LLM_ROLE_MODELS", ""), \
+         patch("services.llm_registry.LLM_ROLE_TEMPERATURES", ""):
+        generation = registry.get("generation")
+        extraction = registry.get("extraction")
+        answering_without_docs = registry.get("open_answering")
+
+    assert generation is extraction
+    assert answering_without_docs is not generation
+    assert answering_without_docs.temperature == 0.5
+    assert generation.http_client is answering_without_docs.http_client is registry.http_client()
+    assert generation.http_async_client is registry.http_async_client()
+    registry.close()
@@ -0,0 +1,78 @@
+import asyncio
+import pytest
+from unittest.mock import patch, MagicMock
+from qdrant_client import QdrantClient
+from services import memory_service
+from services.vector_store import AsyncLocalVectorStore, LocalVectorStore
+
+
+def make_service(collection_name="memory_test", write_behind=False, client=None):
+    encoder = MagicMock()
+    # 질문 텍스트별로 고정된 벡터를 반환
+    vectors = {"JWT 인증": [1.0, 0.0, 0.0], "JWT 토큰": [0.9, 0.1, 0.0], "배포 일정": [0.0, 0.0, 1.0]}
+    encoder.embed_query.side_effect = lambda text: vectors[text]
+    encoder.embed_documents.side_effect = lambda texts: [vectors[text] for text in texts]
+    with patch("services.memory_service.get_embedding_service", return_value=encoder), \
+         patch("services.memory_service.qdrant_service.ensure_memory_collection"):
+        service = memory_service.MemoryService(
+            client or QdrantClient(":memory:"),
+            collection_name=collection_name,
+            write_behind=write_behind
+        )
+    service.qdrant_client.create_collection(
+        collection_name,
+        vectors_config=memory_service.models.VectorParams(size=3, distance=memory_service.models.Distance.COSINE),
+    )
+    return service
+
+def test_retrieve_relevant_memories_is_scoped_and_thresholded():
+    service = make_service()
+    service.store_interaction("JWT 인증", "JWT를 사용합니다.", organization_id=1, user_id=10)
+    service.store_interaction("JWT 인증", "다른 조직의 답변", organization_id=2, user_id=20)
+    service.store_interaction("배포 일정", "금요일 배포", organization_id=1, user_id=10)
+
+    memories = service.retrieve_relevant_memories("JWT 토큰", organization_id=1, user_id=10, score_threshold=0.5)
+
+    assert [memory["response"] for memory in memories] == ["JWT를 사용합니다."]
+    assert memories[0]["organizationId"] == 1
+
+def test_build_memory_filter_without_scope():
+    assert memory_service.build_memory_filter() is None
+    assert len(memory_service.build_memory_filter(organization_id=1).must) == 1
+
+def test_write_behind_batches_interactions_off_the_request_path():
+    service = make_service(collection_name="memory_write_behind_test", write_behind=True)
+
+    for query in ("JWT 인증", "JWT 토큰", "배포 일정"):
+        service.store_interaction(query, "답변", organization_id=1)
+    service.write_buffer.join()
+
+    assert service.qdrant_client.count("memory_write_behind_test").count == 3
+    assert service.encoder.embed_documents.call_count < 3
+    stats = service.write_stats()
+    assert (stats["flushed"], stats["dropped"], stats["depth"]) == (3, 0, 0)
+    service.write_buffer.close()
+
+@pytest.mark.parametrize("client_factory", [lambda: None, lambda: LocalVectorStore(":memory:")])
+def test_find_similar_interaction_matches_organization_and_references(client_factory):
+    client = client_factory()
+    service = make_service(collection_name=f"memory_cache_test_{type(client).__name__}", client=client)
+    service.store_interaction("JWT 인증", "JWT를 사용합니다.", organization_id=1, refs_hash="refs-a")
+    service.store_interaction("JWT 인증", "다른 reference 답변", organization_id=1, refs_hash="refs-b")
+
+    hit = service.find_similar_interaction("JWT 토큰", 1, "refs-a", score_threshold=0.9, max_age_seconds=60)
+
+    assert hit["response"] == "JWT를 사용합니다."
+    assert service.find_similar_interaction("JWT 토큰", 2, "refs-a", score_threshold=0.9, max_age_seconds=60) is None
+    assert service.find_similar_interaction("배포 일정", 1, "refs-a", score_threshold=0.9, max_age_seconds=60) is None
+
+def test_aretrieve_relevant_memories_uses_async_client():
+    service = make_service(collection_name="memory_async_test", client=LocalVectorStore(":memory:"))
+    service.async_client = AsyncLocalVectorStore(service.qdrant_client)
+    service.encoder.aembed_query = lambda text: asyncio.sleep(0, result=service.encoder.embed_query(text))
+    service.store_interaction("JWT 인증", "JWT를 사용합니다.", organization_id=1)
+    service.store_interaction("배포 일정", "금요일 배포", organization_id=1)
+
+    memories = asyncio.run(service.aretrieve_relevant_memories("JWT 토큰", organization_id=1, score_threshold=0.5))
+
+    assert [memory["response"] for memory in memories] == ["JWT를 사용합니다."]
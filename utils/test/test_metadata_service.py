@@ -0,0 +1,48 @@
+from unittest.mock import patch
+from services import metadata_service
+
+COMBINED_RESULT = {
+    "keywords": ["API", "설계"],
+    "category": "DEV_DOC",
+    "title": "API 설계",
+    "summary": "REST API 설계 합의 내용",
+}
+
+
+@patch("services.metadata_service.generate_summary.generate_document_summary")
+@patch("services.metadata_service.extract_keyword.extract_keywords_and_category")
+@patch("services.metadata_service.extract_keyword.extract_document_metadata")
+def test_combined_mode_uses_single_call(mock_combined, mock_extract_keywords, mock_generate_summary):
+    mock_combined.return_value = COMBINED_RESULT
+
+    result = metadata_service.extract_document_metadata("채팅", mode="combined")
+
+    assert result == COMBINED_RESULT
+    mock_combined.assert_called_once_with("채팅")
+    mock_extract_keywords.assert_not_called()
+    mock_generate_summary.assert_not_called()
+
+@patch("services.metadata_service.generate_summary.generate_document_summary")
+@patch("services.metadata_service.extract_keyword.extract_keywords_and_category")
+@patch("services.metadata_service.extract_keyword.extract_document_metadata")
+def test_combined_mode_falls_back_to_split(mock_combined, mock_extract_keywords, mock_generate_summary):
+    mock_combined.return_value = {"error": "Invalid LLM response", "message": "", "status_code": 500}
+    mock_extract_keywords.return_value = {"keywords": ["회의"], "category": "MEETING_DOC"}
+    mock_generate_summary.return_value = {"title": "회의록", "summary": "요약", "document": "전체"}
+
+    result = metadata_service.extract_document_metadata("채팅", mode="combined")
+
+    assert result == {"keywords": ["회의"], "category": "MEETING_DOC", "title": "회의록", "summary": "요약"}
+    mock_generate_summary.assert_called_once_with("채팅", "MEETING_DOC")
+
+@patch("services.metadata_service.extract_keyword.extract_keywords_and_category")
+@patch("services.metadata_service.extract_keyword.extract_document_metadata")
+def test_split_mode_skips_combined_call(mock_combined, mock_extract_keywords):
+    mock_extract_keywords.return_value = {"keywords": [], "category": "DEV_DOC"}
+
+    assert metadata_service.extract_metadata("채팅", mode="split") == {"keywords": [], "category": "DEV_DOC"}
+    mock_combined.assert_not_called()
+
+def test_resolve_mode_ignores_unknown_values():
+    assert metadata_service.resolve_mode("COMBINED") == "combined"
+    assert metadata_service.resolve_mode("fast") == "split"
@@ -0,0 +1,77 @@
+import pytest
+from unittest.mock import patch
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, LLMResult
+from app import create_app
+from services import extract_keyword
+from utils import metrics
+
+
+@pytest.fixture
+def client():
+    app = create_app()
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+def test_render_prometheus_text_format():
+    registry = metrics.Registry()
+    counter = registry.counter("test_requests_total", "요청 수", ["route"])
+    histogram = registry.histogram("test_latency_seconds", "지연", ["route"], buckets=(0.1, 1.0))
+    counter.inc(route='/a"b')
+    histogram.observe(0.05, route="/a")
+    histogram.observe(0.5, route="/a")
+    registry.register_collector("depth", lambda: [("test_depth", "gauge", "대기 수", [({}, 3)])])
+
+    text = registry.render()
+
+    assert "# TYPE test_requests_total counter" in text
+    assert 'test_requests_total{route="/a\\"b"} 1.0' in text
+    assert 'test_latency_seconds_bucket{route="/a",le="0.1"} 1' in text
+    assert 'test_latency_seconds_bucket{route="/a",le="+Inf"} 2' in text
+    assert 'test_latency_seconds_count{route="/a"} 2' in text
+    assert "test_depth 3.0" in text
+
+def test_histogram_time_records_error_status():
+    histogram = metrics.Histogram("test_op_seconds", "op", ["operation", "status"])
+    with pytest.raises(RuntimeError):
+        with histogram.time(operation="upsert"):
+            raise RuntimeError("down")
+
+    assert histogram.get_count(operation="upsert", status="error") == 1
+
+def test_track_llm_records_latency_and_tokens():
+    before = metrics.LLM_TOKENS.get(prompt="test_prompt", model="gpt-test", type="prompt")
+    llm = type("LLM", (), {"model_name": "gpt-test"})()
+    response = LLMResult(generations=[[ChatGeneration(message=AIMessage(
+        content="ok",
+        usage_metadata={"input_tokens": 12, "output_tokens": 3, "total_tokens": 15}
+    ))]])
+
+    with metrics.track_llm("test_prompt", llm) as call:
+        call.on_llm_end(response)
+
+    assert metrics.LLM_TOKENS.get(prompt="test_prompt", model="gpt-test", type="prompt") == before + 12
+    assert metrics.LLM_TOKENS.get(prompt="test_prompt", model="gpt-test", type="completion") >= 3
+    assert metrics.LLM_REQUEST_SECONDS.get_count(prompt="test_prompt", model="gpt-test", status="ok") >= 1
+
+@patch("services.extract_keyword.structured_llm")
+def test_keyword_fallback_is_counted(mock_llm):
+    mock_llm.invoke.side_effect = RuntimeError("rate limited")
+    before = metrics.FALLBACKS.get(stage="extract_keywords", reason="llm_error")
+
+    result = extract_keyword.extract_keywords_and_category("채팅")
+
+    assert result == {"keywords": [], "category": "DEV_DOC"}
+    assert metrics.FALLBACKS.get(stage="extract_keywords", reason="llm_error") == before + 1
+
+def test_metrics_endpoint_exposes_request_metrics(client):
+    client.get("/api/jobs/unknown-job")
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.mimetype == "text/plain"
+    body = response.get_data(as_text=True)
+    assert 'docflow_http_request_seconds_count{endpoint="/api/jobs/<job_id>",method="GET",status="404"}' in body
+    assert "# TYPE docflow_fallbacks_total counter" in body
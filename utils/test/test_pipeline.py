@@ -0,0 +1,96 @@
+import asyncio
+import time
+import pytest
+from services.pipeline import Stage, StageFailed, arun_concurrently, arun_stages, run_concurrently, run_stages
+
+
+def test_run_stages_passes_dependency_results():
+    results = run_stages([
+        Stage("a", lambda deps: 1),
+        Stage("b", lambda deps: deps["a"] + 1, depends_on=("a",)),
+        Stage("c", lambda deps: deps["a"] + deps["b"], depends_on=("a", "b")),
+    ])
+
+    assert results == {"a": 1, "b": 2, "c": 3}
+
+def test_run_stages_runs_independent_stages_concurrently():
+    def slow(value):
+        def func(deps):
+            time.sleep(0.2)
+            return value
+        return func
+
+    started = time.perf_counter()
+    results = run_stages([Stage("a", slow(1)), Stage("b", slow(2))], max_workers=2)
+    elapsed = time.perf_counter() - started
+
+    assert results == {"a": 1, "b": 2}
+    assert elapsed < 0.35
+
+def test_run_stages_stops_on_error_result():
+    called = []
+    error = {"error": "Invalid Category", "message": "카테고리 분류에 실패했습니다.", "status_code": 400}
+
+    with pytest.raises(StageFailed) as exc_info:
+        run_stages([
+            Stage("a", lambda deps: error),
+            Stage("b", lambda deps: called.append("b"), depends_on=("a",)),
+        ])
+
+    assert exc_info.value.stage == "a"
+    assert exc_info.value.result["status_code"] == 400
+    assert called == []
+
+def test_run_stages_rejects_unknown_dependency():
+    with pytest.raises(ValueError):
+        run_stages([Stage("a", lambda deps: 1, depends_on=("missing",))])
+
+def test_run_concurrently_keeps_order_and_returns_exceptions():
+    def fail():
+        raise RuntimeError("boom")
+
+    results = run_concurrently([lambda: 1, fail, lambda: 3], max_workers=2)
+
+    assert results[0] == 1
+    assert isinstance(results[1], RuntimeError)
+    assert results[2] == 3
+
+def test_arun_stages_awaits_independent_stages_concurrently():
+    def slow(value):
+        async def func(deps):
+            await asyncio.sleep(0.2)
+            return value + sum(deps.values())
+        return func
+
+    started = time.perf_counter()
+    results = asyncio.run(arun_stages([
+        Stage("a", slow(1)),
+        Stage("b", slow(2)),
+        Stage("c", slow(0), depends_on=("a", "b")),
+    ]))
+    elapsed = time.perf_counter() - started
+
+    assert results == {"a": 1, "b": 2, "c": 3}
+    assert elapsed < 0.55
+
+def test_arun_stages_raises_stage_failed_on_error_result():
+    async def failing(deps):
+        return {"error": "boom", "status_code": 500}
+
+    with pytest.raises(StageFailed) as exc:
+        asyncio.run(arun_stages([Stage("a", failing)]))
+
+    assert exc.value.stage == "a"
+
+def test_arun_concurrently_keeps_order_and_returns_exceptions():
+    async def value(v):
+        await asyncio.sleep(0.01 * (3 - v))
+        return v
+
+    async def fail():
+        raise RuntimeError("down")
+
+    results = asyncio.run(arun_concurrently([lambda: value(1), fail, lambda: value(2)], max_workers=2))
+
+    assert results[0] == 1 and results[2] == 2
+    assert isinstance(results[1], RuntimeError)
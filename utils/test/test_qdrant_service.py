@@ -0,0 +1,90 @@
+import threading
+from unittest.mock import patch, MagicMock
+from services import qdrant_service
+from services.vector_store import LocalVectorStore
+
+
+@patch.object(qdrant_service, "_clients", {})
+@patch("services.vector_store.QdrantClient")
+def test_get_client_reuses_one_client_across_threads(mock_client_cls):
+    clients = []
+    threads = [
+        threading.Thread(target=lambda: clients.append(qdrant_service.get_client("http://qdrant-test:6333")))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len({id(client) for client in clients}) == 1
+    mock_client_cls.assert_called_once_with(url="http://qdrant-test:6333", prefer_grpc=True, timeout=10)
+
+    qdrant_service.close_clients()
+    mock_client_cls.return_value.close.assert_called_once()
+
+@patch.object(qdrant_service, "_ready_collections", set())
+def test_ensure_collection_checks_once_per_process():
+    client = MagicMock()
+    client.collection_exists.return_value = False
+
+    qdrant_service.ensure_collection("test_collection", client=client)
+    qdrant_service.ensure_collection("test_collection", client=client)
+
+    client.collection_exists.assert_called_once_with("test_collection")
+    client.create_collection.assert_called_once()
+
+@patch.object(qdrant_service, "_ready_collections", set())
+def test_ensure_collection_updates_changed_hnsw_config():
+    client = MagicMock()
+    client.collection_exists.return_value = True
+    client.get_collection.return_value.config.hnsw_config = MagicMock(m=16, ef_construct=100, payload_m=None)
+
+    qdrant_service.ensure_collection(
+        "memory",
+        client=client,
+        payload_indexes=qdrant_service.MEMORY_PAYLOAD_INDEXES,
+        hnsw_config=qdrant_service.models.HnswConfigDiff(m=32, ef_construct=100),
+    )
+
+    client.update_collection.assert_called_once()
+    assert client.update_collection.call_args.kwargs["hnsw_config"].m == 32
+    indexed = [call.kwargs["field_name"] for call in client.create_payload_index.call_args_list]
+    assert indexed == ["organizationId", "userId", "refsHash", "timestamp"]
+
+def test_search_document_chunks_collapses_hits_by_document():
+    def hit(document_id, chunk_index, score):
+        return MagicMock(score=score, payload={
+            "documentId": document_id,
+            "chunkIndex": chunk_index,
+            "text": f"{document_id}-{chunk_index}",
+            "title": f"문서 {document_id}",
+        })
+
+    client = MagicMock()
+    client.search.return_value = [hit(1, 4, 0.9), hit(2, 0, 0.8), hit(1, 1, 0.7), hit(3, 2, 0.6), hit(1, 2, 0.5)]
+
+    with patch("services.qdrant_service.get_client", return_value=client):
+        documents = qdrant_service.search_document_chunks([0.1] * 4, limit=2, chunks_per_document=2)
+
+    assert [document["documentId"] for document in documents] == [1, 2]
+    assert documents[0]["score"] == 0.9
+    assert [chunk["chunkIndex"] for chunk in documents[0]["chunks"]] == [1, 4]
+
+@patch.object(qdrant_service, "_ready_collections", set())
+@patch("services.qdrant_service.CHUNK_INDEXING_ENABLED", True)
+@patch("services.qdrant_service.split_document", side_effect=lambda text: ["chunk 1", "chunk 2"] if text.strip() else [])
+@patch("services.qdrant_service.get_embedding_service")
+def test_store_document_removes_chunks_when_content_becomes_empty(mock_embedding_service, mock_split_document):
+    mock_embedding_service.return_value.embed_documents.side_effect = lambda texts: [[0.1] * 1024 for _ in texts]
+    store = LocalVectorStore(":memory:")
+    payload = {"title": "제목", "summary": "요약", "document": "3분기 목표", "organizationId": 1}
+
+    def chunk_count():
+        return store.count(qdrant_service.QDRANT_CHUNK_COLLECTION_NAME).count
+
+    with patch("services.qdrant_service.get_client", return_value=store):
+        assert qdrant_service.store_document_embedding(101, payload) is None
+        assert chunk_count() == 2
+        assert qdrant_service.store_document_embedding(101, {**payload, "document": "  "}) is None
+        assert chunk_count() == 0
@@ -0,0 +1,71 @@
+import time
+import pytest
+from unittest.mock import MagicMock, patch
+from utils import rate_limiter, resilience
+from utils.rate_limiter import Cost, MemoryBucketStore, RateLimiter, SQLiteBucketStore
+from utils.resilience import DeadlineExceeded
+
+
+def test_parse_limits():
+    assert rate_limiter.parse_limits("gpt-4o-mini=500:200000, text-embedding-3-large=:1000000,") == {
+        "gpt-4o-mini": (500.0, 200000.0),
+        "text-embedding-3-large": (0.0, 1000000.0),
+    }
+
+def test_token_bucket_waits_for_refill():
+    limiter = RateLimiter({"gpt": (120, 0)})
+    assert limiter.try_acquire(Cost("gpt", 120, 0))
+    assert not limiter.try_acquire(Cost("gpt", 1, 0))
+    assert not limiter.acquire(Cost("gpt", 1, 0), timeout=0.1)
+
+    started = time.monotonic()
+    assert limiter.acquire(Cost("gpt", 1, 0), timeout=2)
+    assert 0.3 < time.monotonic() - started < 1.5
+
+def test_batch_calls_leave_reserve_for_interactive():
+    limiter = RateLimiter({"gpt": (0, 1000)}, reserve=0.5)
+    assert limiter.try_acquire(Cost("gpt", 1, 500))
+    assert not limiter.try_acquire(Cost("gpt", 1, 100))
+
+    with rate_limiter.priority("interactive"):
+        assert limiter.try_acquire(Cost("gpt", 1, 400))
+
+def test_unlimited_model_is_not_scheduled():
+    limiter = RateLimiter({"gpt": (1, 1)})
+    with patch("utils.rate_limiter._limiter", limiter):
+        assert rate_limiter.chat_cost("other-model", "프롬프트") is None
+        assert rate_limiter.chat_cost("gpt", "프롬프트").tokens > rate_limiter.RATE_LIMIT_COMPLETION_TOKENS
+    assert limiter.acquire(None)
+
+def test_sqlite_store_shares_limits_between_processes(tmp_path):
+    path = str(tmp_path / "rate_limits.db")
+    first = RateLimiter({"gpt": (10, 0)}, SQLiteBucketStore(path))
+    second = RateLimiter({"gpt": (10, 0)}, SQLiteBucketStore(path))
+
+    assert first.try_acquire(Cost("gpt", 6, 0))
+    assert not second.try_acquire(Cost("gpt", 6, 0))
+    # batch 호출은 예약분(20%)을 남기므로 2건만 더 가능
+    assert second.try_acquire(Cost("gpt", 2, 0))
+    assert not first.try_acquire(Cost("gpt", 1, 0))
+    first.store.close()
+    second.store.close()
+
+def test_request_priority_by_path():
+    assert rate_limiter.request_priority("/api/search-document") == "interactive"
+    assert rate_limiter.request_priority("/api/save-documents") == "batch"
+    with pytest.raises(ValueError):
+        with rate_limiter.priority("urgent"):
+            pass
+
+def test_call_fails_fast_when_quota_exceeds_deadline():
+    limiter = RateLimiter({"gpt": (1, 0)}, MemoryBucketStore())
+    limiter.try_acquire(Cost("gpt", 1, 0))
+    fn = MagicMock(return_value="ok")
+
+    with patch("utils.rate_limiter._limiter", limiter):
+        assert resilience.call("openai", fn, "answer", cost=None) == "ok"
+        with resilience.deadline(0.2):
+            with pytest.raises(DeadlineExceeded):
+                resilience.call("openai", fn, "answer", cost=Cost("gpt", 1, 0))
+
+    assert fn.call_count == 1
@@ -0,0 +1,160 @@
+import asyncio
+import threading
+import time
+import pytest
+from unittest.mock import MagicMock, patch
+from app import create_app
+from utils import resilience
+from utils.resilience import CircuitBreaker, CircuitOpenError, DeadlineExceeded
+
+
+class RateLimited(Exception):
+    status_code = 429
+
+
+@pytest.fixture(autouse=True)
+def no_backoff():
+    with patch("utils.resilience._backoff", return_value=0.01):
+        yield
+
+def test_call_retries_transient_errors():
+    fn = MagicMock(side_effect=[ConnectionError("reset"), RateLimited(), "ok"])
+
+    assert resilience.call("openai", fn, "answer") == "ok"
+    assert fn.call_count == 3
+    assert resilience.get_breaker("openai").state == "closed"
+
+def test_call_does_not_retry_invalid_input():
+    fn = MagicMock(side_effect=ValueError("bad prompt"))
+
+    with pytest.raises(ValueError):
+        resilience.call("openai", fn, "answer")
+    assert fn.call_count == 1
+
+def test_deadline_bounds_stalled_call():
+    started = time.monotonic()
+    with resilience.deadline(0.2):
+        with pytest.raises(DeadlineExceeded):
+            resilience.call("openai", lambda: time.sleep(2), "answer")
+
+    assert time.monotonic() - started < 1
+    assert resilience.error_status(DeadlineExceeded()) == 504
+
+def test_nested_deadline_keeps_shorter_budget():
+    with resilience.deadline(0.5):
+        with resilience.deadline(10):
+            assert resilience.remaining() <= 0.5
+    assert resilience.remaining() is None
+
+def test_bulk_and_stream_paths_have_no_default_budget():
+    assert resilience.request_budget("/api/search-document") == resilience.REQUEST_DEADLINE_SECONDS
+    for path in ("/api/save-documents", "/api/process-document/stream", "/api/search-document/stream"):
+        assert resilience.request_budget(path) is None
+
+def test_circuit_opens_and_half_opens_after_reset():
+    breaker = CircuitBreaker("qdrant", failure_threshold=2, reset_seconds=0.05)
+    breaker.record_failure()
+    breaker.allow()
+    breaker.record_failure()
+
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+    time.sleep(0.06)
+    breaker.allow()
+    assert breaker.state == "half_open"
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+def test_open_circuit_fails_fast():
+    fn = MagicMock(side_effect=ConnectionError("refused"))
+    with patch.object(resilience.get_breaker("qdrant"), "failure_threshold", 2):
+        with pytest.raises(ConnectionError):
+            resilience.call("qdrant", fn, "search", max_attempts=2)
+        with pytest.raises(CircuitOpenError):
+            resilience.call("qdrant", fn, "search")
+
+    assert fn.call_count == 2
+
+def test_half_open_probe_is_released_after_non_retryable_error():
+    breaker = CircuitBreaker("qdrant", failure_threshold=1, reset_seconds=0.05)
+    fn = MagicMock(side_effect=[ConnectionError("refused"), ValueError("bad filter"), "ok", "ok"])
+
+    with patch.dict(resilience._breakers, {"qdrant": breaker}):
+        with pytest.raises(ConnectionError):
+            resilience.call("qdrant", fn, "search", max_attempts=1)
+        time.sleep(0.06)
+        with pytest.raises(ValueError):
+            resilience.call("qdrant", fn, "search")
+        assert resilience.call("qdrant", fn, "search") == "ok"
+        assert resilience.call("qdrant", fn, "search") == "ok"
+
+    assert breaker.state == "closed"
+
+def test_call_without_short_deadline_runs_in_caller_thread():
+    caller = threading.current_thread()
+    assert resilience.call("openai", lambda: threading.current_thread(), "answer") is caller
+
+def test_stalled_dependency_does_not_block_other_dependencies():
+    pools = {name: resilience._AttemptPool(name, size=2) for name in ("qdrant", "openai")}
+    with patch.dict(resilience._pools, pools), patch.dict(resilience._breakers, {"qdrant": CircuitBreaker("qdrant", failure_threshold=10)}):
+        # 제한 시간이 지나 버려진 qdrant 호출이 qdrant 풀을 모두 차지
+        for _ in range(2):
+            with resilience.deadline(0.05):
+                with pytest.raises(TimeoutError):
+                    resilience.call("qdrant", lambda: time.sleep(1), "search", max_attempts=1)
+
+        started = time.monotonic()
+        with resilience.deadline(0.5):
+            assert resilience.call("openai", lambda: "answer", "answer") == "answer"
+            # 풀이 가득 차면 대기열에서 기다리지 않고 호출 스레드에서 실행
+            assert resilience.call("qdrant", lambda: "hit", "search") == "hit"
+        assert time.monotonic() - started < 0.3
+
+@patch("utils.resilience.HEDGE_ENABLED", True)
+def test_hedge_request_wins_over_slow_call():
+    for _ in range(20):
+        resilience.latencies.observe("answer", 0.01)
+    fn = MagicMock(side_effect=[lambda: time.sleep(1) or "slow", lambda: "fast"])
+
+    started = time.monotonic()
+    assert resilience.call("openai", lambda: fn()(), "answer", hedge=True) == "fast"
+    assert time.monotonic() - started < 0.5
+
+def test_acall_retries_and_respects_deadline():
+    attempts = []
+
+    async def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise ConnectionError("reset")
+        return "ok"
+
+    async def stalled():
+        await asyncio.sleep(2)
+
+    async def run():
+        assert await resilience.acall("openai", flaky, "answer") == "ok"
+        with resilience.deadline(0.1):
+            with pytest.raises(DeadlineExceeded):
+                await resilience.acall("openai", stalled, "answer")
+
+    asyncio.run(run())
+    assert len(attempts) == 2
+
+@patch("utils.resilience.REQUEST_DEADLINE_SECONDS", 0.2)
+@patch("routes.search_route.memory_service_instance")
+def test_search_document_returns_504_when_budget_is_spent(mock_memory):
+    mock_memory.retrieve_relevant_memories.return_value = []
+    mock_memory.find_similar_interaction.return_value = None
+    mock_memory.format_memories_for_prompt.return_value = ""
+    slow_llm = MagicMock()
+    slow_llm.invoke.side_effect = lambda *args, **kwargs: time.sleep(2)
+    app = create_app()
+
+    with patch("services.document_service.llm_without_docs", slow_llm):
+        response = app.test_client().post('/api/search-document', json={"userQuery": "인증 방식은?"})
+
+    assert response.status_code == 504
+    mock_memory.store_interaction.assert_not_called()
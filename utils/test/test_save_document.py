@@ -4,6 +4,9 @@ import json
 from datetime import datetime
 import logging
 from unittest.mock import patch
+from qdrant_client.http import models
+from services import qdrant_service
+from services.vector_store import LocalVectorStore
 
 logger = logging.getLogger(__name__)
 
@@ -14,7 +17,11 @@ def client():
     with app.test_client() as client:
         yield client
 
-def test_save_document_success(client):
+@patch("routes.save_document.ingest_service.skip_unchanged", return_value={})
+@patch("routes.save_document.qdrant_service.store_document_embedding", return_value=None)
+@patch("routes.save_document.metadata_service.summarize", return_value={"title": "Q3 목표", "summary": "3분기 목표 정리"})
+@patch("routes.save_document.metadata_service.extract_metadata", return_value={"keywords": ["목표"], "category": "PLANNING"})
+def test_save_document_success(mock_extract, mock_summarize, mock_store, mock_skip, client):
     test_data = {
     "documentId": 101,
     "organizationId": 2001,
@@ -32,4 +39,164 @@ def test_save_document_success(client):
     assert response.status_code == 200
     data = json.loads(response.data)
     assert data['statusCode'] == 200
-    assert data['message'] == "성공했습니다"
\ No newline at end of file
+    assert data['message'] == "성공했습니다"
+    assert data['data'] == {"documentId": 101, "status": "stored"}
+    mock_store.assert_called_once()
+
+@patch("routes.save_document.ingest_service.qdrant_service.replace_document_chunks")
+@patch("routes.save_document.ingest_service.qdrant_service.split_document")
+@patch("routes.save_document.ingest_service.qdrant_service.upsert_document_points")
+@patch("routes.save_document.ingest_service.get_embedding_service")
+@patch("routes.save_document.ingest_service.metadata_service.generate_summary.generate_document_summary")
+@patch("routes.save_document.ingest_service.metadata_service.extract_keyword.extract_keywords_and_category")
+def test_save_documents_reports_per_item_results(
+    mock_extract_keywords,
+    mock_generate_summary,
+    mock_embedding_service,
+    mock_upsert,
+    mock_split_document,
+    mock_replace_chunks,
+    client
+):
+    mock_extract_keywords.return_value = {"keywords": ["목표"], "category": "DEV_DOC"}
+    mock_generate_summary.side_effect = lambda content, category: (
+        {"error": "Invalid LLM response", "message": "LLM이 올바른 JSON을 반환하지 않았습니다.", "status_code": 500}
+        if content == "broken" else {"title": "제목", "summary": "요약"}
+    )
+    mock_embedding_service.return_value.embed_documents.side_effect = lambda texts: [[0.1] * 1024 for _ in texts]
+    mock_split_document.side_effect = lambda text: ["chunk 1", "chunk 2"]
+
+    test_data = {
+        "documents": [
+            {"documentId": 1, "organizationId": 2001, "content": "첫 번째 문서"},
+            {"documentId": 2, "organizationId": 2001, "content": "broken"},
+            {"organizationId": 2001, "content": "documentId 없음"}
+        ]
+    }
+
+    response = client.post('/api/save-documents', json=test_data)
+
+    assert response.status_code == 200
+    data = response.get_json()["data"]
+    assert (data["total"], data["stored"], data["failed"]) == (3, 1, 2)
+    statuses = {item["documentId"]: item["status"] for item in data["results"]}
+    assert statuses == {1: "stored", 2: "failed", None: "failed"}
+    mock_embedding_service.return_value.embed_documents.assert_called_once()
+    assert len(mock_upsert.call_args[0][0]) == 1
+    assert len(mock_replace_chunks.call_args[0][0][1]) == 2
+
+def test_save_documents_streams_ndjson(client):
+    with patch("routes.save_document.ingest_service.iter_ingest_documents") as mock_iter:
+        mock_iter.return_value = iter([
+            {"type": "item", "processed": 1, "total": 1, "documentId": 1, "status": "stored"},
+            {"type": "summary", "total": 1, "stored": 1, "failed": 0}
+        ])
+        response = client.post('/api/save-documents', json={"documents": [{"documentId": 1, "content": "x"}], "stream": True})
+
+    assert response.mimetype == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [line["type"] for line in lines] == ["item", "summary"]
+
+@patch("services.qdrant_service._ready_collections", set())
+@patch("services.qdrant_service.split_document", side_effect=lambda text: ["chunk 1", "chunk 2"])
+@patch("services.qdrant_service.get_embedding_service")
+@patch("routes.save_document.metadata_service.summarize")
+@patch("routes.save_document.metadata_service.extract_metadata")
+def test_save_document_skips_unchanged_content(
+    mock_extract,
+    mock_summarize,
+    mock_embedding_service,
+    mock_split_document,
+    client
+):
+    mock_extract.return_value = {"keywords": ["목표"], "category": "DEV_DOC"}
+    mock_summarize.return_value = {"title": "제목", "summary": "요약"}
+    mock_embedding_service.return_value.embed_documents.side_effect = lambda texts: [[0.1] * 1024 for _ in texts]
+    store = LocalVectorStore(":memory:")
+    document = {
+        "documentId": 101,
+        "organizationId": 2001,
+        "content": "3분기 목표: 사용자 유지율 개선",
+        "userId": "34567",
+        "createdBy": "Jane Doe",
+        "createdAt": "2025-05-12T10:30:00Z"
+    }
+
+    updated = {**document, "createdBy": "John Doe", "organizationId": 2002}
+    moved_chunks = models.Filter(must=[models.FieldCondition(key="organizationId", match=models.MatchValue(value=2002))])
+
+    def save(payload):
+        return client.post('/api/save-document', json=payload).get_json()["data"]["status"]
+
+    with patch("services.qdrant_service.get_client", return_value=store):
+        assert [save(document), save(document), save(updated)] == ["stored", "unchanged", "updated"]
+        assert mock_extract.call_count == 1
+        assert mock_embedding_service.return_value.embed_documents.call_count == 1
+        payload = store.retrieve(qdrant_service.QDRANT_COLLECTION_NAME, [101])[0].payload
+        assert (payload["createdBy"], payload["organizationId"]) == ("John Doe", 2002)
+        assert store.count(qdrant_service.QDRANT_CHUNK_COLLECTION_NAME, count_filter=moved_chunks).count == 2
+
+        assert save({**updated, "content": "3분기 목표: 베타 기능 출시"}) == "stored"
+
+    assert mock_extract.call_count == 2
+    payload = store.retrieve(qdrant_service.QDRANT_COLLECTION_NAME, [101])[0].payload
+    assert payload["contentHash"] == qdrant_service.document_content_hash("3분기 목표: 베타 기능 출시")
+
+@patch("routes.save_document.ingest_service.skip_unchanged", return_value={})
+@patch("routes.save_document.qdrant_service.store_document_embedding")
+@patch("routes.save_document.metadata_service.summarize")
+@patch("routes.save_document.metadata_service.extract_metadata")
+def test_save_document_reports_store_failure(mock_extract, mock_summarize, mock_store, mock_skip, client):
+    mock_extract.return_value = {"keywords": ["목표"], "category": "DEV_DOC"}
+    mock_summarize.return_value = {"title": "제목", "summary": "요약"}
+    mock_store.return_value = {
+        "error": "Error storing document in Qdrant",
+        "message": "Failed to store document with ID 101: connection refused",
+        "status_code": 503
+    }
+
+    response = client.post('/api/save-document', json={"documentId": 101, "organizationId": 2001, "content": "3분기 목표"})
+
+    assert response.status_code == 503
+    assert response.get_json()["error"] == "Error storing document in Qdrant"
+
+@patch("routes.save_document.ingest_service.skip_unchanged", return_value={})
+@patch("routes.save_document.qdrant_service.store_document_embedding")
+@patch("routes.save_document.metadata_service.summarize")
+@patch("routes.save_document.metadata_service.extract_metadata")
+def test_save_document_does_not_store_failed_analysis(mock_extract, mock_summarize, mock_store, mock_skip, client):
+    mock_extract.return_value = {"keywords": ["목표"], "category": "DEV_DOC"}
+    mock_summarize.return_value = {
+        "error": "Error generating document summary",
+        "message": "LLM 응답 생성에 실패했습니다.",
+        "status_code": 503
+    }
+
+    response = client.post('/api/save-document', json={"documentId": 102, "organizationId": 2001, "content": "3분기 목표"})
+
+    assert response.status_code == 503
+    assert response.get_json()["error"] == "Error generating document summary"
+    mock_store.assert_not_called()
+
+def test_classify_document_change():
+    document = {"userId": 1, "createdBy": "김영수", "createdAt": "2025-04-14T10:32:00+09:00", "organizationId": 2}
+    stored = {**document, "contentHash": qdrant_service.document_content_hash("내용"), **qdrant_service.ingest_versions()}
+
+    assert qdrant_service.classify_document_change(None, "내용", document) == "new"
+    assert qdrant_service.classify_document_change(stored, "내용", document) == "unchanged"
+    assert qdrant_service.classify_document_change(stored, "내용", {**document, "createdBy": "박준호"}) == "metadata"
+    assert qdrant_service.classify_document_change(stored, "새 내용", document) == "content"
+    assert qdrant_service.classify_document_change({**stored, "ingestVersion": "0"}, "내용", document) == "content"
+
+def test_content_hash_uses_source_content_and_versions_track_models():
+    payload = {"title": "회의록", "document": "LLM이 생성한 문서", "sourceContent": "원본 채팅"}
+    point = qdrant_service.build_document_point(1, [0.1], payload)
+
+    assert point.payload["contentHash"] == qdrant_service.document_content_hash("원본 채팅")
+    assert "sourceContent" not in point.payload
+
+    versions = qdrant_service.ingest_versions()
+    with patch("services.llm_registry.LLM_ROLE_MODELS", "extraction=gpt-4.1-mini"):
+        assert qdrant_service.ingest_versions()["summaryModel"] == "gpt-4.1-mini"
+    with patch("services.qdrant_service.EMBEDDING_DIMENSIONS", 512):
+        assert qdrant_service.ingest_versions()["embeddingModel"] != versions["embeddingModel"]
@@ -1,4 +1,5 @@
 import pytest
+from unittest.mock import AsyncMock, patch
 from app import create_app
 import json
 
@@ -87,4 +88,190 @@ def test_search_document_invalid_reference(client):
     assert response.status_code == 400
     data = json.loads(response.data)
     assert 'message' in data
-    assert 'reference에는 title과 content가 모두 포함되어야 합니다' in data['message'] 
\ No newline at end of file
+    assert 'reference에는 title과 content가 모두 포함되어야 합니다' in data['message']
+
+@patch("services.context_packer.REFERENCE_VERBATIM_MAX_TOKENS", 0)
+@patch("routes.search_route.memory_service_instance")
+@patch("routes.search_route.document_service.answer_question_with_summary")
+@patch("routes.search_route.summary_service.summarize_content")
+def test_search_document_skips_failed_reference_and_keeps_order(
+    mock_summarize,
+    mock_answer,
+    mock_memory,
+    client
+):
+    def summarize(content, prompt_template):
+        if content == "broken":
+            return {"error": "Error generating summary", "message": "문서 요약 생성에 실패했습니다.", "status_code": 500}
+        return f"summary of {content}"
+
+    mock_summarize.side_effect = summarize
+    mock_answer.return_value = "RAG 응답"
+    mock_memory.retrieve_relevant_memories.side_effect = Exception("qdrant down")
+    mock_memory.format_memories_for_prompt.return_value = ""
+
+    test_data = {
+        "references": [
+            {"title": "Doc 1", "content": "first"},
+            {"title": "Doc 2", "content": "broken"},
+            {"title": "Doc 3", "content": "third"}
+        ],
+        "userQuery": "What is this document about?"
+    }
+
+    response = client.post(
+        '/api/search-document',
+        data=json.dumps(test_data),
+        content_type='application/json'
+    )
+
+    assert response.status_code == 200
+    combined_summary = mock_answer.call_args[0][0]
+    assert combined_summary == "# Doc 1\nsummary of first\n\n# Doc 3\nsummary of third"
+
+
+@patch("routes.search_route.memory_service_instance")
+@patch("routes.search_route.document_service.answer_question_with_summary")
+@patch("routes.search_route.summary_service.summarize_content")
+@patch("routes.search_route.retrieval_service.retrieve_references")
+def test_search_document_server_retrieval(
+    mock_retrieve,
+    mock_summarize,
+    mock_answer,
+    mock_memory,
+    client
+):
+    mock_retrieve.return_value = [
+        {"documentId": 7, "title": "JWT 인증", "content": "JWT를 기본 인증 수단으로 사용한다.", "score": 0.91}
+    ]
+    mock_summarize.return_value = "JWT 사용"
+    mock_answer.return_value = "JWT입니다."
+    mock_memory.retrieve_relevant_memories.return_value = []
+    mock_memory.format_memories_for_prompt.return_value = ""
+
+    test_data = {
+        "retrieval": "server",
+        "organizationId": 2,
+        "category": "DEV_DOC",
+        "userQuery": "우리 팀이 합의한 인증 기술은 뭐야?"
+    }
+
+    response = client.post('/api/search-document', json=test_data)
+
+    assert response.status_code == 200
+    data = response.get_json()["data"]
+    assert data["ragResponse"] == "JWT입니다."
+    assert data["references"] == [{"documentId": 7, "title": "JWT 인증", "score": 0.91}]
+    assert mock_retrieve.call_args.args[1] == 2
+    assert mock_retrieve.call_args.kwargs["category"] == "DEV_DOC"
+
+@patch("routes.search_route.memory_service_instance")
+@patch("routes.search_route.document_service.answer_question_without_docs")
+@patch("routes.search_route.context_packer.reference_budget", return_value=0)
+def test_search_document_rejects_references_that_do_not_fit(mock_budget, mock_answer_without_docs, mock_memory, client):
+    mock_memory.retrieve_relevant_memories.return_value = []
+    mock_memory.format_memories_for_prompt.return_value = ""
+    test_data = {
+        "references": [{"title": "JWT 인증", "content": "JWT를 기본 인증 수단으로 사용한다."}],
+        "userQuery": "우리 팀이 합의한 인증 기술은 뭐야?"
+    }
+
+    response = client.post('/api/search-document', json=test_data)
+
+    assert response.status_code == 413
+    assert response.get_json()["error"] == "Context Budget Exceeded"
+    mock_answer_without_docs.assert_not_called()
+
+def test_search_document_server_retrieval_requires_organization(client):
+    response = client.post('/api/search-document', json={"retrieval": "server", "userQuery": "질문"})
+
+    assert response.status_code == 400
+
+@pytest.mark.parametrize("invalid", [
+    {"topK": "many"},
+    {"topK": 0},
+    {"topK": [5]},
+    {"createdFrom": "last week"},
+    {"createdTo": 20250101},
+])
+@patch("routes.search_route.retrieval_service.retrieve_references")
+def test_search_document_server_retrieval_rejects_invalid_fields(mock_retrieve, invalid, client):
+    test_data = {"retrieval": "server", "organizationId": 2, "userQuery": "질문", **invalid}
+
+    response = client.post('/api/search-document', json=test_data)
+
+    assert response.status_code == 400
+    assert response.get_json()["error"] == "Invalid Field"
+    mock_retrieve.assert_not_called()
+
+@patch("routes.search_route.memory_service_instance")
+@patch("routes.search_route.document_service.stream_answer_without_docs")
+def test_search_document_stream_stores_interaction_after_stream(
+    mock_stream_answer,
+    mock_memory,
+    client
+):
+    mock_stream_answer.return_value = iter(["JWT", "입니다."])
+    mock_memory.retrieve_relevant_memories.return_value = []
+    mock_memory.format_memories_for_prompt.return_value = ""
+
+    response = client.post('/api/search-document/stream', json={"userQuery": "인증 방식은?"})
+
+    assert response.mimetype == "text/event-stream"
+    body = response.get_data(as_text=True)
+    assert body.count("event: token") == 2
+    assert '"ragResponse": "JWT입니다."' in body
+    mock_memory.store_interaction.assert_called_once()
+    assert mock_memory.store_interaction.call_args.kwargs["response"] == "JWT입니다."
+
+@patch("routes.search_route.memory_service_instance")
+@patch("routes.search_route.document_service.answer_question_with_summary")
+@patch("routes.search_route.summary_service.summarize_content")
+def test_search_document_returns_cached_answer(
+    mock_summarize,
+    mock_answer,
+    mock_memory,
+    client
+):
+    mock_memory.find_similar_interaction.return_value = {"response": "캐시된 응답", "score": 0.98}
+
+    response = client.post('/api/search-document', json={
+        "references": [{"title": "회의록", "content": "금요일 배포로 결정"}],
+        "userQuery": "회의 결과 알려줘",
+        "organizationId": 1
+    })
+
+    assert response.status_code == 200
+    assert response.get_json()["data"]["ragResponse"] == "캐시된 응답"
+    mock_answer.assert_not_called()
+    mock_summarize.assert_not_called()
+    mock_memory.store_interaction.assert_not_called()
+
+@patch("routes.search_route.SERVING_MODE", "async")
+@patch("services.context_packer.REFERENCE_VERBATIM_MAX_TOKENS", 0)
+@patch("routes.search_route.memory_service_instance")
+@patch("routes.search_route.document_service.aanswer_question_with_summary")
+@patch("routes.search_route.summary_service.asummarize_content")
+def test_search_document_async_serving_mode(
+    mock_summarize,
+    mock_answer,
+    mock_memory,
+    client
+):
+    mock_summarize.return_value = "금요일 배포"
+    mock_answer.return_value = "금요일에 배포합니다."
+    mock_memory.aretrieve_relevant_memories = AsyncMock(return_value=[])
+    mock_memory.afind_similar_interaction = AsyncMock(return_value=None)
+    mock_memory.format_memories_for_prompt.return_value = ""
+
+    response = client.post('/api/search-document', json={
+        "references": [{"title": "회의록", "content": "금요일 배포로 결정"}],
+        "userQuery": "배포일은?",
+        "organizationId": 1
+    })
+
+    assert response.status_code == 200
+    assert response.get_json()["data"]["ragResponse"] == "금요일에 배포합니다."
+    assert mock_answer.await_args.args[0] == "# 회의록\n금요일 배포"
+    mock_memory.aretrieve_relevant_memories.assert_awaited_once()
+    mock_memory.store_interaction.assert_called_once()
@@ -0,0 +1,112 @@
+import asyncio
+import threading
+import time
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+from app import create_app
+from utils import resilience
+from utils.single_flight import SingleFlight, content_hash
+
+
+def _slow(result, delay=0.2):
+    calls = []
+    def fn():
+        calls.append(1)
+        time.sleep(delay)
+        return result
+    return fn, calls
+
+def test_concurrent_duplicates_share_one_execution():
+    flights = SingleFlight("test")
+    fn, calls = _slow({"documentId": 1})
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(lambda _: flights.do("1:abc", fn), range(4)))
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert flights.in_flight() == 0
+    # 완료 후 들어온 요청은 다시 실행
+    flights.do("1:abc", fn)
+    assert len(calls) == 2
+
+def test_different_keys_run_separately():
+    flights = SingleFlight("test")
+    fn, calls = _slow("ok", delay=0.05)
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        list(executor.map(lambda key: flights.do(key, fn), ["1:abc", "1:def"]))
+
+    assert len(calls) == 2
+
+def test_leader_error_is_shared():
+    flights = SingleFlight("test")
+    started = threading.Event()
+    def fail():
+        started.set()
+        time.sleep(0.1)
+        raise ConnectionError("qdrant down")
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        leader = executor.submit(flights.do, "key", fail)
+        started.wait()
+        follower = executor.submit(flights.do, "key", MagicMock())
+        for future in (leader, follower):
+            with pytest.raises(ConnectionError):
+                future.result()
+
+def test_follower_waits_within_request_deadline():
+    flights = SingleFlight("test")
+    fn, _ = _slow("ok", delay=0.5)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        leader = executor.submit(flights.do, "key", fn)
+        time.sleep(0.05)
+        with resilience.deadline(0.1):
+            with pytest.raises(resilience.DeadlineExceeded):
+                flights.do("key", fn)
+        assert leader.result() == "ok"
+
+def test_async_duplicates_share_one_execution():
+    flights = SingleFlight("test")
+    calls = []
+
+    async def search():
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        return {"ragResponse": "JWT"}, 200
+
+    async def run():
+        return await asyncio.gather(*(flights.ado("key", search) for _ in range(3)))
+
+    results = asyncio.run(run())
+    assert len(calls) == 1
+    assert results == [({"ragResponse": "JWT"}, 200)] * 3
+
+def test_content_hash_ignores_key_order():
+    assert content_hash({"a": 1, "b": [1, 2]}) == content_hash({"b": [1, 2], "a": 1})
+    assert content_hash({"a": 1}) != content_hash({"a": 2})
+
+@patch("routes.save_document.qdrant_service.store_document_embedding")
+@patch("routes.save_document.metadata_service.summarize")
+@patch("routes.save_document.metadata_service.extract_metadata")
+def test_save_document_retries_are_coalesced(mock_extract, mock_summarize, mock_store):
+    mock_extract.side_effect = lambda *args: time.sleep(0.2) or {"keywords": ["JWT"], "category": "DEV_DOC"}
+    mock_summarize.return_value = {"title": "인증", "summary": "JWT 사용"}
+    app = create_app()
+    payload = {
+        "documentId": 1,
+        "organizationId": 2,
+        "content": "JWT로 인증하기로 결정",
+        "userId": 3,
+        "createdBy": "김영수",
+        "createdAt": "2025-04-14T10:32:00+09:00"
+    }
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        responses = list(executor.map(lambda _: app.test_client().post("/api/save-document", json=payload), range(3)))
+
+    assert [response.status_code for response in responses] == [200] * 3
+    mock_extract.assert_called_once()
+    mock_store.assert_called_once()
@@ -0,0 +1,77 @@
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.http import models
+from services.vector_store import LocalVectorStore
+
+
+def make_points(count=50, size=8, seed=0):
+    rng = np.random.default_rng(seed)
+    return [
+        models.PointStruct(
+            id=index + 1,
+            vector=rng.normal(size=size).tolist(),
+            payload={
+                "organizationId": index % 3,
+                "category": "DEV_DOC" if index % 2 else "MEETING_DOC",
+                "createdAt": f"2025-01-{index % 28 + 1:02d}T00:00:00Z",
+            }
+        )
+        for index in range(count)
+    ]
+
+def create(client, name, points, distance=models.Distance.COSINE):
+    client.create_collection(name, vectors_config=models.VectorParams(size=8, distance=distance))
+    client.upsert(collection_name=name, points=points)
+
+def test_search_matches_qdrant_with_filters():
+    points = make_points()
+    local = LocalVectorStore(":memory:")
+    qdrant = QdrantClient(":memory:")
+    create(local, "parity", points)
+    create(qdrant, "parity_local_store", points)
+
+    query_filter = models.Filter(
+        must=[models.FieldCondition(key="organizationId", match=models.MatchValue(value=1))],
+        should=[
+            models.FieldCondition(key="category", match=models.MatchValue(value="DEV_DOC")),
+            models.FieldCondition(key="createdAt", range=models.DatetimeRange(gte="2025-01-20T00:00:00Z")),
+        ],
+    )
+    query = np.random.default_rng(1).normal(size=8).tolist()
+
+    expected = qdrant.search("parity_local_store", query_vector=query, query_filter=query_filter, limit=5)
+    actual = local.search("parity", query_vector=query, query_filter=query_filter, limit=5)
+
+    assert [hit.id for hit in actual] == [hit.id for hit in expected]
+    assert np.allclose([hit.score for hit in actual], [hit.score for hit in expected], atol=1e-5)
+
+def test_upsert_delete_and_score_threshold():
+    store = LocalVectorStore(":memory:")
+    create(store, "docs", make_points(count=10))
+
+    store.upsert(collection_name="docs", points=[models.PointStruct(id=1, vector=[1.0] + [0.0] * 7, payload={"organizationId": 9})])
+    hits = store.search("docs", query_vector=[1.0] + [0.0] * 7, score_threshold=0.99)
+    assert [(hit.id, hit.payload["organizationId"]) for hit in hits] == [(1, 9)]
+
+    store.delete(collection_name="docs", points_selector=models.FilterSelector(filter=models.Filter(must=[
+        models.FieldCondition(key="organizationId", match=models.MatchValue(value=0))
+    ])))
+    assert store.count("docs").count == 10 - 3
+    assert store.count("docs", count_filter=models.Filter(must=[
+        models.FieldCondition(key="organizationId", match=models.MatchValue(value=0))
+    ])).count == 0
+
+def test_persists_vectors_and_payloads(tmp_path):
+    store = LocalVectorStore(str(tmp_path))
+    create(store, "docs", make_points(count=1500), distance=models.Distance.DOT)
+    store.delete(collection_name="docs", points_selector=models.PointIdsList(points=[1]))
+    store.set_payload(collection_name="docs", payload={"category": "DEV_DOC"}, points=[2])
+    query = [0.5] * 8
+    before = store.search("docs", query_vector=query, limit=3)
+    store.close()
+
+    reopened = LocalVectorStore(str(tmp_path))
+
+    assert reopened.count("docs").count == 1499
+    assert reopened.retrieve("docs", ids=[2])[0].payload["category"] == "DEV_DOC"
+    assert [hit.id for hit in reopened.search("docs", query_vector=query, limit=3)] == [hit.id for hit in before]
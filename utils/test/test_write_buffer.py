@@ -0,0 +1,38 @@
+import threading
+from utils.write_buffer import WriteBehindBuffer
+
+
+def test_flushes_in_batches_and_drains_on_close():
+    batches = []
+    buffer = WriteBehindBuffer(batches.append, max_size=100, batch_size=3, flush_interval=60)
+
+    for item in range(7):
+        buffer.put(item)
+    buffer.close()
+
+    assert [item for batch in batches for item in batch] == list(range(7))
+    assert all(len(batch) <= 3 for batch in batches)
+    assert buffer.stats()["flushed"] == 7
+
+def test_drops_when_queue_is_full():
+    release = threading.Event()
+    buffer = WriteBehindBuffer(lambda batch: release.wait(5), max_size=2, batch_size=1, flush_interval=0)
+
+    results = [buffer.put(item) for item in range(10)]
+    release.set()
+    buffer.close()
+
+    stats = buffer.stats()
+    assert results.count(False) == stats["dropped"] > 0
+    assert stats["flushed"] + stats["dropped"] == 10
+
+def test_flush_failure_is_counted():
+    def flush(batch):
+        raise RuntimeError("qdrant down")
+
+    buffer = WriteBehindBuffer(flush, batch_size=2, flush_interval=0)
+    buffer.put("a")
+    buffer.join()
+    buffer.close()
+
+    assert buffer.stats()["failed"] == 1
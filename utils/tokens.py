@@ -0,0 +1,42 @@
+import logging
+import math
+from functools import lru_cache
+import tiktoken
+from config import LANGCHAIN_MODEL
+from utils import metrics
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=None)
+def _get_encoding(model: str):
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        # 인코딩 파일을 받을 수 없는 환경에서는 바이트 길이 기반 추정치 사용
+        logger.warning(f"tiktoken encoding for '{model}' is unavailable, estimating token counts")
+        metrics.record_fallback("count_tokens", "encoding_unavailable")
+        return None
+
+def count_tokens(text: str, model: str = LANGCHAIN_MODEL) -> int:
+    """모델 토크나이저 기준 토큰 수 (토크나이저를 불러올 수 없으면 UTF-8 바이트 수 / 3)"""
+    if not text:
+        return 0
+    encoding = _get_encoding(model)
+    if encoding is None:
+        return math.ceil(len(text.encode("utf-8")) / 3)
+    return len(encoding.encode(text, disallowed_special=()))
+
+def truncate_to_tokens(text: str, max_tokens: int, model: str = LANGCHAIN_MODEL) -> str:
+    """text를 max_tokens 이하로 자름"""
+    if max_tokens <= 0:
+        return ""
+    if count_tokens(text, model) <= max_tokens:
+        return text
+    encoding = _get_encoding(model)
+    if encoding is None:
+        return text.encode("utf-8")[:max_tokens * 3].decode("utf-8", errors="ignore")
+    return encoding.decode(encoding.encode(text, disallowed_special=())[:max_tokens])
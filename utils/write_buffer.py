@@ -0,0 +1,117 @@
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+_WAKE = object()
+
+
+class WriteBehindBuffer:
+    """
+    bounded 큐에 쌓인 항목을 백그라운드 스레드가 batch 단위로 flush하는 write-behind 버퍼.
+    batch_size개가 모이거나 첫 항목 이후 flush_interval초가 지나면 flush하며,
+    큐가 가득 차면 호출자를 기다리게 하지 않고 항목을 버린 뒤 dropped 카운터를 증가
+    """
+
+    def __init__(
+        self,
+        flush: Callable[[List[Any]], None],
+        max_size: int = 1000,
+        batch_size: int = 32,
+        flush_interval: float = 1.0,
+        name: str = "write-behind",
+    ):
+        self.flush = flush
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.name = name
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max(1, max_size))
+        self._stop = threading.Event()
+        self._counts = {"enqueued": 0, "dropped": 0, "flushed": 0, "failed": 0, "batches": 0}
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def put(self, item: Any) -> bool:
+        """항목을 큐에 추가. 큐가 가득 찼거나 종료 중이면 False"""
+        if self._stop.is_set():
+            self._incr("dropped")
+            return False
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self._incr("dropped")
+            logger.warning(f"{self.name} queue is full, dropping item")
+            return False
+        self._incr("enqueued")
+        return True
+
+    def join(self) -> None:
+        """지금까지 추가된 항목이 모두 flush될 때까지 대기"""
+        self._queue.join()
+
+    def close(self, timeout: float = 10.0) -> None:
+        """새 항목을 받지 않고 남은 항목을 flush한 뒤 스레드를 종료"""
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        try:
+            self._queue.put_nowait(_WAKE)
+        except queue.Full:
+            pass
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.warning(f"{self.name} did not drain within {timeout}s, {self._queue.qsize()} items left")
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            counts = dict(self._counts)
+        counts["depth"] = self._queue.qsize()
+        return counts
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if batch:
+                self._flush(batch)
+            if self._stop.is_set() and self._queue.empty():
+                return
+
+    def _next_batch(self) -> List[Any]:
+        # 첫 항목은 제한 없이 대기하고, 이후 항목은 flush_interval 안에서만 모음
+        batch = []
+        item = self._queue.get()
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            if item is _WAKE:
+                self._queue.task_done()
+            else:
+                batch.append(item)
+            if len(batch) >= self.batch_size:
+                return batch
+            try:
+                if self._stop.is_set():
+                    item = self._queue.get_nowait()
+                else:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                return batch
+
+    def _flush(self, batch: List[Any]) -> None:
+        try:
+            self.flush(batch)
+            self._incr("flushed", amount=len(batch))
+        except Exception:
+            logger.exception(f"{self.name} failed to flush {len(batch)} items")
+            self._incr("failed", amount=len(batch))
+        finally:
+            self._incr("batches")
+            for _ in batch:
+                self._queue.task_done()
+
+    def _incr(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counts[name] += amount